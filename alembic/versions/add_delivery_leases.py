@@ -0,0 +1,27 @@
+"""add delivery leases
+
+Revision ID: 6c1d8e2a9b47
+Revises: f2f0e11f9090
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6c1d8e2a9b47'
+down_revision = 'f2f0e11f9090'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Workers claim due deliveries by stamping an owner and a lease expiry on the row
+    op.add_column('delivery_logs', sa.Column('lease_owner', sa.String(), nullable=True))
+    op.add_column('delivery_logs', sa.Column('lease_expires_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('delivery_logs', 'lease_expires_at')
+    op.drop_column('delivery_logs', 'lease_owner')
@@ -0,0 +1,27 @@
+"""delivery log latency columns
+
+Revision ID: 6e2b9d4f8a17
+Revises: 4c8a2e6f1b95
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6e2b9d4f8a17'
+down_revision = '4c8a2e6f1b95'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Nullable without a default, so no partition is rewritten; older attempts stay NULL
+    op.add_column('delivery_logs', sa.Column('queue_wait_ms', sa.Integer(), nullable=True))
+    op.add_column('delivery_logs', sa.Column('duration_ms', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('delivery_logs', 'duration_ms')
+    op.drop_column('delivery_logs', 'queue_wait_ms')
@@ -0,0 +1,110 @@
+"""partition delivery logs by day
+
+Revision ID: 9f3c1d7e5a28
+Revises: 2a6b8e4d0f51
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from datetime import datetime, timedelta
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '9f3c1d7e5a28'
+down_revision = '2a6b8e4d0f51'
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    'ix_delivery_logs_webhook_id': 'webhook_id',
+    'ix_delivery_logs_subscription_id': 'subscription_id',
+    'ix_delivery_logs_status': 'status',
+    'ix_delivery_logs_next_attempt_at': 'next_attempt_at',
+    'ix_delivery_logs_attempt_timestamp': 'attempt_timestamp',
+}
+
+# Daily partitions created up front; the worker keeps creating them ahead of time
+PRECREATE_DAYS = 7
+
+
+def upgrade():
+    # The existing table becomes the first partition, holding every row up to the end
+    # of today, so no data is copied. It is dropped as a whole once it expires.
+    tomorrow = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+
+    op.execute("ALTER TABLE delivery_logs RENAME TO delivery_logs_legacy")
+    op.execute("ALTER TABLE delivery_logs_legacy RENAME CONSTRAINT delivery_logs_pkey TO delivery_logs_legacy_pkey")
+    for name in INDEXES:
+        op.execute(f"ALTER INDEX {name} RENAME TO {name.replace('delivery_logs', 'delivery_logs_legacy')}")
+    # Keep the ID sequence when the legacy partition is dropped
+    op.execute("ALTER SEQUENCE delivery_logs_id_seq OWNED BY NONE")
+
+    # The partition key must be part of the primary key; IDs still come from one sequence
+    op.execute("""
+        CREATE TABLE delivery_logs (
+            id integer NOT NULL DEFAULT nextval('delivery_logs_id_seq'),
+            webhook_id varchar NOT NULL REFERENCES webhook_payloads (id) ON DELETE CASCADE,
+            subscription_id varchar NOT NULL REFERENCES subscriptions (id) ON DELETE CASCADE,
+            attempt_number integer NOT NULL DEFAULT 1,
+            status varchar NOT NULL DEFAULT 'pending',
+            status_code integer,
+            error_details text,
+            attempt_timestamp timestamp NOT NULL DEFAULT now(),
+            next_attempt_at timestamp,
+            lease_owner varchar,
+            lease_expires_at timestamp,
+            PRIMARY KEY (id, attempt_timestamp)
+        ) PARTITION BY RANGE (attempt_timestamp)
+    """)
+    op.execute("ALTER SEQUENCE delivery_logs_id_seq OWNED BY delivery_logs.id")
+    for name, column in INDEXES.items():
+        op.execute(f"CREATE INDEX {name} ON delivery_logs ({column})")
+
+    # Validated up front so attaching does not scan the table under an exclusive lock
+    op.execute(f"""
+        ALTER TABLE delivery_logs_legacy ADD CONSTRAINT delivery_logs_legacy_range
+        CHECK (attempt_timestamp IS NOT NULL AND attempt_timestamp < '{tomorrow:%Y-%m-%d}') NOT VALID
+    """)
+    op.execute("ALTER TABLE delivery_logs_legacy VALIDATE CONSTRAINT delivery_logs_legacy_range")
+    op.execute(f"""
+        ALTER TABLE delivery_logs ATTACH PARTITION delivery_logs_legacy
+        FOR VALUES FROM (MINVALUE) TO ('{tomorrow:%Y-%m-%d}')
+    """)
+
+    for offset in range(PRECREATE_DAYS):
+        day = tomorrow + timedelta(days=offset)
+        op.execute(
+            f"CREATE TABLE delivery_logs_p{day:%Y%m%d} PARTITION OF delivery_logs "
+            f"FOR VALUES FROM ('{day:%Y-%m-%d}') TO ('{day + timedelta(days=1):%Y-%m-%d}')"
+        )
+    # Catches rows beyond the pre-created days if partition maintenance stops running
+    op.execute("CREATE TABLE delivery_logs_default PARTITION OF delivery_logs DEFAULT")
+
+
+def downgrade():
+    # Copies every remaining row back into a plain table
+    op.execute("ALTER TABLE delivery_logs RENAME TO delivery_logs_partitioned")
+    op.execute("ALTER SEQUENCE delivery_logs_id_seq OWNED BY NONE")
+    for name in INDEXES:
+        op.execute(f"ALTER INDEX {name} RENAME TO {name.replace('delivery_logs', 'delivery_logs_partitioned')}")
+    op.execute("""
+        CREATE TABLE delivery_logs (
+            id integer NOT NULL DEFAULT nextval('delivery_logs_id_seq') PRIMARY KEY,
+            webhook_id varchar NOT NULL REFERENCES webhook_payloads (id) ON DELETE CASCADE,
+            subscription_id varchar NOT NULL REFERENCES subscriptions (id) ON DELETE CASCADE,
+            attempt_number integer NOT NULL DEFAULT 1,
+            status varchar NOT NULL DEFAULT 'pending',
+            status_code integer,
+            error_details text,
+            attempt_timestamp timestamp NOT NULL DEFAULT now(),
+            next_attempt_at timestamp,
+            lease_owner varchar,
+            lease_expires_at timestamp
+        )
+    """)
+    op.execute("INSERT INTO delivery_logs SELECT * FROM delivery_logs_partitioned")
+    op.execute("DROP TABLE delivery_logs_partitioned")
+    op.execute("ALTER SEQUENCE delivery_logs_id_seq OWNED BY delivery_logs.id")
+    for name, column in INDEXES.items():
+        op.execute(f"CREATE INDEX {name} ON delivery_logs ({column})")
@@ -0,0 +1,89 @@
+"""split delivery tasks from delivery logs
+
+Revision ID: 7b4e2c9a1d63
+Revises: 9f3c1d7e5a28
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b4e2c9a1d63'
+down_revision = '9f3c1d7e5a28'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # One row per webhook and subscription: the work queue the workers claim from
+    op.create_table(
+        'delivery_tasks',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('webhook_id', sa.String(), nullable=False),
+        sa.Column('subscription_id', sa.String(), nullable=False),
+        sa.Column('attempt_number', sa.Integer(), nullable=False, server_default=sa.text('1')),
+        sa.Column('status', sa.String(), nullable=False, server_default=sa.text("'PENDING'")),
+        sa.Column('status_code', sa.Integer(), nullable=True),
+        sa.Column('error_details', sa.Text(), nullable=True),
+        sa.Column('next_attempt_at', sa.DateTime(), nullable=True),
+        sa.Column('lease_owner', sa.String(), nullable=True),
+        sa.Column('lease_expires_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('now()')),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('now()')),
+        sa.ForeignKeyConstraint(['subscription_id'], ['subscriptions.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['webhook_id'], ['webhook_payloads.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('webhook_id', 'subscription_id', name='uq_delivery_tasks_webhook_subscription')
+    )
+
+    # The latest log of each delivery becomes its task and keeps its ID, so deliveries
+    # already in the Redis schedule stay valid
+    op.execute("""
+        INSERT INTO delivery_tasks (
+            id, webhook_id, subscription_id, attempt_number, status, status_code, error_details,
+            next_attempt_at, lease_owner, lease_expires_at, created_at, updated_at
+        )
+        SELECT DISTINCT ON (webhook_id, subscription_id)
+            id, webhook_id, subscription_id, attempt_number, status, status_code, error_details,
+            next_attempt_at, lease_owner, lease_expires_at, attempt_timestamp, attempt_timestamp
+        FROM delivery_logs
+        ORDER BY webhook_id, subscription_id, attempt_number DESC, id DESC
+    """)
+    # New task IDs must not collide with log IDs still in the Redis schedule
+    op.execute("""
+        SELECT setval('delivery_tasks_id_seq', GREATEST(
+            (SELECT last_value FROM delivery_logs_id_seq), (SELECT coalesce(max(id), 1) FROM delivery_tasks)
+        ))
+    """)
+    op.create_index('ix_delivery_tasks_subscription_id', 'delivery_tasks', ['subscription_id'], unique=False)
+    op.create_index('ix_delivery_tasks_next_attempt_at', 'delivery_tasks', ['next_attempt_at'], unique=False)
+
+    # delivery_logs becomes the append-only attempt history: drop rows that were never
+    # sent, and the queue columns and poll index
+    op.execute("DELETE FROM delivery_logs WHERE status = 'PENDING'")
+    op.drop_index('ix_delivery_logs_next_attempt_at', table_name='delivery_logs')
+    op.drop_column('delivery_logs', 'lease_expires_at')
+    op.drop_column('delivery_logs', 'lease_owner')
+
+
+def downgrade():
+    op.add_column('delivery_logs', sa.Column('lease_owner', sa.String(), nullable=True))
+    op.add_column('delivery_logs', sa.Column('lease_expires_at', sa.DateTime(), nullable=True))
+    op.create_index('ix_delivery_logs_next_attempt_at', 'delivery_logs', ['next_attempt_at'], unique=False)
+
+    # Unfinished deliveries go back to the queue as pending logs
+    op.execute("""
+        INSERT INTO delivery_logs (
+            webhook_id, subscription_id, attempt_number, status, status_code, error_details,
+            attempt_timestamp, next_attempt_at
+        )
+        SELECT webhook_id, subscription_id, attempt_number, status, status_code, error_details,
+            updated_at, next_attempt_at
+        FROM delivery_tasks
+        WHERE status IN ('PENDING', 'FAILED_ATTEMPT')
+    """)
+    op.drop_index('ix_delivery_tasks_next_attempt_at', table_name='delivery_tasks')
+    op.drop_index('ix_delivery_tasks_subscription_id', table_name='delivery_tasks')
+    op.drop_table('delivery_tasks')
@@ -0,0 +1,41 @@
+"""partial poll index on delivery tasks
+
+Revision ID: 4c8a2e6f1b95
+Revises: 7b4e2c9a1d63
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4c8a2e6f1b95'
+down_revision = '7b4e2c9a1d63'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Built concurrently so the workers keep claiming while it runs. A failed build
+    # leaves an INVALID index behind, which must be dropped before running this again.
+    with op.get_context().autocommit_block():
+        # Only unfinished tasks, which stay a small share of the table. attempt_number is
+        # included so exhausted rows are filtered in the index; the lease columns are not,
+        # so claiming a task remains a HOT update.
+        op.create_index(
+            'ix_delivery_tasks_due', 'delivery_tasks', ['next_attempt_at'], unique=False,
+            postgresql_where=sa.text("status IN ('PENDING', 'FAILED_ATTEMPT')"),
+            postgresql_include=['attempt_number'],
+            postgresql_concurrently=True
+        )
+        op.drop_index('ix_delivery_tasks_next_attempt_at', table_name='delivery_tasks', postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_delivery_tasks_next_attempt_at', 'delivery_tasks', ['next_attempt_at'], unique=False,
+            postgresql_concurrently=True
+        )
+        op.drop_index('ix_delivery_tasks_due', table_name='delivery_tasks', postgresql_concurrently=True)
@@ -0,0 +1,41 @@
+"""add payload compression
+
+Revision ID: 5e9a3c7b2d14
+Revises: 8d2f4a6c1e37
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e9a3c7b2d14'
+down_revision = '8d2f4a6c1e37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Large bodies are stored compressed as bytes, in place of the JSON payload
+    op.alter_column('webhook_payloads', 'payload', existing_type=sa.JSON(), nullable=True)
+    op.alter_column(
+        'webhook_payloads', 'body',
+        existing_type=sa.Text(), type_=sa.LargeBinary(), postgresql_using="convert_to(body, 'UTF8')"
+    )
+    op.add_column('webhook_payloads', sa.Column('body_encoding', sa.String(), nullable=True))
+    # Opt-in compression of outbound deliveries ("gzip")
+    op.add_column('subscriptions', sa.Column('content_encoding', sa.String(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('subscriptions', 'content_encoding')
+    # Compressed bodies cannot be converted back in SQL; drop them and re-serialize on delivery
+    op.execute("UPDATE webhook_payloads SET body = NULL, signature = NULL WHERE body_encoding IS NOT NULL")
+    op.drop_column('webhook_payloads', 'body_encoding')
+    op.alter_column(
+        'webhook_payloads', 'body',
+        existing_type=sa.LargeBinary(), type_=sa.Text(), postgresql_using="convert_from(body, 'UTF8')"
+    )
+    # Fails if webhooks stored only compressed remain
+    op.alter_column('webhook_payloads', 'payload', existing_type=sa.JSON(), nullable=False)
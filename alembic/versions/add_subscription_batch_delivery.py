@@ -0,0 +1,25 @@
+"""add subscription batch delivery
+
+Revision ID: 2a6b8e4d0f51
+Revises: 5e9a3c7b2d14
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2a6b8e4d0f51'
+down_revision = '5e9a3c7b2d14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Limits of batched deliveries (max_size, max_bytes, linger_ms); NULL sends one request per webhook
+    op.add_column('subscriptions', sa.Column('batch_delivery', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('subscriptions', 'batch_delivery')
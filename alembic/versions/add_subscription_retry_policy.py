@@ -0,0 +1,25 @@
+"""add subscription retry policy
+
+Revision ID: 3b7e5f1a2c90
+Revises: 6c1d8e2a9b47
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b7e5f1a2c90'
+down_revision = '6c1d8e2a9b47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Per-subscription overrides of the default retry policy (intervals, jitter, max delay)
+    op.add_column('subscriptions', sa.Column('retry_policy', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('subscriptions', 'retry_policy')
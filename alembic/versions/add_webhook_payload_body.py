@@ -0,0 +1,30 @@
+"""add webhook payload body and signature
+
+Revision ID: 8d2f4a6c1e37
+Revises: 3b7e5f1a2c90
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d2f4a6c1e37'
+down_revision = '3b7e5f1a2c90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Outbound body and signature built once at ingest; NULL for webhooks stored before
+    # this migration, which are serialized and signed on every attempt as before
+    op.add_column('webhook_payloads', sa.Column('body', sa.Text(), nullable=True))
+    op.add_column('webhook_payloads', sa.Column('signature', sa.String(), nullable=True))
+    op.add_column('webhook_payloads', sa.Column('signing_key_id', sa.String(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('webhook_payloads', 'signing_key_id')
+    op.drop_column('webhook_payloads', 'signature')
+    op.drop_column('webhook_payloads', 'body')
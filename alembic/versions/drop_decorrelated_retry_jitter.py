@@ -0,0 +1,29 @@
+"""drop decorrelated retry jitter
+
+Revision ID: 2d8b6f4e1a93
+Revises: 7f3c1a9e5b28
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '2d8b6f4e1a93'
+down_revision = '7f3c1a9e5b28'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Decorrelated jitter is no longer offered; subscriptions using it get full jitter
+    op.execute(
+        "UPDATE subscriptions "
+        "SET retry_policy = jsonb_set(retry_policy::jsonb, '{jitter}', '\"full\"')::json "
+        "WHERE retry_policy->>'jitter' = 'decorrelated'"
+    )
+
+
+def downgrade():
+    # Subscriptions moved to full jitter keep it
+    pass
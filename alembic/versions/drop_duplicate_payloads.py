@@ -0,0 +1,29 @@
+"""drop payloads duplicated by the stored body
+
+Revision ID: 7f3c1a9e5b28
+Revises: 6e2b9d4f8a17
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '7f3c1a9e5b28'
+down_revision = '6e2b9d4f8a17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The body is the stored form of the payload; the JSON copy kept next to uncompressed
+    # bodies is dropped and decoded from the body when read
+    op.execute("UPDATE webhook_payloads SET payload = NULL WHERE body IS NOT NULL AND payload IS NOT NULL")
+
+
+def downgrade():
+    # Only uncompressed bodies can be decoded in SQL; compressed ones keep a NULL payload as before
+    op.execute(
+        "UPDATE webhook_payloads SET payload = convert_from(body, 'UTF8')::json "
+        "WHERE payload IS NULL AND body IS NOT NULL AND body_encoding IS NULL"
+    )
@@ -1,11 +1,17 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
+from app.core.cache import RedisCache
+from app.core.compression import compression_stats
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.local_cache import subscription_local_cache
+from app.core.single_flight import subscription_loads
 from app.crud import delivery as delivery_crud
 from app.crud import subscription as subscription_crud
 from app.schemas import DeliveryLog
+from app.services.latency import get_subscription_latency
 
 router = APIRouter()
 
@@ -25,9 +31,60 @@ def get_subscription_stats(subscription_id: str, db: Session = Depends(get_db)):
     # Add subscription details
     stats["subscription_id"] = subscription_id
     stats["target_url"] = subscription.target_url
+    stats["circuit_breaker"] = RedisCache.get_circuit_breaker(subscription_id)
     
     return stats
 
+@router.get("/subscription/{subscription_id}/latency")
+def get_subscription_latency_stats(
+    subscription_id: str, minutes: int = Query(60, ge=1, le=settings.LATENCY_RETENTION_HOURS * 60), db: Session = Depends(get_db)
+):
+    """
+    Get p50, p95 and p99 of the queue wait and HTTP round-trip of a subscription's recent attempts
+    """
+    subscription = subscription_crud.get_subscription(db, subscription_id)
+    if not subscription:
+        raise HTTPException(status_code=404, detail="Subscription not found")
+
+    latency = get_subscription_latency(subscription_id, minutes)
+    latency["subscription_id"] = subscription_id
+    return latency
+
+@router.get("/workers")
+def get_worker_stats():
+    """
+    Get the latest stats reported by each running worker, such as its HTTP connection pool
+    """
+    return RedisCache.get_worker_stats()
+
+@router.get("/circuit-breakers")
+def get_circuit_breakers():
+    """
+    Get the circuit breakers that are open, half-open or recovering, keyed by subscription ID
+    """
+    return RedisCache.get_circuit_breakers()
+
+@router.get("/supervisors")
+def get_supervisor_stats():
+    """
+    Get the health of each worker supervisor and the processes it runs
+    """
+    return RedisCache.get_supervisor_stats()
+
+@router.get("/cache")
+def get_cache_stats():
+    """
+    Get the hit ratio and size of this API process's in-process subscription cache
+    """
+    return {"subscriptions": subscription_local_cache.stats(), "subscription_loads": subscription_loads.stats()}
+
+@router.get("/compression")
+def get_compression_stats():
+    """
+    Get the compression ratio and time spent compressing webhook bodies in this API process
+    """
+    return compression_stats.stats()
+
 @router.get("/recent-attempts/{subscription_id}", response_model=List[DeliveryLog])
 def get_recent_attempts(
     subscription_id: str, limit: int = 20, db: Session = Depends(get_db)
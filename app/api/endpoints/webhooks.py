@@ -3,14 +3,22 @@ import hmac
 import json
 from typing import Any, Dict, List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Header, Request, status, Body
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 
-from app.core.database import get_db
-from app.schemas import WebhookPayloadCreate, WebhookPayload, DeliveryLog, DeliveryStatus
+from app.core.database import get_db, get_async_db
+from app.core.config import settings
+from app.core.json_codec import codec
+from app.core.event_index import event_type_matches
+from app.schemas import (
+    WebhookPayloadCreate, WebhookPayload, DeliveryLog, DeliveryStatus,
+    WebhookBatchRequest, WebhookBatchResponse, WebhookBatchItemResult
+)
 from app.crud import webhook as webhook_crud
 from app.crud import subscription as subscription_crud
 from app.crud import delivery as delivery_crud
+from app.models import DeliveryStatus as ModelDeliveryStatus
 
 router = APIRouter()
 
@@ -18,13 +26,150 @@ router = APIRouter()
 class WebhookRequestBody(BaseModel):
     payload: Dict[str, Any]
 
+def _verify_signature(secret_key: str, payload: Dict[str, Any], signature: str) -> bool:
+    """
+    Check an HMAC SHA-256 signature of a payload against the subscription secret
+
+    The signature may cover the payload serialized by the configured JSON codec, or
+    with Python's `json.dumps` defaults as accepted before the codec was introduced.
+    """
+    # Remove "sha256=" prefix if present
+    if signature.startswith("sha256="):
+        signature = signature[7:]
+
+    key = secret_key.encode('utf-8')
+    body = codec.dumpb(payload)
+    if hmac.compare_digest(hmac.new(key, body, hashlib.sha256).hexdigest(), signature):
+        return True
+
+    legacy_body = json.dumps(payload).encode('utf-8')
+    if legacy_body == body:
+        return False
+    return hmac.compare_digest(hmac.new(key, legacy_body, hashlib.sha256).hexdigest(), signature)
+
+@router.post("/ingest/batch", response_model=WebhookBatchResponse, status_code=status.HTTP_202_ACCEPTED)
+async def ingest_webhook_batch(
+    batch: WebhookBatchRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Ingest a batch of webhooks, possibly for several subscriptions
+
+    Every subscription in the batch is resolved once, and all accepted payloads are
+    stored with multi-row inserts in a single transaction.
+
+    - **items**: List of webhooks, each with a `subscription_id`, `payload`, and
+      optional `event_type` and `signature`
+
+    Returns a per-item result in the same order as the request.
+    """
+    if len(batch.items) > settings.MAX_BATCH_INGEST_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch exceeds the maximum of {settings.MAX_BATCH_INGEST_SIZE} items"
+        )
+
+    subscriptions = await subscription_crud.get_subscriptions_by_ids_async(
+        db, (item.subscription_id for item in batch.items)
+    )
+
+    results: List[WebhookBatchItemResult] = []
+    accepted: List[WebhookBatchItemResult] = []
+    to_create: List[WebhookPayloadCreate] = []
+    for index, item in enumerate(batch.items):
+        result = WebhookBatchItemResult(
+            index=index, subscription_id=item.subscription_id, status="rejected"
+        )
+        results.append(result)
+
+        subscription = subscriptions.get(item.subscription_id)
+        if not subscription:
+            result.message = "Subscription not found"
+            continue
+
+        if not item.payload:
+            result.message = "Webhook payload cannot be empty"
+            continue
+
+        if subscription.event_types and item.event_type:
+            if not event_type_matches(subscription.event_types, item.event_type):
+                result.status = "skipped"
+                result.message = f"Subscription {item.subscription_id} does not listen for event {item.event_type}"
+                continue
+
+        if subscription.secret_key and item.signature:
+            if not _verify_signature(subscription.secret_key, item.payload, item.signature):
+                result.message = "Invalid signature"
+                continue
+
+        result.status = "accepted"
+        accepted.append(result)
+        to_create.append(WebhookPayloadCreate(
+            subscription_id=item.subscription_id,
+            payload=item.payload,
+            event_type=item.event_type
+        ))
+
+    # Save and queue everything for delivery in one transaction
+    webhook_ids = await webhook_crud.create_webhook_payloads_bulk_async(
+        db, to_create, {sid: subscription.secret_key for sid, subscription in subscriptions.items()}
+    )
+    for result, webhook_id in zip(accepted, webhook_ids):
+        result.webhook_id = webhook_id
+
+    return WebhookBatchResponse(
+        accepted=len(accepted),
+        skipped=sum(1 for result in results if result.status == "skipped"),
+        rejected=sum(1 for result in results if result.status == "rejected"),
+        results=results
+    )
+
+@router.post("/publish/{event_type}", status_code=status.HTTP_202_ACCEPTED)
+async def publish_event(
+    event_type: str,
+    webhook_data: WebhookRequestBody = Body(...),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Fan an event out to every subscription listening for its type
+
+    Subscriptions match on exact event types or wildcard patterns such as `order.*`;
+    subscriptions without event types receive every event. One webhook is queued per
+    matching subscription.
+
+    - **event_type**: The type of event being published
+    - **webhook_data**: The webhook payload data
+    """
+    if not webhook_data.payload:
+        raise HTTPException(status_code=422, detail="Webhook payload cannot be empty")
+
+    subscriptions = await subscription_crud.get_subscriptions_for_event_async(db, event_type)
+    webhook_ids = await webhook_crud.create_webhook_payloads_bulk_async(db, [
+        WebhookPayloadCreate(
+            subscription_id=subscription.id,
+            payload=webhook_data.payload,
+            event_type=event_type
+        )
+        for subscription in subscriptions
+    ], {subscription.id: subscription.secret_key for subscription in subscriptions})
+
+    return {
+        "status": "accepted" if webhook_ids else "skipped",
+        "event_type": event_type,
+        "deliveries": [
+            {"subscription_id": subscription.id, "webhook_id": webhook_id}
+            for subscription, webhook_id in zip(subscriptions, webhook_ids)
+        ],
+        "message": f"Event queued for {len(webhook_ids)} subscription(s)"
+    }
+
 @router.post("/ingest/{subscription_id}", status_code=status.HTTP_202_ACCEPTED)
 async def ingest_webhook(
     subscription_id: str,
     webhook_data: WebhookRequestBody = Body(...),
     x_webhook_event: Optional[str] = Header(None),
     x_hub_signature_256: Optional[str] = Header(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Ingest a webhook for a subscription
@@ -37,7 +182,7 @@ async def ingest_webhook(
     - **x_hub_signature_256**: (Optional) The HMAC SHA-256 signature of the payload
     """
     # Check if subscription exists
-    subscription = subscription_crud.get_subscription(db, subscription_id)
+    subscription = await subscription_crud.get_subscription_async(db, subscription_id)
     if not subscription:
         raise HTTPException(status_code=404, detail="Subscription not found")
     
@@ -46,7 +191,7 @@ async def ingest_webhook(
     
     # Event type filtering (bonus feature)
     if subscription.event_types and x_webhook_event:
-        if x_webhook_event not in subscription.event_types:
+        if not event_type_matches(subscription.event_types, x_webhook_event):
             return {
                 "status": "skipped", 
                 "message": f"Subscription {subscription_id} does not listen for event {x_webhook_event}"
@@ -54,21 +199,7 @@ async def ingest_webhook(
     
     # Signature verification (bonus feature)
     if subscription.secret_key and x_hub_signature_256:
-        # Convert payload to JSON string for signature verification
-        body = json.dumps(payload).encode('utf-8')
-        
-        expected_signature = hmac.new(
-            subscription.secret_key.encode('utf-8'),
-            body,
-            hashlib.sha256
-        ).hexdigest()
-        
-        # Remove "sha256=" prefix if present
-        received_signature = x_hub_signature_256
-        if received_signature.startswith("sha256="):
-            received_signature = received_signature[7:]
-        
-        if not hmac.compare_digest(expected_signature, received_signature):
+        if not _verify_signature(subscription.secret_key, payload, x_hub_signature_256):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid signature"
@@ -82,7 +213,7 @@ async def ingest_webhook(
     )
     
     # Save and queue for delivery
-    db_webhook = webhook_crud.create_webhook_payload(db, webhook_payload)
+    db_webhook = await webhook_crud.create_webhook_payload_async(db, webhook_payload, subscription.secret_key)
     
     return {
         "status": "accepted", 
@@ -92,21 +223,58 @@ async def ingest_webhook(
 
 
 @router.get("/{webhook_id}/status", response_model=List[DeliveryLog])
-def get_webhook_status(webhook_id: str, db: Session = Depends(get_db)):
+async def get_webhook_status(webhook_id: str, db: AsyncSession = Depends(get_async_db)):
     """
     Get the delivery status of a webhook
     """
     # Check if webhook exists
-    webhook = webhook_crud.get_webhook_payload(db, webhook_id)
+    webhook = await webhook_crud.get_webhook_payload_async(db, webhook_id)
     if not webhook:
         raise HTTPException(status_code=404, detail="Webhook not found")
     
     # Get all delivery attempts
-    delivery_logs = delivery_crud.get_delivery_logs(db, webhook_id)
+    delivery_logs = await delivery_crud.get_delivery_logs_async(db, webhook_id)
     
     return delivery_logs
 
 
+@router.get("/{webhook_id}/delivery", response_model=DeliveryStatus)
+async def get_webhook_delivery(webhook_id: str, db: AsyncSession = Depends(get_async_db)):
+    """
+    Get the current delivery state of a webhook along with its attempt history
+
+    The state comes from its delivery task, so deliveries that were never sent, are
+    waiting for a retry or failed for good show up as well; `history` lists every
+    attempt sent.
+    """
+    webhook = await webhook_crud.get_webhook_payload_async(db, webhook_id)
+    if not webhook:
+        raise HTTPException(status_code=404, detail="Webhook not found")
+    
+    task = await delivery_crud.get_delivery_task_async(db, webhook_id, webhook.subscription_id)
+    delivery_logs = await delivery_crud.get_delivery_logs_async(db, webhook_id)
+    subscription = await subscription_crud.get_subscription_async(db, webhook.subscription_id)
+
+    current = {}
+    if task is not None:
+        waiting = task.status in (ModelDeliveryStatus.PENDING, ModelDeliveryStatus.FAILED_ATTEMPT)
+        current = {
+            "current_status": task.status.value,
+            "attempt_number": task.attempt_number,
+            "status_code": task.status_code,
+            "error_details": task.error_details,
+            "next_attempt": task.next_attempt_at if waiting else None,
+        }
+    return DeliveryStatus(
+        webhook_id=webhook_id,
+        subscription_id=webhook.subscription_id,
+        target_url=subscription.target_url if subscription else None,
+        last_attempt=delivery_logs[-1].attempt_timestamp if delivery_logs else None,
+        history=[DeliveryLog.model_validate(log) for log in delivery_logs],
+        **current
+    )
+
+
 @router.get("/subscription/{subscription_id}", response_model=List[WebhookPayload])
 def get_subscription_webhooks(
     subscription_id: str, skip: int = 0, limit: int = 20, db: Session = Depends(get_db)
@@ -1,25 +1,201 @@
-import json
-from typing import Any, Dict, Optional
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 import redis
+import redis.asyncio as aioredis
 
 from app.core.config import settings
+from app.core.json_codec import codec
 
 # Create Redis connection pool
 redis_client = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
 
+# Create Redis connection pool for code running on the event loop
+async_redis_client = aioredis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+
+# Cached under `subscription:{id}` for IDs that do not exist, so that lookups of
+# unknown subscriptions do not reach the database until it expires
+SUBSCRIPTION_NOT_FOUND_VALUE = codec.dumps({"not_found": True})
+
+# Sorted set of delivery task IDs scored by due time (Redis scheduler backend)
+DELIVERY_SCHEDULE_KEY = "delivery_schedule"
+
+# Atomically take up to ARGV[2] IDs due by ARGV[1] and push their score to the lease
+# expiry ARGV[3], so a crashed worker's claims become due again on their own
+CLAIM_DUE_DELIVERIES_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, id in ipairs(due) do
+    redis.call('ZADD', KEYS[1], ARGV[3], id)
+end
+return due
+"""
+_claim_due_deliveries = async_redis_client.register_script(CLAIM_DUE_DELIVERIES_SCRIPT)
+
+# Circuit breakers of subscriptions whose endpoint keeps failing: a hash per subscription
+# (`circuit_breaker:{id}`) while it is not closed, and the set of those subscriptions
+CIRCUIT_BREAKER_KEY = "circuit_breaker:{}"
+CIRCUIT_BREAKERS_TRIPPED_KEY = "circuit_breakers:tripped"
+
+# Record one delivery result. KEYS: breaker hash, tripped set. ARGV: subscription ID,
+# success (1/0), now, failure threshold, failure window, base open seconds, max open
+# seconds, probe successes needed, ramp seconds. Returns the breaker's fields.
+RECORD_CIRCUIT_RESULT_SCRIPT = """
+local state = redis.call('HGET', KEYS[1], 'state') or 'closed'
+local now = tonumber(ARGV[3])
+
+local function trip(open_seconds)
+    redis.call('PERSIST', KEYS[1])
+    redis.call('HSET', KEYS[1], 'state', 'open', 'open_seconds', open_seconds,
+        'open_until', now + open_seconds, 'failures', 0, 'probes', 0, 'successes', 0)
+    redis.call('SADD', KEYS[2], ARGV[1])
+end
+
+local function longer_open()
+    local open_seconds = tonumber(redis.call('HGET', KEYS[1], 'open_seconds') or ARGV[6])
+    return math.min(open_seconds * 2, tonumber(ARGV[7]))
+end
+
+if ARGV[2] == '1' then
+    if state == 'closed' then
+        redis.call('DEL', KEYS[1])
+    elseif state == 'half_open' then
+        if tonumber(redis.call('HGET', KEYS[1], 'probes') or '0') > 0 then
+            redis.call('HINCRBY', KEYS[1], 'probes', -1)
+        end
+        if redis.call('HINCRBY', KEYS[1], 'successes', 1) >= tonumber(ARGV[8]) then
+            redis.call('HSET', KEYS[1], 'state', 'recovering', 'failures', 0,
+                'ramp_started', now, 'ramp_until', now + tonumber(ARGV[9]))
+        end
+    elseif state == 'recovering' then
+        if now >= tonumber(redis.call('HGET', KEYS[1], 'ramp_until')) then
+            redis.call('DEL', KEYS[1])
+            redis.call('SREM', KEYS[2], ARGV[1])
+        end
+    end
+elseif state == 'half_open' then
+    trip(longer_open())
+elseif state ~= 'open' then
+    local failures = redis.call('HINCRBY', KEYS[1], 'failures', 1)
+    if state == 'closed' and failures == 1 then
+        redis.call('EXPIRE', KEYS[1], ARGV[5])
+    end
+    if failures >= tonumber(ARGV[4]) then
+        trip(state == 'recovering' and longer_open() or tonumber(ARGV[6]))
+    end
+end
+return redis.call('HGETALL', KEYS[1])
+"""
+_record_circuit_result = async_redis_client.register_script(RECORD_CIRCUIT_RESULT_SCRIPT)
+
+# Ask to send one probe through a breaker that is not closed. KEYS: breaker hash.
+# ARGV: now, max concurrent probes, probe timeout. An open breaker turns half-open once
+# its open period is over. Returns {state, allowed (1/0)}.
+ACQUIRE_CIRCUIT_PROBE_SCRIPT = """
+local state = redis.call('HGET', KEYS[1], 'state')
+local now = tonumber(ARGV[1])
+if not state or state == 'closed' then
+    return {'closed', 1}
+end
+if state == 'open' then
+    if now < tonumber(redis.call('HGET', KEYS[1], 'open_until')) then
+        return {'open', 0}
+    end
+    redis.call('HSET', KEYS[1], 'state', 'half_open', 'probes', 0, 'successes', 0, 'probe_until', 0)
+    state = 'half_open'
+end
+if state == 'half_open' then
+    local probes = tonumber(redis.call('HGET', KEYS[1], 'probes') or '0')
+    if probes >= tonumber(ARGV[2]) then
+        -- Probes whose worker never reported back stop counting after the timeout
+        if now < tonumber(redis.call('HGET', KEYS[1], 'probe_until') or '0') then
+            return {'half_open', 0}
+        end
+        probes = 0
+    end
+    redis.call('HSET', KEYS[1], 'probes', probes + 1, 'probe_until', now + tonumber(ARGV[3]))
+end
+return {state, 1}
+"""
+_acquire_circuit_probe = async_redis_client.register_script(ACQUIRE_CIRCUIT_PROBE_SCRIPT)
+
+# Delivery counters of one subscription, a hash with SUBSCRIPTION_COUNTER_FIELDS
+SUBSCRIPTION_COUNTERS_KEY = "subscription_counters:{}"
+SUBSCRIPTION_COUNTER_FIELDS = ("total", "success", "failure", "pending")
+
+# Add deltas to the counters of several subscriptions. KEYS: counter hashes. ARGV: one
+# delta per field of SUBSCRIPTION_COUNTER_FIELDS for each key, in order. Hashes that
+# do not exist are skipped: they are counted from the database when next read.
+ADD_SUBSCRIPTION_COUNTERS_SCRIPT = """
+local fields = {'total', 'success', 'failure', 'pending'}
+for i, key in ipairs(KEYS) do
+    if redis.call('EXISTS', key) == 1 then
+        for j, field in ipairs(fields) do
+            local delta = tonumber(ARGV[(i - 1) * #fields + j])
+            if delta ~= 0 then
+                redis.call('HINCRBY', key, field, delta)
+            end
+        end
+    end
+end
+return 0
+"""
+_add_subscription_counters_async = async_redis_client.register_script(ADD_SUBSCRIPTION_COUNTERS_SCRIPT)
+
+# Store the counters of a subscription unless they exist. KEYS: counter hash. ARGV:
+# field, value pairs. Returns 1 if stored.
+SEED_SUBSCRIPTION_COUNTERS_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+redis.call('HSET', KEYS[1], unpack(ARGV))
+return 1
+"""
+_seed_subscription_counters = redis_client.register_script(SEED_SUBSCRIPTION_COUNTERS_SCRIPT)
+
+# Latency histogram of one subscription, metric and window (its UNIX start time): a hash
+# of bucket counts, plus `n` and `sum` (see app.services.latency)
+LATENCY_HISTOGRAM_KEY = "latency:{}:{}:{}"
+
+# Pub/sub channel announcing when new deliveries become due; the message is the due
+# time as a UNIX timestamp, so idle workers can wake right when it arrives
+DELIVERY_WAKEUP_CHANNEL = "deliveries:wakeup"
+
+def _circuit_breaker_state(breaker: Dict[str, str]) -> Dict[str, Any]:
+    """Decode a breaker hash; one without a state (or no hash at all) is closed"""
+    state = {key: float(value) for key, value in breaker.items() if key != "state"}
+    state["state"] = breaker.get("state", "closed")
+    return state
+
+def _counter_deltas(deltas: Dict[str, Dict[str, int]]) -> Tuple[List[str], List[int]]:
+    """KEYS and ARGV of ADD_SUBSCRIPTION_COUNTERS_SCRIPT for per-subscription deltas"""
+    keys, args = [], []
+    for subscription_id, counts in deltas.items():
+        keys.append(SUBSCRIPTION_COUNTERS_KEY.format(subscription_id))
+        args.extend(counts.get(field, 0) for field in SUBSCRIPTION_COUNTER_FIELDS)
+    return keys, args
+
+def _decode_counters(counters: Dict[str, str]) -> Optional[Dict[str, int]]:
+    """Decode a counter hash; None if there is none"""
+    if not counters:
+        return None
+    return {field: int(counters.get(field, 0)) for field in SUBSCRIPTION_COUNTER_FIELDS}
+
+def _score(due_at: datetime) -> float:
+    """Sorted-set score for a naive UTC datetime"""
+    return due_at.replace(tzinfo=timezone.utc).timestamp()
+
 class RedisCache:
     @staticmethod
     def get(key: str) -> Optional[Dict[str, Any]]:
         """Get data from Redis cache"""
         data = redis_client.get(key)
         if data:
-            return json.loads(data)
+            return codec.loads(data)
         return None
 
     @staticmethod
     def set(key: str, value: Dict[str, Any], expiry: int = 3600) -> bool:
         """Set data in Redis cache with expiry in seconds"""
-        return redis_client.setex(key, expiry, json.dumps(value))
+        return redis_client.setex(key, expiry, codec.dumpb(value))
 
     @staticmethod
     def delete(key: str) -> bool:
@@ -42,4 +218,319 @@ class RedisCache:
     def delete_subscription(subscription_id: str) -> bool:
         """Remove subscription from cache"""
         key = f"subscription:{subscription_id}"
-        return RedisCache.delete(key)
\ No newline at end of file
+        return RedisCache.delete(key)
+
+    @staticmethod
+    def get_subscription_counters(subscription_id: str) -> Optional[Dict[str, int]]:
+        """Get the delivery counters of a subscription, or None if they are not kept yet"""
+        return _decode_counters(redis_client.hgetall(SUBSCRIPTION_COUNTERS_KEY.format(subscription_id)))
+
+    @staticmethod
+    def seed_subscription_counters(subscription_id: str, counters: Dict[str, int]) -> bool:
+        """Start keeping the delivery counters of a subscription, unless another process already did"""
+        args = [item for field in SUBSCRIPTION_COUNTER_FIELDS for item in (field, counters[field])]
+        return bool(_seed_subscription_counters(keys=[SUBSCRIPTION_COUNTERS_KEY.format(subscription_id)], args=args))
+
+    @staticmethod
+    def delete_subscription_counters(subscription_id: str) -> bool:
+        """Stop keeping the delivery counters of a subscription"""
+        return RedisCache.delete(SUBSCRIPTION_COUNTERS_KEY.format(subscription_id))
+
+    @staticmethod
+    def get_subscriptions(subscription_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Get several subscriptions from cache in one round-trip"""
+        subscription_ids = list(subscription_ids)
+        if not subscription_ids:
+            return {}
+        values = redis_client.mget([f"subscription:{sid}" for sid in subscription_ids])
+        return {
+            sid: codec.loads(data)
+            for sid, data in zip(subscription_ids, values)
+            if data
+        }
+
+    @staticmethod
+    def set_subscriptions(subscriptions: Dict[str, Dict[str, Any]]) -> None:
+        """Cache several subscriptions in one pipelined round-trip"""
+        if not subscriptions:
+            return
+        pipe = redis_client.pipeline(transaction=False)
+        for sid, data in subscriptions.items():
+            pipe.setex(f"subscription:{sid}", 3600, codec.dumpb(data))
+        pipe.execute()
+
+    @staticmethod
+    def set_subscriptions_not_found(subscription_ids: Iterable[str]) -> None:
+        """Remember briefly that subscriptions do not exist, without replacing cached ones"""
+        subscription_ids = list(subscription_ids)
+        if not subscription_ids:
+            return
+        pipe = redis_client.pipeline(transaction=False)
+        for sid in subscription_ids:
+            pipe.set(
+                f"subscription:{sid}", SUBSCRIPTION_NOT_FOUND_VALUE, ex=settings.SUBSCRIPTION_NOT_FOUND_TTL, nx=True
+            )
+        pipe.execute()
+
+    @staticmethod
+    def get_subscription_index_version() -> int:
+        """Get the version of the subscriptions table seen by the event type index"""
+        return int(redis_client.get("subscriptions:index_version") or 0)
+
+    @staticmethod
+    def bump_subscription_index_version() -> int:
+        """Signal that subscriptions changed and event type indexes must be refreshed"""
+        return redis_client.incr("subscriptions:index_version")
+
+    @staticmethod
+    def _get_reported_stats(prefix: str) -> Dict[str, Dict[str, Any]]:
+        """Get every live `{prefix}:{id}` stats entry, keyed by ID"""
+        keys = list(redis_client.scan_iter(match=f"{prefix}:*"))
+        if not keys:
+            return {}
+        return {
+            key.split(":", 1)[1]: codec.loads(data)
+            for key, data in zip(keys, redis_client.mget(keys))
+            if data
+        }
+
+    @staticmethod
+    def get_worker_stats() -> Dict[str, Dict[str, Any]]:
+        """Get the latest stats reported by every live worker"""
+        return RedisCache._get_reported_stats("worker_stats")
+
+    @staticmethod
+    def get_circuit_breaker(subscription_id: str) -> Dict[str, Any]:
+        """Get the circuit breaker of one subscription"""
+        breaker = redis_client.hgetall(CIRCUIT_BREAKER_KEY.format(subscription_id))
+        return _circuit_breaker_state(breaker)
+
+    @staticmethod
+    def get_circuit_breakers() -> Dict[str, Dict[str, Any]]:
+        """Get every circuit breaker that is not closed, keyed by subscription ID"""
+        subscription_ids = sorted(redis_client.smembers(CIRCUIT_BREAKERS_TRIPPED_KEY))
+        pipe = redis_client.pipeline(transaction=False)
+        for sid in subscription_ids:
+            pipe.hgetall(CIRCUIT_BREAKER_KEY.format(sid))
+        return {
+            sid: _circuit_breaker_state(breaker)
+            for sid, breaker in zip(subscription_ids, pipe.execute())
+            if breaker
+        }
+
+    @staticmethod
+    def get_latency_histograms(keys: List[Tuple[str, str, int]]) -> List[Dict[str, str]]:
+        """Get the latency histograms of several `(subscription_id, metric, window)`, in order"""
+        pipe = redis_client.pipeline(transaction=False)
+        for key in keys:
+            pipe.hgetall(LATENCY_HISTOGRAM_KEY.format(*key))
+        return pipe.execute()
+
+    @staticmethod
+    def set_supervisor_stats(supervisor_id: str, stats: Dict[str, Any], expiry: int) -> bool:
+        """Publish a worker supervisor's health; it disappears if the supervisor stops reporting"""
+        return RedisCache.set(f"supervisor_stats:{supervisor_id}", stats, expiry)
+
+    @staticmethod
+    def get_supervisor_stats() -> Dict[str, Dict[str, Any]]:
+        """Get the latest health reported by every live worker supervisor"""
+        return RedisCache._get_reported_stats("supervisor_stats")
+
+
+class AsyncRedisCache:
+    """Non-blocking counterpart of RedisCache for async endpoints and the worker"""
+
+    @staticmethod
+    async def get(key: str) -> Optional[Dict[str, Any]]:
+        """Get data from Redis cache"""
+        data = await async_redis_client.get(key)
+        if data:
+            return codec.loads(data)
+        return None
+
+    @staticmethod
+    async def set(key: str, value: Dict[str, Any], expiry: int = 3600) -> bool:
+        """Set data in Redis cache with expiry in seconds"""
+        return await async_redis_client.setex(key, expiry, codec.dumpb(value))
+
+    @staticmethod
+    async def delete(key: str) -> bool:
+        """Delete key from Redis cache"""
+        return await async_redis_client.delete(key) > 0
+
+    @staticmethod
+    async def acquire_lock(key: str, owner: str, expiry: int) -> bool:
+        """Take a lock unless someone else holds it; it is released by expiring after `expiry` seconds"""
+        return bool(await async_redis_client.set(key, owner, nx=True, ex=expiry))
+
+    @staticmethod
+    async def get_subscription(subscription_id: str) -> Optional[Dict[str, Any]]:
+        """Get subscription details from cache"""
+        return await AsyncRedisCache.get(f"subscription:{subscription_id}")
+
+    @staticmethod
+    async def set_subscription(subscription_id: str, subscription_data: Dict[str, Any]) -> bool:
+        """Cache subscription details"""
+        return await AsyncRedisCache.set(f"subscription:{subscription_id}", subscription_data, 3600)
+
+    @staticmethod
+    async def get_subscriptions(subscription_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Get several subscriptions from cache in one round-trip"""
+        subscription_ids = list(subscription_ids)
+        if not subscription_ids:
+            return {}
+        values = await async_redis_client.mget([f"subscription:{sid}" for sid in subscription_ids])
+        return {
+            sid: codec.loads(data)
+            for sid, data in zip(subscription_ids, values)
+            if data
+        }
+
+    @staticmethod
+    async def set_subscriptions(subscriptions: Dict[str, Dict[str, Any]]) -> None:
+        """Cache several subscriptions in one pipelined round-trip"""
+        if not subscriptions:
+            return
+        pipe = async_redis_client.pipeline(transaction=False)
+        for sid, data in subscriptions.items():
+            pipe.setex(f"subscription:{sid}", 3600, codec.dumpb(data))
+        await pipe.execute()
+
+    @staticmethod
+    async def set_subscriptions_not_found(subscription_ids: Iterable[str]) -> None:
+        """Remember briefly that subscriptions do not exist, without replacing cached ones"""
+        subscription_ids = list(subscription_ids)
+        if not subscription_ids:
+            return
+        pipe = async_redis_client.pipeline(transaction=False)
+        for sid in subscription_ids:
+            pipe.set(
+                f"subscription:{sid}", SUBSCRIPTION_NOT_FOUND_VALUE, ex=settings.SUBSCRIPTION_NOT_FOUND_TTL, nx=True
+            )
+        await pipe.execute()
+
+    @staticmethod
+    async def get_subscription_index_version() -> int:
+        """Get the version of the subscriptions table seen by the event type index"""
+        return int(await async_redis_client.get("subscriptions:index_version") or 0)
+
+    @staticmethod
+    async def set_worker_stats(worker_id: str, stats: Dict[str, Any], expiry: int) -> bool:
+        """Publish a worker's stats; they disappear if the worker stops reporting"""
+        return await AsyncRedisCache.set(f"worker_stats:{worker_id}", stats, expiry)
+
+    @staticmethod
+    async def get_subscription_counters(subscription_ids: Iterable[str]) -> Dict[str, Optional[Dict[str, int]]]:
+        """Get the delivery counters of several subscriptions, None for those not kept yet"""
+        subscription_ids = list(subscription_ids)
+        pipe = async_redis_client.pipeline(transaction=False)
+        for sid in subscription_ids:
+            pipe.hgetall(SUBSCRIPTION_COUNTERS_KEY.format(sid))
+        return {sid: _decode_counters(counters) for sid, counters in zip(subscription_ids, await pipe.execute())}
+
+    @staticmethod
+    async def set_subscription_counters(counters: Dict[str, Dict[str, int]]) -> None:
+        """Overwrite the delivery counters of several subscriptions"""
+        if not counters:
+            return
+        pipe = async_redis_client.pipeline(transaction=False)
+        for sid, values in counters.items():
+            pipe.hset(SUBSCRIPTION_COUNTERS_KEY.format(sid), mapping=values)
+        await pipe.execute()
+
+    @staticmethod
+    async def add_subscription_counters(deltas: Dict[str, Dict[str, int]]) -> None:
+        """Add per-subscription deltas to the counters kept"""
+        if deltas:
+            keys, args = _counter_deltas(deltas)
+            await _add_subscription_counters_async(keys=keys, args=args)
+
+    @staticmethod
+    async def add_latency_histograms(histograms: Dict[Tuple[str, str, int], Dict[str, float]], expiry: int) -> None:
+        """Add histogram counts to the latency histograms of `(subscription_id, metric, window)`"""
+        pipe = async_redis_client.pipeline(transaction=False)
+        for key, fields in histograms.items():
+            name = LATENCY_HISTOGRAM_KEY.format(*key)
+            for field, value in fields.items():
+                if field == "sum":
+                    pipe.hincrbyfloat(name, field, value)
+                else:
+                    pipe.hincrby(name, field, value)
+            pipe.expire(name, expiry)
+        await pipe.execute()
+
+    @staticmethod
+    async def schedule_deliveries(due_times: Dict[int, datetime], only_new: bool = False) -> None:
+        """Add or move deliveries in the schedule; with `only_new`, existing entries are kept"""
+        if due_times:
+            await async_redis_client.zadd(
+                DELIVERY_SCHEDULE_KEY,
+                {str(task_id): _score(due_at) for task_id, due_at in due_times.items()},
+                nx=only_new
+            )
+
+    @staticmethod
+    async def unschedule_deliveries(task_ids: Iterable[int]) -> None:
+        """Remove finished deliveries from the schedule"""
+        task_ids = [str(task_id) for task_id in task_ids]
+        if task_ids:
+            await async_redis_client.zrem(DELIVERY_SCHEDULE_KEY, *task_ids)
+
+    @staticmethod
+    async def notify_deliveries_due(due_at: datetime) -> int:
+        """Wake idle workers for deliveries due at `due_at`"""
+        return await async_redis_client.publish(DELIVERY_WAKEUP_CHANNEL, _score(due_at))
+
+    @staticmethod
+    async def claim_due_deliveries(limit: int, lease_expires_at: datetime) -> List[int]:
+        """Atomically take due delivery IDs, rescheduling them at the lease expiry"""
+        now = datetime.utcnow()
+        task_ids = await _claim_due_deliveries(
+            keys=[DELIVERY_SCHEDULE_KEY], args=[_score(now), limit, _score(lease_expires_at)]
+        )
+        return [int(task_id) for task_id in task_ids]
+
+    @staticmethod
+    async def get_circuit_breakers() -> Dict[str, Dict[str, Any]]:
+        """Get every circuit breaker that is not closed, keyed by subscription ID"""
+        subscription_ids = list(await async_redis_client.smembers(CIRCUIT_BREAKERS_TRIPPED_KEY))
+        pipe = async_redis_client.pipeline(transaction=False)
+        for sid in subscription_ids:
+            pipe.hgetall(CIRCUIT_BREAKER_KEY.format(sid))
+        breakers = await pipe.execute()
+        stale = [sid for sid, breaker in zip(subscription_ids, breakers) if not breaker]
+        if stale:
+            await async_redis_client.srem(CIRCUIT_BREAKERS_TRIPPED_KEY, *stale)
+        return {
+            sid: _circuit_breaker_state(breaker)
+            for sid, breaker in zip(subscription_ids, breakers)
+            if breaker
+        }
+
+    @staticmethod
+    async def record_circuit_result(subscription_id: str, success: bool, now: float) -> Dict[str, Any]:
+        """Count a delivery success or failure against a subscription's breaker; returns its new state"""
+        fields = await _record_circuit_result(
+            keys=[CIRCUIT_BREAKER_KEY.format(subscription_id), CIRCUIT_BREAKERS_TRIPPED_KEY],
+            args=[
+                subscription_id, int(success), now,
+                settings.CIRCUIT_FAILURE_THRESHOLD, settings.CIRCUIT_FAILURE_WINDOW,
+                settings.CIRCUIT_OPEN_SECONDS, settings.CIRCUIT_MAX_OPEN_SECONDS,
+                settings.CIRCUIT_PROBE_SUCCESSES, settings.CIRCUIT_RAMP_SECONDS,
+            ]
+        )
+        return _circuit_breaker_state(dict(zip(fields[::2], fields[1::2])))
+
+    @staticmethod
+    async def acquire_circuit_probe(subscription_id: str, now: float) -> Tuple[str, bool]:
+        """Try to send a probe through a subscription's breaker; returns its state and whether allowed"""
+        state, allowed = await _acquire_circuit_probe(
+            keys=[CIRCUIT_BREAKER_KEY.format(subscription_id)],
+            args=[now, settings.CIRCUIT_HALF_OPEN_PROBES, settings.DELIVERY_TIMEOUT * 2]
+        )
+        return state, bool(allowed)
+
+    @staticmethod
+    async def get_schedule_size() -> int:
+        """Number of deliveries in the schedule"""
+        return await async_redis_client.zcard(DELIVERY_SCHEDULE_KEY)
\ No newline at end of file
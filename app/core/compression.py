@@ -0,0 +1,95 @@
+import gzip
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+try:
+    import zstandard
+except ImportError:  # Optional; gzip is always available
+    zstandard = None
+
+ENCODINGS = ("gzip", "zstd")
+
+class CompressionStats:
+    """Bytes and time spent compressing and decompressing in this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.compressed = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.compress_seconds = 0.0
+        self.decompressed = 0
+        self.decompress_seconds = 0.0
+
+    def record_compress(self, bytes_in: int, bytes_out: int, seconds: float) -> None:
+        with self._lock:
+            self.compressed += 1
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+            self.compress_seconds += seconds
+
+    def record_decompress(self, seconds: float) -> None:
+        with self._lock:
+            self.decompressed += 1
+            self.decompress_seconds += seconds
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "compressed": self.compressed,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "ratio": round(self.bytes_in / self.bytes_out, 2) if self.bytes_out else None,
+            "compress_ms_avg": round(self.compress_seconds / self.compressed * 1000, 3) if self.compressed else None,
+            "decompressed": self.decompressed,
+            "decompress_ms_avg": (
+                round(self.decompress_seconds / self.decompressed * 1000, 3) if self.decompressed else None
+            ),
+        }
+
+compression_stats = CompressionStats()
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """Compress data with `gzip` or `zstd`"""
+    start = time.perf_counter()
+    if encoding == "gzip":
+        # mtime=0 keeps the output deterministic; level 6 trades little ratio for speed
+        compressed = gzip.compress(data, compresslevel=6, mtime=0)
+    elif encoding == "zstd" and zstandard is not None:
+        compressed = zstandard.ZstdCompressor(level=3).compress(data)
+    else:
+        raise ValueError(f"Unsupported compression {encoding!r}")
+    compression_stats.record_compress(len(data), len(compressed), time.perf_counter() - start)
+    return compressed
+
+def decompress(data: bytes, encoding: Optional[str]) -> bytes:
+    """Undo `compress`; data without an encoding is returned as is"""
+    if not encoding:
+        return data
+    start = time.perf_counter()
+    if encoding == "gzip":
+        decompressed = gzip.decompress(data)
+    elif encoding == "zstd" and zstandard is not None:
+        decompressed = zstandard.ZstdDecompressor().decompress(data)
+    else:
+        raise ValueError(f"Unsupported compression {encoding!r}")
+    compression_stats.record_decompress(time.perf_counter() - start)
+    return decompressed
+
+def compress_for_storage(body: bytes) -> Tuple[bytes, Optional[str]]:
+    """
+    Compress a webhook body for storage if it reaches PAYLOAD_COMPRESSION_THRESHOLD
+
+    Returns the bytes to store and their encoding, None if stored uncompressed.
+    """
+    encoding = settings.PAYLOAD_COMPRESSION
+    if encoding == "none" or len(body) < settings.PAYLOAD_COMPRESSION_THRESHOLD:
+        return body, None
+    if encoding == "zstd" and zstandard is None:
+        encoding = "gzip"
+    compressed = compress(body, encoding)
+    if len(compressed) >= len(body):
+        return body, None
+    return compressed, encoding
@@ -8,6 +8,9 @@ class Settings(BaseSettings):
 
     DATABASE_URL: str = "postgresql://postgres:postgres@db:5432/webhooks"
     TEST_DATABASE_URL: Optional[str] = None
+    ASYNC_DATABASE_URL: Optional[str] = None  # Defaults to DATABASE_URL with the asyncpg driver
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 20
 
     REDIS_URL: str = "redis://redis:6379/0"
     REDIS_USERNAME: Optional[str] = None
@@ -23,9 +26,82 @@ class Settings(BaseSettings):
         4: 300,
         5: 900,
     }
+    RETRY_JITTER: str = "full"  # "full" or "none"
+    RETRY_MAX_DELAY: int = 900
+    RETRY_AFTER_MAX: int = 3600  # Longest Retry-After from a subscriber that is honored
     DELIVERY_TIMEOUT: int = 10
 
+    # Outbound HTTP connection pool (per worker process)
+    HTTP_POOL_LIMIT: int = 200
+    HTTP_POOL_LIMIT_PER_HOST: int = 20
+    HTTP_DNS_CACHE_TTL: int = 300
+    HTTP_KEEPALIVE_TIMEOUT: float = 30.0
+
+    # Per-destination limits (per worker process); both adapt down on 429/503
+    HOST_MAX_CONCURRENCY: int = 10
+    HOST_RATE_LIMIT: float = 50.0  # Requests per second
+    HOST_RATE_BURST: float = 50.0
+    HOST_MIN_RATE: float = 0.5
+    HOST_DEFER_THRESHOLD: float = 5.0  # Longer waits hand the delivery back to the schedule
+
+    # Per-subscription circuit breaker, shared by all workers through Redis
+    CIRCUIT_FAILURE_THRESHOLD: int = 5  # Failures within the window that open the breaker
+    CIRCUIT_FAILURE_WINDOW: int = 60
+    CIRCUIT_OPEN_SECONDS: int = 30  # Doubled after each failed probe...
+    CIRCUIT_MAX_OPEN_SECONDS: int = 600  # ...up to this
+    CIRCUIT_HALF_OPEN_PROBES: int = 1  # Concurrent probe requests while half-open
+    CIRCUIT_PROBE_SUCCESSES: int = 2  # Successful probes before traffic ramps back up
+    CIRCUIT_RAMP_SECONDS: int = 60  # Slow start: share of deliveries let through grows to 100%
+    CIRCUIT_REFRESH_INTERVAL: float = 1.0  # How often workers reload breakers that are not closed
+
+    WORKER_STATS_INTERVAL: int = 15
+    WORKER_PROCESSES: int = 1  # Default for `python -m app.worker --processes`
+    WORKER_CONCURRENCY: int = 50  # Concurrent outbound deliveries per worker process
+    WORKER_QUEUE_SIZE: int = 200  # Claimed deliveries prefetched ahead of the consumers
+    RESULT_FLUSH_BATCH_SIZE: int = 200  # Write back delivery outcomes every N results...
+    RESULT_FLUSH_INTERVAL_MS: int = 200  # ...or every M milliseconds, whichever comes first
+    DELIVERY_LEASE_SECONDS: int = 120  # How long a claimed delivery stays reserved for one worker
+
+    # Where workers find due deliveries: "database" (poll delivery_tasks) or "redis" (sorted set)
+    SCHEDULER_BACKEND: str = "database"
+    SCHEDULER_RECONCILE_INTERVAL: int = 60  # Seconds between sweeps for rows missing from the Redis schedule
+    SCHEDULER_RECONCILE_GRACE: int = 30  # Only sweep rows overdue by at least this many seconds
+
+    MAX_BATCH_INGEST_SIZE: int = 1000
+
+    # Defaults for subscriptions receiving batched deliveries (`batch_delivery`)
+    BATCH_DELIVERY_MAX_SIZE: int = 100  # Webhooks per request
+    BATCH_DELIVERY_MAX_BYTES: int = 1_000_000  # Uncompressed request body size
+    BATCH_DELIVERY_LINGER_MS: int = 200  # How long the first webhook of a batch waits for more
+
+    # In-process subscription cache in front of Redis (per API/worker process)
+    SUBSCRIPTION_LOCAL_CACHE_SIZE: int = 10000
+    SUBSCRIPTION_LOCAL_CACHE_TTL: int = 30  # Bounds staleness if an invalidation is missed
+    SUBSCRIPTION_NOT_FOUND_TTL: int = 60  # How long lookups of unknown subscription IDs are cached
+
+    JSON_CODEC: str = "auto"  # "auto" (orjson when installed), "orjson" or "stdlib"
+
+    # Webhook bodies of at least PAYLOAD_COMPRESSION_THRESHOLD bytes are stored compressed
+    PAYLOAD_COMPRESSION: str = "gzip"  # "gzip", "zstd" (needs the zstandard package) or "none"
+    PAYLOAD_COMPRESSION_THRESHOLD: int = 4096
+
     LOG_RETENTION_HOURS: int = 72
+    PARTITION_PRECREATE_DAYS: int = 7  # Daily delivery_logs partitions created ahead of time
+
+    # Retention pass, run by one worker at a time
+    RETENTION_INTERVAL: int = 3600  # Seconds between passes across all workers
+    RETENTION_CHUNK_SIZE: int = 1000  # Rows deleted (or tasks and payloads scanned) per statement
+    RETENTION_CHUNK_PAUSE_MS: int = 50  # Pause between chunks, leaving room for delivery traffic
+    RETENTION_TIME_BUDGET: int = 120  # Seconds a pass may run; the next pass resumes where it stopped
+
+    # Per-subscription delivery counters in Redis, recounted by one worker at a time
+    SUBSCRIPTION_STATS_RECONCILE_INTERVAL: int = 900  # Seconds between recounts across all workers
+    SUBSCRIPTION_STATS_RECONCILE_CHUNK_SIZE: int = 500  # Subscriptions recounted per query
+
+    # Per-subscription latency histograms (queue wait and HTTP round-trip) in Redis
+    LATENCY_WINDOW_SECONDS: int = 300  # Each window has its own histograms
+    LATENCY_RETENTION_HOURS: int = 24  # How long a window's histograms are kept
+    LATENCY_FLUSH_INTERVAL: int = 10  # Seconds between flushes of a worker's histograms
 
     SECRET_KEY: str = "your-local-dev-secret-key-change-in-production"
     DEBUG: bool = True
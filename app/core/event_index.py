@@ -0,0 +1,144 @@
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+WILDCARD = "*"
+
+def _split(event_type: str) -> List[str]:
+    return event_type.split(".")
+
+def event_type_matches(patterns: Optional[Iterable[str]], event_type: str) -> bool:
+    """
+    Check whether an event type matches any of a subscription's patterns
+
+    A trailing `*` segment matches one or more remaining segments (`order.*` matches
+    `order.created` and `order.item.added`), a `*` in any other position matches exactly
+    one segment, and a bare `*` matches everything.
+    """
+    segments = _split(event_type)
+    for pattern in patterns or ():
+        if pattern == WILDCARD:
+            return True
+        parts = _split(pattern)
+        if parts[-1] == WILDCARD:
+            parts = parts[:-1]
+            if len(segments) <= len(parts):
+                continue
+            candidate = segments[:len(parts)]
+        elif len(segments) != len(parts):
+            continue
+        else:
+            candidate = segments
+        if all(part == WILDCARD or part == segment for part, segment in zip(parts, candidate)):
+            return True
+    return False
+
+class _TrieNode:
+    __slots__ = ("children", "exact", "prefix")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.exact: Set[str] = set()   # Patterns ending at this node
+        self.prefix: Set[str] = set()  # Patterns ending at this node followed by `.*`
+
+class EventTypeIndex:
+    """
+    In-memory index from event type patterns to subscription IDs
+
+    Patterns are compiled into a trie over dot-separated segments, so a lookup costs
+    O(segments) regardless of the number of subscriptions. Subscriptions without
+    event types listen for every event, like they do on single-subscription ingest.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._root = _TrieNode()
+        self._catch_all: Set[str] = set()
+        self._patterns: Dict[str, List[str]] = {}
+        self.version: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def rebuild(self, subscriptions: Iterable[Tuple[str, Optional[List[str]]]], version: Optional[int] = None) -> None:
+        """Replace the whole index with `(subscription_id, event_types)` pairs"""
+        with self._lock:
+            self._root = _TrieNode()
+            self._catch_all = set()
+            self._patterns = {}
+            for subscription_id, event_types in subscriptions:
+                self._add(subscription_id, event_types)
+            self.version = version
+
+    def add(self, subscription_id: str, event_types: Optional[List[str]]) -> None:
+        """Insert or replace the patterns of one subscription"""
+        with self._lock:
+            self._remove(subscription_id)
+            self._add(subscription_id, event_types)
+
+    def remove(self, subscription_id: str) -> None:
+        """Drop a subscription from the index"""
+        with self._lock:
+            self._remove(subscription_id)
+
+    def match(self, event_type: str) -> Set[str]:
+        """Return the IDs of all subscriptions listening for an event type"""
+        with self._lock:
+            matched = set(self._catch_all)
+            nodes = [self._root]
+            for segment in _split(event_type):
+                next_nodes = []
+                for node in nodes:
+                    # A prefix pattern here still has at least this segment left to match
+                    matched.update(node.prefix)
+                    child = node.children.get(segment)
+                    if child is not None:
+                        next_nodes.append(child)
+                    child = node.children.get(WILDCARD)
+                    if child is not None and segment != WILDCARD:
+                        next_nodes.append(child)
+                nodes = next_nodes
+                if not nodes:
+                    break
+            for node in nodes:
+                matched.update(node.exact)
+            return matched
+
+    def _add(self, subscription_id: str, event_types: Optional[List[str]]) -> None:
+        patterns = list(event_types or [])
+        self._patterns[subscription_id] = patterns
+        if not patterns or WILDCARD in patterns:
+            self._catch_all.add(subscription_id)
+            return
+        for pattern in patterns:
+            node, is_prefix = self._walk(pattern, create=True)
+            (node.prefix if is_prefix else node.exact).add(subscription_id)
+
+    def _remove(self, subscription_id: str) -> None:
+        patterns = self._patterns.pop(subscription_id, None)
+        if patterns is None:
+            return
+        self._catch_all.discard(subscription_id)
+        for pattern in patterns:
+            if pattern == WILDCARD:
+                continue
+            node, is_prefix = self._walk(pattern, create=False)
+            if node is not None:
+                (node.prefix if is_prefix else node.exact).discard(subscription_id)
+
+    def _walk(self, pattern: str, create: bool) -> Tuple[Optional[_TrieNode], bool]:
+        parts = _split(pattern)
+        is_prefix = len(parts) > 1 and parts[-1] == WILDCARD
+        if is_prefix:
+            parts = parts[:-1]
+        node = self._root
+        for part in parts:
+            child = node.children.get(part)
+            if child is None:
+                if not create:
+                    return None, is_prefix
+                child = node.children[part] = _TrieNode()
+            node = child
+        return node, is_prefix
+
+# Process-wide index of subscription event types
+event_index = EventTypeIndex()
\ No newline at end of file
@@ -0,0 +1,117 @@
+import argparse
+import json
+import logging
+import time
+from typing import Any, Dict, Union
+
+from starlette.responses import JSONResponse
+
+from app.core.config import settings
+
+try:
+    import orjson
+except ImportError:  # Optional speedup; the stdlib codec is used without it
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+class StdlibJSONCodec:
+    """JSON codec built on the standard library `json` module"""
+    name = "stdlib"
+
+    def dumps(self, obj: Any) -> str:
+        return json.dumps(obj)
+
+    def dumpb(self, obj: Any) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return json.loads(data)
+
+class ORJSONCodec:
+    """
+    JSON codec built on orjson, several times faster than the stdlib on large documents
+
+    Output is compact (no spaces after separators) and UTF-8 rather than ASCII-escaped.
+    Values orjson rejects, such as integers beyond 64 bits, are encoded with the stdlib.
+    """
+    name = "orjson"
+    _options = orjson.OPT_NON_STR_KEYS if orjson else 0
+
+    def dumps(self, obj: Any) -> str:
+        return self.dumpb(obj).decode("utf-8")
+
+    def dumpb(self, obj: Any) -> bytes:
+        try:
+            return orjson.dumps(obj, option=self._options)
+        except TypeError:  # orjson.JSONEncodeError
+            return json.dumps(obj).encode("utf-8")
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return orjson.loads(data)
+
+def create_codec(name: str = "auto"):
+    """Build the codec named by JSON_CODEC: `orjson`, `stdlib`, or `auto` for orjson when installed"""
+    if name == "stdlib" or (name == "auto" and orjson is None):
+        return StdlibJSONCodec()
+    if name in ("auto", "orjson"):
+        if orjson is None:
+            raise ValueError("JSON_CODEC is orjson, but orjson is not installed")
+        return ORJSONCodec()
+    raise ValueError(f"Unknown JSON codec {name!r}, expected auto, orjson or stdlib")
+
+# Codec used by the cache, deliveries and API responses
+codec = create_codec(settings.JSON_CODEC)
+
+class CodecJSONResponse(JSONResponse):
+    """Default API response class, rendering with the configured codec"""
+
+    def render(self, content: Any) -> bytes:
+        return codec.dumpb(content)
+
+def benchmark(
+    codec_names=("stdlib", "orjson"), sizes_kb=(2, 10, 50), rounds: int = 200
+) -> Dict[str, Dict[int, Dict[str, float]]]:
+    """
+    Time encoding and decoding a webhook-like payload of each size with each codec
+
+    Returns microseconds per message, keyed by codec name, payload size in KB, then
+    `dumps` / `loads`.
+    """
+    results: Dict[str, Dict[int, Dict[str, float]]] = {}
+    for size_kb in sizes_kb:
+        item = {"id": 123456, "sku": "SKU-0001", "name": "Widget with a longer name é", "price": 19.99,
+                "quantity": 3, "tags": ["blue", "large", "sale"], "in_stock": True, "metadata": {"source": "web"}}
+        payload = {"event": "order.created", "created_at": "2026-10-18T12:00:00Z", "items": []}
+        while len(json.dumps(payload)) < size_kb * 1024:
+            payload["items"].append(dict(item, id=len(payload["items"])))
+        encoded = json.dumps(payload)
+
+        for name in codec_names:
+            try:
+                candidate = create_codec(name)
+            except ValueError:
+                continue
+            start = time.perf_counter()
+            for _ in range(rounds):
+                candidate.dumpb(payload)
+            dumps_us = (time.perf_counter() - start) / rounds * 1e6
+            start = time.perf_counter()
+            for _ in range(rounds):
+                candidate.loads(encoded)
+            loads_us = (time.perf_counter() - start) / rounds * 1e6
+            results.setdefault(name, {})[size_kb] = {"dumps": dumps_us, "loads": loads_us}
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare JSON codecs on webhook-sized payloads")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2, 10, 50], help="Payload sizes in KB")
+    parser.add_argument("--rounds", type=int, default=200, help="Messages encoded and decoded per measurement")
+    args = parser.parse_args()
+
+    results = benchmark(sizes_kb=args.sizes, rounds=args.rounds)
+    print(f"{'codec':<8} {'size':>6} {'dumps us':>10} {'loads us':>10}")
+    for name, by_size in results.items():
+        for size_kb, timings in by_size.items():
+            print(f"{name:<8} {size_kb:>4}KB {timings['dumps']:>10.1f} {timings['loads']:>10.1f}")
+    print(f"Active codec (JSON_CODEC={settings.JSON_CODEC}): {codec.name}")
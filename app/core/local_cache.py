@@ -0,0 +1,156 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from app.core.cache import redis_client
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Pub/sub channel carrying the IDs of subscriptions that were created, updated or deleted
+SUBSCRIPTION_INVALIDATION_CHANNEL = "subscriptions:invalidate"
+
+_MISSING = object()
+
+class LocalCache:
+    """
+    Bounded in-process LRU cache with a TTL, used in front of Redis
+
+    Entries are evicted least recently used first once `max_size` is reached and
+    expire `ttl` seconds after being stored. Thread-safe, so sync endpoints running
+    in the thread pool and async code can share one instance.
+
+    `generation` changes on every invalidation. A reader that loads a value from a
+    slower tier passes the generation it saw before loading to `set()`, so a value
+    loaded before a concurrent invalidation is not cached.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return a fresh cached value, or `default`"""
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(
+        self, key: Hashable, value: Any, generation: Optional[int] = None, ttl: Optional[float] = None
+    ) -> bool:
+        """Store a value, for `ttl` seconds if given; skipped if an invalidation happened since `generation`"""
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return False
+            self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            return True
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop one entry"""
+        with self._lock:
+            self.generation += 1
+            self.invalidations += 1
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every entry"""
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+class InvalidationListener:
+    """
+    Background thread applying invalidations published by other processes to a LocalCache
+
+    The cache is cleared whenever the listener (re)subscribes, since messages published
+    while it was not subscribed are lost. If Redis is unreachable, entries still expire
+    after the cache's TTL.
+    """
+
+    def __init__(self, cache: LocalCache, channel: str):
+        self.cache = cache
+        self.channel = channel
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def ensure_started(self) -> None:
+        """Start the listener thread once per process"""
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._listen, name=f"invalidate:{self.channel}", daemon=True)
+                self._thread.start()
+
+    def _listen(self) -> None:
+        while True:
+            pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(self.channel)
+                self.cache.clear()
+                for message in pubsub.listen():
+                    self.cache.invalidate(message["data"])
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener on {self.channel} disconnected: {e}")
+            finally:
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass
+            # Anything may change while we are not listening
+            self.cache.clear()
+            time.sleep(1)
+
+def publish_invalidation(channel: str, key: str) -> None:
+    """Tell every process to drop `key` from its local cache"""
+    try:
+        redis_client.publish(channel, key)
+    except Exception as e:
+        logger.warning(f"Could not publish invalidation of {key} on {channel}: {e}")
+
+# Process-wide cache of subscriptions in front of RedisCache; values are shared
+# read-only Subscription objects that are not attached to any session
+subscription_local_cache = LocalCache(settings.SUBSCRIPTION_LOCAL_CACHE_SIZE, settings.SUBSCRIPTION_LOCAL_CACHE_TTL)
+subscription_invalidation_listener = InvalidationListener(subscription_local_cache, SUBSCRIPTION_INVALIDATION_CHANNEL)
@@ -0,0 +1,95 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Set
+
+def _retrieve_exception(future: asyncio.Future) -> None:
+    # Failures are raised to the caller that loaded them; don't warn when no one else waited
+    if not future.cancelled():
+        future.exception()
+
+class SingleFlight:
+    """
+    Coalesces concurrent loads of the same keys on one event loop
+
+    When several coroutines ask for a key that is already being loaded, only the first
+    one calls its loader; the others wait for and share its result. If that load fails
+    they get its exception, and if the loading coroutine is cancelled they load the
+    key themselves.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.loads = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Load one key, or wait for the load already in flight"""
+        async def load_one(keys: Set[Hashable]) -> Dict[Hashable, Any]:
+            return {key: await loader()}
+        return (await self.do_many([key], load_one))[key]
+
+    async def do_many(
+        self,
+        keys: Iterable[Hashable],
+        loader: Callable[[Set[Hashable]], Awaitable[Dict[Hashable, Any]]]
+    ) -> Dict[Hashable, Any]:
+        """
+        Load several keys, waiting for those already in flight and loading the rest
+
+        `loader` receives the keys nobody is loading yet and returns their values; keys
+        it leaves out get None. Returns a value for every key.
+        """
+        loop = asyncio.get_running_loop()
+        owned: Dict[Hashable, asyncio.Future] = {}
+        waiting: Dict[Hashable, asyncio.Future] = {}
+        for key in set(keys):
+            future = self._calls.get(key)
+            if future is None:
+                future = loop.create_future()
+                future.add_done_callback(_retrieve_exception)
+                self._calls[key] = owned[key] = future
+            else:
+                waiting[key] = future
+        self.coalesced += len(waiting)
+
+        results: Dict[Hashable, Any] = {}
+        if owned:
+            self.loads += 1
+            try:
+                loaded = await loader(set(owned))
+            except asyncio.CancelledError:
+                for future in owned.values():
+                    future.cancel()
+                raise
+            except Exception as e:
+                for future in owned.values():
+                    future.set_exception(e)
+                raise
+            finally:
+                for key, future in owned.items():
+                    if self._calls.get(key) is future:
+                        del self._calls[key]
+            for key, future in owned.items():
+                results[key] = loaded.get(key)
+                future.set_result(results[key])
+
+        orphaned = []
+        for key, future in waiting.items():
+            try:
+                results[key] = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                orphaned.append(key)
+        if orphaned:
+            results.update(await self.do_many(orphaned, loader))
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._calls),
+            "loads": self.loads,
+            "coalesced": self.coalesced,
+        }
+
+# Database loads of subscriptions missing from both cache tiers
+subscription_loads = SingleFlight()
@@ -1,176 +1,509 @@
+import logging
 from datetime import datetime, timedelta
-from typing import List, Optional, Tuple
-from sqlalchemy import func
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import DateTime, Integer, Text, column, func, insert, or_, select, text, update, values
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.models import DeliveryLog, DeliveryStatus, WebhookPayload, Subscription
-from app.schemas import DeliveryLogCreate
+from app.models import DUE_TASKS_PREDICATE, DeliveryLog, DeliveryStatus, DeliveryTask, WebhookPayload, Subscription
+from app.core.cache import SUBSCRIPTION_COUNTER_FIELDS, RedisCache, AsyncRedisCache
 from app.core.config import settings
+from app.services.retry_policy import MAX_DELIVERY_ATTEMPTS
 
-def create_delivery_log(db: Session, log: DeliveryLogCreate) -> DeliveryLog:
+if TYPE_CHECKING:
+    from app.services.delivery_service import DeliveryOutcome
+
+logger = logging.getLogger(__name__)
+
+async def schedule_new_deliveries_async(due_times: Dict[int, datetime]) -> None:
+    """
+    Announce new deliveries to the workers
+
+    Idle workers are woken for the earliest due time, and the deliveries are added to
+    the Redis schedule when that scheduler backend is enabled. The rows are already
+    committed, so a Redis failure is only logged: workers still find them on their
+    fallback poll, and the scheduler's periodic reconcile puts them into the schedule.
+    """
+    if not due_times:
+        return
+    try:
+        if settings.SCHEDULER_BACKEND == "redis":
+            await AsyncRedisCache.schedule_deliveries(due_times)
+        await AsyncRedisCache.notify_deliveries_due(min(due_times.values()))
+    except Exception as e:
+        logger.warning(f"Could not announce {len(due_times)} new deliveries in Redis: {e}")
+
+CounterDeltas = Dict[str, Dict[str, int]]
+
+def _counter_field(status: DeliveryStatus) -> str:
+    """Subscription counter a task in `status` is counted in"""
+    if status == DeliveryStatus.SUCCESS:
+        return "success"
+    if status == DeliveryStatus.FAILURE:
+        return "failure"
+    return "pending"
+
+def _add_count(deltas: CounterDeltas, subscription_id: str, field: str, count: int = 1) -> None:
+    counts = deltas.setdefault(subscription_id, {})
+    counts[field] = counts.get(field, 0) + count
+
+def new_delivery_counts(subscription_ids: Iterable[str]) -> CounterDeltas:
+    """Counter changes for new pending deliveries to these subscriptions, one per ID"""
+    deltas: CounterDeltas = {}
+    for subscription_id in subscription_ids:
+        _add_count(deltas, subscription_id, "total")
+        _add_count(deltas, subscription_id, "pending")
+    return deltas
+
+def _status_change_counts(changes: Iterable[Tuple[str, DeliveryStatus, DeliveryStatus]]) -> CounterDeltas:
+    """Counter changes for tasks moving `(subscription_id, old status, new status)`"""
+    deltas: CounterDeltas = {}
+    for subscription_id, old_status, new_status in changes:
+        old_field, new_field = _counter_field(old_status), _counter_field(new_status)
+        if old_field != new_field:
+            _add_count(deltas, subscription_id, old_field, -1)
+            _add_count(deltas, subscription_id, new_field)
+    return deltas
+
+async def record_counter_changes_async(deltas: CounterDeltas) -> None:
+    """
+    Apply changes to the per-subscription delivery counters
+
+    The rows are already committed, so a Redis failure is only logged; the drift it
+    leaves is fixed by the worker's periodic reconcile.
+    """
+    if not deltas:
+        return
+    try:
+        await AsyncRedisCache.add_subscription_counters(deltas)
+    except Exception as e:
+        logger.warning(f"Could not update delivery counters of {len(deltas)} subscriptions: {e}")
+
+async def get_delivery_task_async(
+    db: AsyncSession, webhook_id: str, subscription_id: str
+) -> Optional[DeliveryTask]:
     """
-    Create a new delivery log entry
+    Get the current state of delivering a webhook to a subscription
     """
-    db_log = DeliveryLog(
-        webhook_id=log.webhook_id,
-        subscription_id=log.subscription_id,
-        attempt_number=log.attempt_number,
-        status=log.status,
-        status_code=log.status_code,
-        error_details=log.error_details,
-        next_attempt_at=log.next_attempt_at
+    result = await db.execute(
+        select(DeliveryTask)
+        .where(DeliveryTask.webhook_id == webhook_id, DeliveryTask.subscription_id == subscription_id)
     )
-    db.add(db_log)
-    db.commit()
-    db.refresh(db_log)
-    return db_log
+    return result.scalars().first()
 
-def get_delivery_logs(
-    db: Session, webhook_id: str, skip: int = 0, limit: int = 100
+async def get_delivery_logs_async(
+    db: AsyncSession, webhook_id: str, skip: int = 0, limit: int = 100
 ) -> List[DeliveryLog]:
     """
-    Get all delivery logs for a specific webhook
+    Get all delivery logs for a specific webhook without blocking the event loop
     """
-    return (
-        db.query(DeliveryLog)
-        .filter(DeliveryLog.webhook_id == webhook_id)
+    result = await db.execute(
+        select(DeliveryLog)
+        .where(DeliveryLog.webhook_id == webhook_id)
         .order_by(DeliveryLog.attempt_number)
         .offset(skip)
         .limit(limit)
-        .all()
     )
+    return result.scalars().all()
+
+async def get_webhook_payloads_async(db: AsyncSession, webhook_ids: Iterable[str]) -> Dict[str, WebhookPayload]:
+    """
+    Load the payloads of several webhooks in one query, by ID
+    """
+    webhook_ids = set(webhook_ids)
+    if not webhook_ids:
+        return {}
+    result = await db.execute(select(WebhookPayload).where(WebhookPayload.id.in_(webhook_ids)))
+    return {payload.id: payload for payload in result.scalars()}
+
+def _claimable(now: datetime) -> list:
+    """
+    Conditions for a delivery that is waiting to be sent and not leased by a live worker
+    """
+    return [
+        text(DUE_TASKS_PREDICATE),
+        DeliveryTask.next_attempt_at <= now,
+        DeliveryTask.attempt_number <= MAX_DELIVERY_ATTEMPTS,
+        or_(DeliveryTask.lease_expires_at.is_(None), DeliveryTask.lease_expires_at < now)
+    ]
 
-def get_latest_delivery_log(db: Session, webhook_id: str) -> Optional[DeliveryLog]:
+def _in_partition(partition: Optional[Tuple[int, int]]) -> list:
     """
-    Get the latest delivery log for a specific webhook
+    Conditions restricting deliveries to one `(index, count)` partition of subscriptions
+
+    Worker processes started by the supervisor each own one partition, so their claim
+    queries never scan or lock the same rows.
+    """
+    if partition is None:
+        return []
+    index, count = partition
+    bucket = func.hashtext(DeliveryTask.subscription_id).op("&")(0x7FFFFFFF) % count
+    return [bucket == index]
+
+async def _lease_deliveries(
+    db: AsyncSession, owner: str, candidate_ids, now: datetime, lease_seconds: Optional[int]
+) -> List[Tuple[DeliveryTask, Subscription]]:
+    """
+    Stamp the candidate rows with an owner and lease expiry, then load them with their subscriptions
+    """
+    lease_expires_at = now + timedelta(seconds=lease_seconds or settings.DELIVERY_LEASE_SECONDS)
+    result = await db.execute(
+        update(DeliveryTask)
+        .where(DeliveryTask.id.in_(candidate_ids))
+        .values(lease_owner=owner, lease_expires_at=lease_expires_at)
+        .returning(DeliveryTask.id)
+        .execution_options(synchronize_session=False)
+    )
+    claimed_ids = result.scalars().all()
+    await db.commit()
+    if not claimed_ids:
+        return []
+
+    result = await db.execute(
+        select(DeliveryTask, Subscription)
+        .join(Subscription, DeliveryTask.subscription_id == Subscription.id)
+        .where(DeliveryTask.id.in_(claimed_ids))
+        .order_by(DeliveryTask.next_attempt_at)
+    )
+    return result.all()
+
+def claim_pending_deliveries_query(
+    now: datetime, limit: int = 100, partition: Optional[Tuple[int, int]] = None
+):
+    """
+    Build the query locking the IDs of due deliveries, oldest first
+
+    Served by the partial index `ix_delivery_tasks_due`; see `app.services.query_plans`.
     """
     return (
-        db.query(DeliveryLog)
-        .filter(DeliveryLog.webhook_id == webhook_id)
-        .order_by(DeliveryLog.attempt_number.desc())
-        .first()
+        select(DeliveryTask.id)
+        .where(*_claimable(now), *_in_partition(partition))
+        .order_by(DeliveryTask.next_attempt_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
     )
 
-def get_pending_deliveries(db: Session, limit: int = 100) -> List[Tuple[DeliveryLog, WebhookPayload, Subscription]]:
+async def claim_pending_deliveries_async(
+    db: AsyncSession,
+    owner: str,
+    limit: int = 100,
+    lease_seconds: Optional[int] = None,
+    partition: Optional[Tuple[int, int]] = None
+) -> List[Tuple[DeliveryTask, Subscription]]:
     """
-    Get pending deliveries that are due for processing
+    Claim due deliveries for one worker and return them with their subscription
+
+    Rows are locked with FOR UPDATE SKIP LOCKED and stamped with an owner and a lease
+    expiry in one statement, so concurrent workers never claim the same row. Rows whose
+    lease has expired (e.g. their worker crashed) can be claimed again. With a
+    `partition`, only deliveries of subscriptions in that partition are claimed.
+
+    Payloads are not loaded here, since some claimed deliveries are never sent.
     """
     now = datetime.utcnow()
-    
-    # Join with webhook_payloads and subscriptions to get all needed data in one query
-    return (
-        db.query(DeliveryLog, WebhookPayload, Subscription)
-        .join(WebhookPayload, DeliveryLog.webhook_id == WebhookPayload.id)
-        .join(Subscription, DeliveryLog.subscription_id == Subscription.id)
-        .filter(
-            DeliveryLog.status.in_([DeliveryStatus.PENDING, DeliveryStatus.FAILED_ATTEMPT]),
-            DeliveryLog.next_attempt_at <= now,
-            DeliveryLog.attempt_number <= settings.MAX_RETRY_ATTEMPTS
-        )
-        .order_by(DeliveryLog.next_attempt_at)
+    due_ids = claim_pending_deliveries_query(now, limit, partition)
+    return await _lease_deliveries(db, owner, due_ids.scalar_subquery(), now, lease_seconds)
+
+async def claim_deliveries_by_ids_async(
+    db: AsyncSession, owner: str, task_ids: List[int], lease_seconds: Optional[int] = None
+) -> List[Tuple[DeliveryTask, Subscription]]:
+    """
+    Claim specific deliveries, e.g. ones handed out by the Redis scheduler
+
+    Only rows that are still due and not leased by another worker are claimed; the
+    database stays the source of record for delivery state.
+    """
+    if not task_ids:
+        return []
+    now = datetime.utcnow()
+    candidate_ids = (
+        select(DeliveryTask.id)
+        .where(DeliveryTask.id.in_(task_ids), *_claimable(now))
+        .with_for_update(skip_locked=True)
+    )
+    return await _lease_deliveries(db, owner, candidate_ids.scalar_subquery(), now, lease_seconds)
+
+async def get_delivery_schedule_async(
+    db: AsyncSession, task_ids: List[int]
+) -> List[Tuple[int, DeliveryStatus, Optional[datetime]]]:
+    """
+    Get the current status and due time of specific deliveries
+    """
+    if not task_ids:
+        return []
+    result = await db.execute(
+        select(DeliveryTask.id, DeliveryTask.status, DeliveryTask.next_attempt_at)
+        .where(DeliveryTask.id.in_(task_ids))
+    )
+    return result.all()
+
+async def get_overdue_deliveries_async(
+    db: AsyncSession,
+    older_than: datetime,
+    limit: int = 1000,
+    partition: Optional[Tuple[int, int]] = None
+) -> List[Tuple[int, datetime]]:
+    """
+    Get unclaimed deliveries that were due before `older_than`
+
+    Used to put deliveries back into the Redis schedule if an ingest could not add them.
+    """
+    result = await db.execute(
+        select(DeliveryTask.id, DeliveryTask.next_attempt_at)
+        .where(*_claimable(older_than), *_in_partition(partition))
+        .order_by(DeliveryTask.next_attempt_at)
         .limit(limit)
-        .all()
     )
+    return result.all()
+
+async def apply_delivery_outcomes_async(
+    db: AsyncSession, owner: str, outcomes: List["DeliveryOutcome"]
+) -> int:
+    """
+    Write back many delivery outcomes with a single UPDATE ... FROM (VALUES ...)
+
+    Only tasks still leased by `owner` are updated, so a worker whose lease expired cannot overwrite the row's new owner.
+    Leases are released, and the attempts that were sent are appended to delivery_logs
+    with one multi-row INSERT in the same transaction. Tasks that finished are then moved
+    from pending to success or failure in their subscription's counters. Returns the
+    number of tasks updated.
+    """
+    if not outcomes:
+        return 0
 
-def update_delivery_status(
-    db: Session, 
-    log_id: int, 
-    status: DeliveryStatus, 
-    status_code: Optional[int] = None, 
-    error_details: Optional[str] = None,
-    next_attempt_at: Optional[datetime] = None
-) -> Optional[DeliveryLog]:
-    """
-    Update the status of a delivery log
-    """
-    db_log = db.query(DeliveryLog).filter(DeliveryLog.id == log_id).first()
-    if not db_log:
-        return None
-    
-    db_log.status = status
-    if status_code is not None:
-        db_log.status_code = status_code
-    if error_details is not None:
-        db_log.error_details = error_details
-    if next_attempt_at is not None:
-        db_log.next_attempt_at = next_attempt_at
-    
-    db.add(db_log)
-    db.commit()
-    db.refresh(db_log)
-    return db_log
-
-def create_next_attempt(db: Session, previous_log: DeliveryLog) -> DeliveryLog:
-    """
-    Create the next delivery attempt log based on previous attempt
-    """
-    attempt_number = previous_log.attempt_number + 1
-    
-    # Calculate next attempt time based on retry interval
-    retry_delay = settings.RETRY_INTERVALS.get(
-        attempt_number, settings.RETRY_INTERVALS[len(settings.RETRY_INTERVALS)]
+    outcome_values = values(
+        column("id", Integer),
+        column("status", DeliveryTask.status.type),
+        column("attempt_number", Integer),
+        column("status_code", Integer),
+        column("error_details", Text),
+        column("next_attempt_at", DateTime),
+        name="outcomes",
+    ).data([
+        (
+            outcome.task_id,
+            outcome.status,
+            outcome.attempt_number,
+            outcome.status_code,
+            outcome.error_details,
+            outcome.next_attempt_at,
+        )
+        for outcome in outcomes
+    ])
+
+    result = await db.execute(
+        update(DeliveryTask)
+        .where(DeliveryTask.id == outcome_values.c.id, DeliveryTask.lease_owner == owner)
+        .values(
+            status=outcome_values.c.status,
+            attempt_number=outcome_values.c.attempt_number,
+            status_code=outcome_values.c.status_code,
+            error_details=outcome_values.c.error_details,
+            next_attempt_at=outcome_values.c.next_attempt_at,
+            lease_owner=None,
+            lease_expires_at=None,
+        )
+        .returning(DeliveryTask.id, DeliveryTask.webhook_id, DeliveryTask.subscription_id)
+        .execution_options(synchronize_session=False)
     )
-    next_attempt_at = datetime.utcnow() + timedelta(seconds=retry_delay)
-    
-    db_log = DeliveryLog(
-        webhook_id=previous_log.webhook_id,
-        subscription_id=previous_log.subscription_id,
-        attempt_number=attempt_number,
-        status=DeliveryStatus.PENDING,
-        next_attempt_at=next_attempt_at
+    updated = {task_id: (webhook_id, subscription_id) for task_id, webhook_id, subscription_id in result.all()}
+
+    # Attempts are appended to the history, which no queue update ever touches
+    attempt_logs = [
+        outcome.attempt_log(*updated[outcome.task_id])
+        for outcome in outcomes
+        if outcome.attempted is not None and outcome.task_id in updated
+    ]
+    if attempt_logs:
+        await db.execute(insert(DeliveryLog), attempt_logs)
+    await db.commit()
+
+    # Claimed tasks are always pending, so only finishing one changes the counters
+    await record_counter_changes_async(_status_change_counts(
+        (updated[outcome.task_id][1], DeliveryStatus.PENDING, outcome.status)
+        for outcome in outcomes
+        if outcome.task_id in updated
+    ))
+    return len(updated)
+
+async def delete_expired_logs_chunk_async(
+    db: AsyncSession,
+    older_than: datetime,
+    after: Optional[Tuple[datetime, int]],
+    limit: int,
+    table: str = DeliveryLog.__tablename__
+) -> Tuple[int, Optional[Tuple[datetime, int]]]:
+    """
+    Delete up to `limit` logs older than `older_than`, oldest first, past the keyset cursor `after`
+
+    Walking the attempt_timestamp index from the cursor skips the dead index entries
+    left by earlier chunks. Returns the number of logs deleted and the cursor to
+    continue from, or None once no expired logs are left.
+    """
+    after_timestamp, after_id = after or (datetime.min, 0)
+    result = await db.execute(text(f"""
+        WITH expired AS (
+            SELECT id, attempt_timestamp FROM {table}
+            WHERE attempt_timestamp < :older_than
+              AND attempt_timestamp >= :after_timestamp
+              AND (attempt_timestamp, id) > (:after_timestamp, :after_id)
+            ORDER BY attempt_timestamp, id
+            LIMIT :limit
+        )
+        DELETE FROM {table} l USING expired
+        WHERE l.id = expired.id AND l.attempt_timestamp = expired.attempt_timestamp
+        RETURNING l.attempt_timestamp, l.id
+    """), {"older_than": older_than, "after_timestamp": after_timestamp, "after_id": after_id, "limit": limit})
+    deleted = [tuple(row) for row in result.all()]
+    await db.commit()
+    if len(deleted) < limit:
+        return len(deleted), None
+    return len(deleted), max(deleted)
+
+async def delete_finished_tasks_chunk_async(
+    db: AsyncSession, older_than: datetime, after_id: Optional[int], limit: int
+) -> Tuple[int, int, Optional[int]]:
+    """
+    Scan up to `limit` tasks past `after_id` and delete those that finished before `older_than`
+
+    The deleted tasks are taken off their subscriptions' counters. Returns the number of
+    tasks scanned and deleted, and the ID to continue the scan from, or None once the
+    end of the table is reached.
+    """
+    result = await db.execute(text("""
+        WITH scanned AS (
+            SELECT id FROM delivery_tasks
+            WHERE id > :after_id
+            ORDER BY id
+            LIMIT :limit
+        ), finished AS (
+            DELETE FROM delivery_tasks t USING scanned
+            WHERE t.id = scanned.id
+              AND t.status = ANY(:finished)
+              AND t.updated_at < :older_than
+            RETURNING t.id, t.subscription_id, t.status
+        )
+        -- One row per subscription and status deleted, or a single row of NULLs
+        SELECT s.scanned, s.last_id, f.subscription_id, f.status, f.deleted
+        FROM (SELECT count(*) AS scanned, max(id) AS last_id FROM scanned) s
+        LEFT JOIN (
+            SELECT subscription_id, status, count(*) AS deleted FROM finished GROUP BY subscription_id, status
+        ) f ON true
+    """), {
+        "older_than": older_than,
+        "after_id": after_id or 0,
+        "limit": limit,
+        "finished": [DeliveryStatus.SUCCESS.name, DeliveryStatus.FAILURE.name],
+    })
+    rows = result.all()
+    await db.commit()
+
+    scanned, last_id = rows[0][0], rows[0][1]
+    deltas: CounterDeltas = {}
+    for _, _, subscription_id, status, deleted in rows:
+        if subscription_id is not None:
+            _add_count(deltas, subscription_id, "total", -deleted)
+            _add_count(deltas, subscription_id, _counter_field(DeliveryStatus[status]), -deleted)
+    await record_counter_changes_async(deltas)
+    return scanned, sum(row[4] or 0 for row in rows), last_id if scanned >= limit else None
+
+async def delete_orphaned_payloads_chunk_async(
+    db: AsyncSession, older_than: datetime, after_id: Optional[str], limit: int
+) -> Tuple[int, int, Optional[str]]:
+    """
+    Scan up to `limit` payloads past `after_id` and delete those created before `older_than` with no task or log left
+
+    Returns the number of payloads scanned and deleted, and the ID to continue the scan
+    from, or None once the end of the table is reached.
+    """
+    result = await db.execute(text("""
+        WITH scanned AS (
+            SELECT id, created_at FROM webhook_payloads
+            WHERE id > :after_id
+            ORDER BY id
+            LIMIT :limit
+        ), orphaned AS (
+            DELETE FROM webhook_payloads p USING scanned
+            WHERE p.id = scanned.id
+              AND scanned.created_at < :older_than
+              AND NOT EXISTS (SELECT 1 FROM delivery_tasks t WHERE t.webhook_id = p.id)
+              AND NOT EXISTS (SELECT 1 FROM delivery_logs l WHERE l.webhook_id = p.id)
+            RETURNING p.id
+        )
+        SELECT (SELECT count(*) FROM scanned), (SELECT count(*) FROM orphaned), (SELECT max(id) FROM scanned)
+    """), {"older_than": older_than, "after_id": after_id or "", "limit": limit})
+    scanned, deleted, last_id = result.one()
+    await db.commit()
+    return scanned, deleted, last_id if scanned >= limit else None
+
+def _delivery_counts_query(subscription_ids: Iterable[str]):
+    """
+    Build the query counting tasks by status for each of `subscription_ids`
+
+    Subscriptions without tasks get one row with a NULL status.
+    """
+    subscriptions = select(Subscription.id).where(Subscription.id.in_(list(subscription_ids))).subquery()
+    return (
+        select(subscriptions.c.id, DeliveryTask.status, func.count(DeliveryTask.id))
+        .select_from(subscriptions)
+        .outerjoin(DeliveryTask, DeliveryTask.subscription_id == subscriptions.c.id)
+        .group_by(subscriptions.c.id, DeliveryTask.status)
     )
-    db.add(db_log)
-    db.commit()
-    db.refresh(db_log)
-    return db_log
-
-def clean_old_logs(db: Session) -> int:
-    """
-    Delete logs older than the retention period
-    Returns the number of logs deleted
-    """
-    retention_threshold = datetime.utcnow() - timedelta(hours=settings.LOG_RETENTION_HOURS)
-    
-    # Get count of logs to be deleted
-    count_to_delete = db.query(func.count(DeliveryLog.id)).filter(
-        DeliveryLog.attempt_timestamp < retention_threshold
-    ).scalar()
-    
-    # Delete logs
-    db.query(DeliveryLog).filter(
-        DeliveryLog.attempt_timestamp < retention_threshold
-    ).delete(synchronize_session=False)
-    
-    db.commit()
-    return count_to_delete
+
+def _counters_from_rows(rows) -> Dict[str, Dict[str, int]]:
+    """Subscription counters from `(subscription_id, status, count)` rows"""
+    counters: Dict[str, Dict[str, int]] = {}
+    for subscription_id, status, count in rows:
+        counts = counters.setdefault(subscription_id, dict.fromkeys(SUBSCRIPTION_COUNTER_FIELDS, 0))
+        if status is not None:
+            counts["total"] += count
+            counts[_counter_field(status)] += count
+    return counters
+
+def count_deliveries_by_subscription(db: Session, subscription_id: str) -> Dict[str, int]:
+    """
+    Count a subscription's tasks by status with one GROUP BY query
+    """
+    counters = _counters_from_rows(db.execute(_delivery_counts_query([subscription_id])).all())
+    return counters.get(subscription_id, dict.fromkeys(SUBSCRIPTION_COUNTER_FIELDS, 0))
+
+async def count_deliveries_by_subscription_async(
+    db: AsyncSession, subscription_ids: List[str]
+) -> Dict[str, Dict[str, int]]:
+    """
+    Count the tasks of several subscriptions by status with one GROUP BY query
+
+    Subscriptions that no longer exist are left out.
+    """
+    if not subscription_ids:
+        return {}
+    result = await db.execute(_delivery_counts_query(subscription_ids))
+    return _counters_from_rows(result.all())
 
 def get_delivery_stats_by_subscription(db: Session, subscription_id: str) -> dict:
     """
-    Get delivery statistics for a specific subscription
-    """
-    total_count = db.query(func.count(DeliveryLog.id)).filter(
-        DeliveryLog.subscription_id == subscription_id
-    ).scalar()
-    
-    success_count = db.query(func.count(DeliveryLog.id)).filter(
-        DeliveryLog.subscription_id == subscription_id,
-        DeliveryLog.status == DeliveryStatus.SUCCESS
-    ).scalar()
-    
-    failure_count = db.query(func.count(DeliveryLog.id)).filter(
-        DeliveryLog.subscription_id == subscription_id,
-        DeliveryLog.status == DeliveryStatus.FAILURE
-    ).scalar()
-    
-    pending_count = db.query(func.count(DeliveryLog.id)).filter(
-        DeliveryLog.subscription_id == subscription_id,
-        DeliveryLog.status.in_([DeliveryStatus.PENDING, DeliveryStatus.FAILED_ATTEMPT])
-    ).scalar()
-    
+    Get delivery statistics for a specific subscription, counting each webhook once by its current state
+
+    Served from the counters kept in Redis. Counters not kept yet (a new process, or
+    Redis lost them) are counted from delivery_tasks once and stored.
+    """
+    try:
+        counters = RedisCache.get_subscription_counters(subscription_id)
+    except Exception as e:
+        logger.warning(f"Could not read delivery counters of subscription {subscription_id}: {e}")
+        counters = None
+    if counters is None:
+        counters = count_deliveries_by_subscription(db, subscription_id)
+        try:
+            RedisCache.seed_subscription_counters(subscription_id, counters)
+        except Exception as e:
+            logger.warning(f"Could not store delivery counters of subscription {subscription_id}: {e}")
+
+    total_count = counters["total"]
     return {
         "total": total_count,
-        "success": success_count,
-        "failure": failure_count,
-        "pending": pending_count,
-        "success_rate": (success_count / total_count * 100) if total_count > 0 else 0
+        "success": counters["success"],
+        "failure": counters["failure"],
+        "pending": counters["pending"],
+        "success_rate": (counters["success"] / total_count * 100) if total_count > 0 else 0
     }
\ No newline at end of file
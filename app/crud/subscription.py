@@ -1,11 +1,166 @@
 import uuid
-from typing import List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import datetime, timezone
 
 from app.models import Subscription
 from app.schemas import SubscriptionCreate, SubscriptionUpdate
-from app.core.cache import RedisCache
+from app.core.cache import RedisCache, AsyncRedisCache
+from app.core.config import settings
+from app.core.event_index import event_index
+from app.core.local_cache import (
+    SUBSCRIPTION_INVALIDATION_CHANNEL,
+    publish_invalidation,
+    subscription_invalidation_listener,
+    subscription_local_cache,
+)
+from app.core.single_flight import subscription_loads
+
+def _subscription_to_cache(db_subscription: Subscription) -> Dict[str, Any]:
+    """
+    Build the cached representation of a subscription
+    """
+    return {
+        "id": db_subscription.id,
+        "target_url": db_subscription.target_url,
+        "secret_key": db_subscription.secret_key,
+        "event_types": db_subscription.event_types,
+        "retry_policy": db_subscription.retry_policy,
+        "content_encoding": db_subscription.content_encoding,
+        "batch_delivery": db_subscription.batch_delivery,
+        "created_at": db_subscription.created_at.isoformat(),
+        "updated_at": db_subscription.updated_at.isoformat()
+    }
+
+def _subscription_from_cache(cached_subscription: Dict[str, Any]) -> Subscription:
+    """
+    Convert cached data back to model with proper datetime handling
+    """
+    return Subscription(
+        id=cached_subscription["id"],
+        target_url=cached_subscription["target_url"],
+        secret_key=cached_subscription["secret_key"],
+        event_types=cached_subscription["event_types"],
+        retry_policy=cached_subscription.get("retry_policy"),
+        content_encoding=cached_subscription.get("content_encoding"),
+        batch_delivery=cached_subscription.get("batch_delivery"),
+        created_at=datetime.fromisoformat(cached_subscription.get("created_at", datetime.now(timezone.utc).isoformat())),
+        updated_at=datetime.fromisoformat(cached_subscription.get("updated_at", datetime.now(timezone.utc).isoformat()))
+    )
+
+# Stored in the local cache in place of subscriptions that do not exist
+_NOT_FOUND = object()
+
+def _get_local_subscription(subscription_id: str) -> Any:
+    """
+    Look a subscription up in this process's local cache, without any network hop
+
+    Returns None on a miss and _NOT_FOUND if the subscription is known not to exist.
+    """
+    subscription_invalidation_listener.ensure_started()
+    return subscription_local_cache.get(subscription_id)
+
+def _cache_subscription(data: Dict[str, Any], generation: int) -> Subscription:
+    """
+    Store a subscription in the local cache as a detached copy and return it
+    """
+    subscription = _subscription_from_cache(data)
+    subscription_local_cache.set(subscription.id, subscription, generation)
+    return subscription
+
+def _cache_lookups(
+    subscription_ids: Set[str], found: Dict[str, Dict[str, Any]], generation: int
+) -> Dict[str, Optional[Subscription]]:
+    """
+    Store looked up subscriptions in the local cache, remembering briefly which IDs do not exist
+    """
+    subscriptions: Dict[str, Optional[Subscription]] = {}
+    for sid in subscription_ids:
+        data = found.get(sid)
+        if data is None or data.get("not_found"):
+            subscription_local_cache.set(sid, _NOT_FOUND, generation, ttl=settings.SUBSCRIPTION_NOT_FOUND_TTL)
+            subscriptions[sid] = None
+        else:
+            subscriptions[sid] = _cache_subscription(data, generation)
+    return subscriptions
+
+def _invalidate_subscription(subscription_id: str) -> None:
+    """
+    Drop a changed subscription from the local cache of every API and worker process
+    """
+    subscription_local_cache.invalidate(subscription_id)
+    publish_invalidation(SUBSCRIPTION_INVALIDATION_CHANNEL, subscription_id)
+
+def _get_local_subscriptions(subscription_ids: Iterable[str]) -> Tuple[Dict[str, Subscription], Set[str]]:
+    """
+    Split subscription IDs into local cache hits and the IDs still to look up
+
+    IDs known not to exist are in neither.
+    """
+    subscriptions: Dict[str, Subscription] = {}
+    missing_ids: Set[str] = set()
+    for sid in set(subscription_ids):
+        subscription = _get_local_subscription(sid)
+        if subscription is None:
+            missing_ids.add(sid)
+        elif subscription is not _NOT_FOUND:
+            subscriptions[sid] = subscription
+    return subscriptions, missing_ids
+
+def _load_subscriptions(db: Session, subscription_ids: Set[str]) -> Dict[str, Optional[Subscription]]:
+    """
+    Look subscriptions up in Redis, then in the database, and cache the results in both tiers
+    """
+    generation = subscription_local_cache.generation
+    found = RedisCache.get_subscriptions(subscription_ids)
+
+    missing_ids = subscription_ids - found.keys()
+    if missing_ids:
+        db_subscriptions = db.query(Subscription).filter(Subscription.id.in_(missing_ids)).all()
+        loaded = {db_subscription.id: _subscription_to_cache(db_subscription) for db_subscription in db_subscriptions}
+        RedisCache.set_subscriptions(loaded)
+        RedisCache.set_subscriptions_not_found(missing_ids - loaded.keys())
+        found.update(loaded)
+
+    return _cache_lookups(subscription_ids, found, generation)
+
+async def _load_subscriptions_async(
+    db: AsyncSession, subscription_ids: Set[str]
+) -> Dict[str, Optional[Subscription]]:
+    """
+    Look subscriptions up in Redis, then in the database, without blocking the event loop
+    """
+    generation = subscription_local_cache.generation
+    found = await AsyncRedisCache.get_subscriptions(subscription_ids)
+
+    missing_ids = subscription_ids - found.keys()
+    if missing_ids:
+        result = await db.execute(select(Subscription).where(Subscription.id.in_(missing_ids)))
+        loaded = {db_subscription.id: _subscription_to_cache(db_subscription) for db_subscription in result.scalars()}
+        await AsyncRedisCache.set_subscriptions(loaded)
+        await AsyncRedisCache.set_subscriptions_not_found(missing_ids - loaded.keys())
+        found.update(loaded)
+
+    return _cache_lookups(subscription_ids, found, generation)
+
+def _refresh_event_index(subscription_id: str, event_types: Optional[List[str]], deleted: bool = False) -> None:
+    """
+    Apply a subscription change to this process's event type index
+
+    Other processes notice the bumped version and rebuild their own index. If another
+    change happened since our last sync, ours is rebuilt on the next lookup too.
+    """
+    if deleted:
+        event_index.remove(subscription_id)
+    else:
+        event_index.add(subscription_id, event_types)
+    version = RedisCache.bump_subscription_index_version()
+    if event_index.version is not None and event_index.version == version - 1:
+        event_index.version = version
+    else:
+        event_index.version = None
 
 def create_subscription(db: Session, subscription: SubscriptionCreate) -> Subscription:
     """
@@ -16,55 +171,108 @@ def create_subscription(db: Session, subscription: SubscriptionCreate) -> Subscr
         target_url=str(subscription.target_url),
         secret_key=subscription.secret_key,
         event_types=subscription.event_types,
+        retry_policy=subscription.retry_policy.model_dump(exclude_none=True) if subscription.retry_policy else None,
+        content_encoding=subscription.content_encoding,
+        batch_delivery=subscription.batch_delivery.model_dump(exclude_none=True) if subscription.batch_delivery else None,
         created_at=datetime.now(timezone.utc),
         updated_at=datetime.now(timezone.utc),
     )
     db.add(db_subscription)
     db.commit()
     db.refresh(db_subscription)
-    
+
     # Cache the subscription
-    subscription_data = {
-        "id": db_subscription.id,
-        "target_url": db_subscription.target_url,
-        "secret_key": db_subscription.secret_key,
-        "event_types": db_subscription.event_types
-    }
-    RedisCache.set_subscription(db_subscription.id, subscription_data)
-    
+    RedisCache.set_subscription(db_subscription.id, _subscription_to_cache(db_subscription))
+    _invalidate_subscription(db_subscription.id)
+    _refresh_event_index(db_subscription.id, db_subscription.event_types)
+
     return db_subscription
 
 def get_subscription(db: Session, subscription_id: str) -> Optional[Subscription]:
     """
     Get a subscription by ID, using cache if available
+
+    Looks in this process's local cache, then Redis, then the database. Unknown IDs are
+    cached briefly too. The returned object may be shared with other requests and must
+    not be modified.
+    """
+    subscription = _get_local_subscription(subscription_id)
+    if subscription is not None:
+        return None if subscription is _NOT_FOUND else subscription
+    return _load_subscriptions(db, {subscription_id})[subscription_id]
+
+def get_subscriptions_by_ids(db: Session, subscription_ids: Iterable[str]) -> Dict[str, Subscription]:
+    """
+    Resolve several subscriptions at once, using cache if available
+
+    Local cache misses are fetched from Redis with a single MGET and Redis misses with
+    a single IN query. Unknown IDs are absent from the returned mapping.
+    """
+    subscriptions, missing_ids = _get_local_subscriptions(subscription_ids)
+    if missing_ids:
+        loaded = _load_subscriptions(db, missing_ids)
+        subscriptions.update({sid: subscription for sid, subscription in loaded.items() if subscription})
+    return subscriptions
+
+def get_subscriptions_for_event(db: Session, event_type: str) -> List[Subscription]:
+    """
+    Get all subscriptions listening for an event type
+
+    Matching uses the in-memory event type index, which is rebuilt from the
+    subscriptions table only when another process has changed it.
+    """
+    version = RedisCache.get_subscription_index_version()
+    if event_index.version != version:
+        rows = db.query(Subscription.id, Subscription.event_types).all()
+        event_index.rebuild(rows, version=version)
+
+    subscription_ids = event_index.match(event_type)
+    if not subscription_ids:
+        return []
+    return list(get_subscriptions_by_ids(db, subscription_ids).values())
+
+async def get_subscription_async(db: AsyncSession, subscription_id: str) -> Optional[Subscription]:
+    """
+    Get a subscription by ID without blocking the event loop, using cache if available
+    """
+    subscription = _get_local_subscription(subscription_id)
+    if subscription is not None:
+        return None if subscription is _NOT_FOUND else subscription
+    loaded = await subscription_loads.do_many(
+        [subscription_id], lambda subscription_ids: _load_subscriptions_async(db, subscription_ids)
+    )
+    return loaded[subscription_id]
+
+async def get_subscriptions_by_ids_async(
+    db: AsyncSession, subscription_ids: Iterable[str]
+) -> Dict[str, Subscription]:
+    """
+    Resolve several subscriptions at once without blocking the event loop
+
+    Concurrent requests missing the same subscriptions share a single lookup, so a cold
+    or flushed cache costs one query per subscription rather than one per request.
     """
-    # Try to get from cache first
-    cached_subscription = RedisCache.get_subscription(subscription_id)
-    if cached_subscription:
-        # Convert cached data back to model with proper datetime handling
-        return Subscription(
-            id=cached_subscription["id"],
-            target_url=cached_subscription["target_url"],
-            secret_key=cached_subscription["secret_key"],
-            event_types=cached_subscription["event_types"],
-            created_at=datetime.fromisoformat(cached_subscription.get("created_at", datetime.now(timezone.utc).isoformat())),
-            updated_at=datetime.fromisoformat(cached_subscription.get("updated_at", datetime.now(timezone.utc).isoformat()))
+    subscriptions, missing_ids = _get_local_subscriptions(subscription_ids)
+    if missing_ids:
+        loaded = await subscription_loads.do_many(
+            missing_ids, lambda subscription_ids: _load_subscriptions_async(db, subscription_ids)
         )
-    
-    # If not in cache, get from database and cache it
-    db_subscription = db.query(Subscription).filter(Subscription.id == subscription_id).first()
-    if db_subscription:
-        subscription_data = {
-            "id": db_subscription.id,
-            "target_url": db_subscription.target_url,
-            "secret_key": db_subscription.secret_key,
-            "event_types": db_subscription.event_types,
-            "created_at": db_subscription.created_at.isoformat(),
-            "updated_at": db_subscription.updated_at.isoformat()
-        }
-        RedisCache.set_subscription(db_subscription.id, subscription_data)
-    
-    return db_subscription
+        subscriptions.update({sid: subscription for sid, subscription in loaded.items() if subscription})
+    return subscriptions
+
+async def get_subscriptions_for_event_async(db: AsyncSession, event_type: str) -> List[Subscription]:
+    """
+    Get all subscriptions listening for an event type without blocking the event loop
+    """
+    version = await AsyncRedisCache.get_subscription_index_version()
+    if event_index.version != version:
+        result = await db.execute(select(Subscription.id, Subscription.event_types))
+        event_index.rebuild(result.all(), version=version)
+
+    subscription_ids = event_index.match(event_type)
+    if not subscription_ids:
+        return []
+    return list((await get_subscriptions_by_ids_async(db, subscription_ids)).values())
 
 def get_subscriptions(db: Session, skip: int = 0, limit: int = 100) -> List[Subscription]:
     """
@@ -72,6 +280,15 @@ def get_subscriptions(db: Session, skip: int = 0, limit: int = 100) -> List[Subs
     """
     return db.query(Subscription).offset(skip).limit(limit).all()
 
+async def get_subscription_ids_async(db: AsyncSession, after_id: Optional[str], limit: int) -> List[str]:
+    """
+    Get up to `limit` subscription IDs past `after_id`, in ID order, for walking all subscriptions in chunks
+    """
+    result = await db.execute(
+        select(Subscription.id).where(Subscription.id > (after_id or "")).order_by(Subscription.id).limit(limit)
+    )
+    return result.scalars().all()
+
 def update_subscription(
     db: Session, subscription_id: str, subscription_update: SubscriptionUpdate
 ) -> Optional[Subscription]:
@@ -81,7 +298,7 @@ def update_subscription(
     db_subscription = db.query(Subscription).filter(Subscription.id == subscription_id).first()
     if not db_subscription:
         return None
-    
+
     update_data = subscription_update.dict(exclude_unset=True)
     for key, value in update_data.items():
         if key == "target_url" and value:
@@ -89,20 +306,16 @@ def update_subscription(
             setattr(db_subscription, key, str(value))
         else:
             setattr(db_subscription, key, value)
-    
+
     db.add(db_subscription)
     db.commit()
     db.refresh(db_subscription)
-    
+
     # Update cache
-    subscription_data = {
-        "id": db_subscription.id,
-        "target_url": db_subscription.target_url,
-        "secret_key": db_subscription.secret_key,
-        "event_types": db_subscription.event_types
-    }
-    RedisCache.set_subscription(db_subscription.id, subscription_data)
-    
+    RedisCache.set_subscription(db_subscription.id, _subscription_to_cache(db_subscription))
+    _invalidate_subscription(db_subscription.id)
+    _refresh_event_index(db_subscription.id, db_subscription.event_types)
+
     return db_subscription
 
 def delete_subscription(db: Session, subscription_id: str) -> bool:
@@ -112,12 +325,15 @@ def delete_subscription(db: Session, subscription_id: str) -> bool:
     db_subscription = db.query(Subscription).filter(Subscription.id == subscription_id).first()
     if not db_subscription:
         return False
-    
+
     # Delete from database
     db.delete(db_subscription)
     db.commit()
-    
-    # Delete from cache
+
+    # Delete from cache, along with the counters of its deleted tasks
     RedisCache.delete_subscription(subscription_id)
-    
+    RedisCache.delete_subscription_counters(subscription_id)
+    _invalidate_subscription(subscription_id)
+    _refresh_event_index(subscription_id, None, deleted=True)
+
     return True
\ No newline at end of file
@@ -1,46 +1,124 @@
 import uuid
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.models import WebhookPayload, DeliveryLog, DeliveryStatus
+from app.core.compression import compress_for_storage
+from app.models import WebhookPayload, DeliveryTask, DeliveryStatus
 from app.schemas import WebhookPayloadCreate
+from app.crud.delivery import new_delivery_counts, record_counter_changes_async, schedule_new_deliveries_async
+from app.services.signing import prepare_body
 
-def create_webhook_payload(db: Session, webhook: WebhookPayloadCreate) -> WebhookPayload:
+def _payload_columns(payload: Dict[str, Any], secret_key: Optional[str]) -> Dict[str, Any]:
     """
-    Create a new webhook payload entry
+    Build the stored body and signature of a webhook
+
+    The body is the only stored form of the payload, which is decoded from it on read.
+    Bodies of at least PAYLOAD_COMPRESSION_THRESHOLD bytes are stored compressed.
+    """
+    body, signature, signing_key_id = prepare_body(payload, secret_key)
+    body, body_encoding = compress_for_storage(body)
+    return {
+        "payload_json": None,
+        "body": body,
+        "body_encoding": body_encoding,
+        "signature": signature,
+        "signing_key_id": signing_key_id,
+    }
+
+def _build_bulk_rows(
+    webhooks: List[WebhookPayloadCreate], secret_keys: Optional[Dict[str, Optional[str]]] = None
+) -> Tuple[List[str], List[dict], List[dict]]:
+    """
+    Build the payload and delivery task rows for a bulk insert
+
+    `secret_keys` maps subscription IDs to their secrets, used to sign the bodies.
+    """
+    if any(not webhook.payload for webhook in webhooks):
+        raise ValueError("Webhook payload cannot be empty")
+
+    now = datetime.utcnow()
+    secret_keys = secret_keys or {}
+    webhook_ids = [str(uuid.uuid4()) for _ in webhooks]
+    payload_rows = []
+    for webhook_id, webhook in zip(webhook_ids, webhooks):
+        payload_rows.append({
+            "id": webhook_id,
+            "subscription_id": webhook.subscription_id,
+            "event_type": webhook.event_type,
+            "created_at": now,
+            **_payload_columns(webhook.payload, secret_keys.get(webhook.subscription_id)),
+        })
+    # Delivery tasks, ready for immediate processing
+    task_rows = [
+        {
+            "webhook_id": webhook_id,
+            "subscription_id": webhook.subscription_id,
+            "attempt_number": 1,
+            "status": DeliveryStatus.PENDING,
+            "created_at": now,
+            "next_attempt_at": now,
+        }
+        for webhook_id, webhook in zip(webhook_ids, webhooks)
+    ]
+    return webhook_ids, payload_rows, task_rows
+
+async def create_webhook_payload_async(
+    db: AsyncSession, webhook: WebhookPayloadCreate, secret_key: Optional[str] = None
+) -> WebhookPayload:
+    """
+    Create a new webhook payload entry without blocking the event loop
     """
     if not webhook.payload:
         raise ValueError("Webhook payload cannot be empty")
-        
+
     webhook_id = str(uuid.uuid4())
     db_webhook = WebhookPayload(
         id=webhook_id,
         subscription_id=webhook.subscription_id,
         event_type=webhook.event_type,
-        payload=webhook.payload
+        **_payload_columns(webhook.payload, secret_key)
     )
     db.add(db_webhook)
-    
-    # Create initial delivery log entry
-    initial_log = DeliveryLog(
+    task = DeliveryTask(
         webhook_id=webhook_id,
         subscription_id=webhook.subscription_id,
         attempt_number=1,
         status=DeliveryStatus.PENDING,
         next_attempt_at=datetime.utcnow()  # Ready for immediate processing
     )
-    db.add(initial_log)
-    
-    db.commit()
-    db.refresh(db_webhook)
+    db.add(task)
+
+    await db.commit()
+    await schedule_new_deliveries_async({task.id: task.next_attempt_at})
+    await record_counter_changes_async(new_delivery_counts([task.subscription_id]))
     return db_webhook
 
-def get_webhook_payload(db: Session, webhook_id: str) -> Optional[WebhookPayload]:
+async def create_webhook_payloads_bulk_async(
+    db: AsyncSession, webhooks: List[WebhookPayloadCreate], secret_keys: Optional[Dict[str, Optional[str]]] = None
+) -> List[str]:
+    """
+    Create many webhook payload entries in a single transaction without blocking the event loop
+    """
+    if not webhooks:
+        return []
+
+    webhook_ids, payload_rows, task_rows = _build_bulk_rows(webhooks, secret_keys)
+    await db.execute(insert(WebhookPayload), payload_rows)
+    result = await db.execute(insert(DeliveryTask).returning(DeliveryTask.id), task_rows)
+    task_ids = result.scalars().all()
+    await db.commit()
+    await schedule_new_deliveries_async({task_id: task_rows[0]["next_attempt_at"] for task_id in task_ids})
+    await record_counter_changes_async(new_delivery_counts(row["subscription_id"] for row in task_rows))
+    return webhook_ids
+
+async def get_webhook_payload_async(db: AsyncSession, webhook_id: str) -> Optional[WebhookPayload]:
     """
-    Get a webhook payload by ID
+    Get a webhook payload by ID without blocking the event loop
     """
-    return db.query(WebhookPayload).filter(WebhookPayload.id == webhook_id).first()
+    return await db.get(WebhookPayload, webhook_id)
 
 def get_webhooks_by_subscription(
     db: Session, subscription_id: str, skip: int = 0, limit: int = 100
@@ -5,11 +5,13 @@ from fastapi.templating import Jinja2Templates
 
 from app.api.routes import api_router
 from app.core.config import settings
+from app.core.json_codec import CodecJSONResponse
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.PROJECT_VERSION,
-    description="Webhook Delivery Service"
+    description="Webhook Delivery Service",
+    default_response_class=CodecJSONResponse
 )
 
 # Set up CORS
@@ -1,10 +1,13 @@
 from datetime import datetime
 from enum import Enum
-from typing import Optional
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Text, JSON, Enum as SQLAEnum
+from typing import Any, Dict, Optional
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Text, JSON, LargeBinary, Index, UniqueConstraint, text, Enum as SQLAEnum
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
+from app.core.compression import decompress
+from app.core.json_codec import codec
+
 Base = declarative_base()
 
 class DeliveryStatus(str, Enum):
@@ -23,11 +26,15 @@ class Subscription(Base):
     target_url = Column(String, nullable=False)
     secret_key = Column(String, nullable=True)
     event_types = Column(JSON, nullable=True)  # For bonus: event type filtering
+    retry_policy = Column(JSON, nullable=True)  # Overrides of the default retry policy
+    content_encoding = Column(String, nullable=True)  # "gzip" to send compressed deliveries
+    batch_delivery = Column(JSON, nullable=True)  # Send webhooks in batches, with these limits
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationship with logs
     delivery_logs = relationship("DeliveryLog", back_populates="subscription")
+    delivery_tasks = relationship("DeliveryTask", back_populates="subscription")
 
 class WebhookPayload(Base):
     """
@@ -38,15 +45,72 @@ class WebhookPayload(Base):
     id = Column(String, primary_key=True, index=True)
     subscription_id = Column(String, ForeignKey("subscriptions.id"))
     event_type = Column(String, nullable=True)  # For bonus: event type filtering
-    payload = Column(JSON, nullable=False)
+    payload_json = Column("payload", JSON, nullable=True)  # NULL when the body is stored
+    # Body and signature sent on every delivery attempt, built once at ingest
+    body = Column(LargeBinary, nullable=True)
+    body_encoding = Column(String, nullable=True)  # "gzip" or "zstd" when the body is stored compressed
+    signature = Column(String, nullable=True)
+    signing_key_id = Column(String, nullable=True)  # Fingerprint of the secret the body was signed with
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationship with logs
     delivery_logs = relationship("DeliveryLog", back_populates="webhook_payload")
+    delivery_tasks = relationship("DeliveryTask", back_populates="webhook_payload")
+
+    @property
+    def payload(self) -> Optional[Dict[str, Any]]:
+        """The webhook payload, decoded from the stored body"""
+        if self.payload_json is not None or self.body is None:
+            return self.payload_json
+        return codec.loads(decompress(self.body, self.body_encoding))
+
+    @payload.setter
+    def payload(self, value: Optional[Dict[str, Any]]) -> None:
+        self.payload_json = value
+
+# Tasks still waiting to be sent. Queries spell this predicate out literally rather than
+# with bound parameters, so the planner can match it to the partial index even on a generic plan
+DUE_TASKS_PREDICATE = "status IN ('PENDING', 'FAILED_ATTEMPT')"
+
+class DeliveryTask(Base):
+    """
+    Model for the current state of delivering one webhook to one subscription
+
+    This is the work queue claimed by the workers; it is updated in place, while every
+    attempt is appended to delivery_logs.
+    """
+    __tablename__ = "delivery_tasks"
+    __table_args__ = (
+        UniqueConstraint("webhook_id", "subscription_id", name="uq_delivery_tasks_webhook_subscription"),
+        # Poll index: only unfinished tasks, ordered by due time
+        Index(
+            "ix_delivery_tasks_due", "next_attempt_at",
+            postgresql_where=text(DUE_TASKS_PREDICATE), postgresql_include=["attempt_number"]
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    webhook_id = Column(String, ForeignKey("webhook_payloads.id"), nullable=False)
+    subscription_id = Column(String, ForeignKey("subscriptions.id"), nullable=False, index=True)
+    attempt_number = Column(Integer, default=1)  # Number of the next attempt, or of the last one once finished
+    status = Column(SQLAEnum(DeliveryStatus, native_enum=False), default=DeliveryStatus.PENDING)
+    status_code = Column(Integer, nullable=True)
+    error_details = Column(Text, nullable=True)
+    next_attempt_at = Column(DateTime, nullable=True)
+    lease_owner = Column(String, nullable=True)  # Worker currently processing this delivery
+    lease_expires_at = Column(DateTime, nullable=True)  # Claim can be taken over after this
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationships
+    webhook_payload = relationship("WebhookPayload", back_populates="delivery_tasks")
+    subscription = relationship("Subscription", back_populates="delivery_tasks")
 
 class DeliveryLog(Base):
     """
     Model for webhook delivery attempts and logs
+
+    Append-only history: one row per attempt sent, never updated.
     """
     __tablename__ = "delivery_logs"
 
@@ -54,12 +118,14 @@ class DeliveryLog(Base):
     webhook_id = Column(String, ForeignKey("webhook_payloads.id"), nullable=False)
     subscription_id = Column(String, ForeignKey("subscriptions.id"), nullable=False)
     attempt_number = Column(Integer, default=1)
-    status = Column(SQLAEnum(DeliveryStatus), default=DeliveryStatus.PENDING)
+    status = Column(SQLAEnum(DeliveryStatus, native_enum=False), default=DeliveryStatus.PENDING)  # Stored as VARCHAR, as created by the migrations
     status_code = Column(Integer, nullable=True)
     error_details = Column(Text, nullable=True)
     attempt_timestamp = Column(DateTime, default=datetime.utcnow)
-    next_attempt_at = Column(DateTime, nullable=True)
+    next_attempt_at = Column(DateTime, nullable=True)  # When the delivery is retried, for failed attempts
+    queue_wait_ms = Column(Integer, nullable=True)  # Wait to be sent: since ingest, or since due for a retry
+    duration_ms = Column(Integer, nullable=True)  # HTTP round-trip of the attempt
     
     # Relationships
     webhook_payload = relationship("WebhookPayload", back_populates="delivery_logs")
-    subscription = relationship("Subscription", back_populates="delivery_logs")
\ No newline at end of file
+    subscription = relationship("Subscription", back_populates="delivery_logs")
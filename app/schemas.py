@@ -1,6 +1,6 @@
 from datetime import datetime
 from enum import Enum
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Literal, Optional, Any
 from uuid import UUID
 from pydantic import BaseModel, HttpUrl, Field
 
@@ -11,10 +11,23 @@ class DeliveryStatusEnum(str, Enum):
     FAILURE = "failure"
 
 # Subscription Schemas
+class RetryPolicyConfig(BaseModel):
+    intervals: Optional[List[int]] = Field(None, min_length=1)  # Seconds before retry 1, 2, ...
+    jitter: Optional[Literal["none", "full"]] = None
+    max_delay: Optional[int] = Field(None, gt=0)
+
+class BatchDeliveryConfig(BaseModel):
+    max_size: Optional[int] = Field(None, ge=1, le=1000)  # Webhooks per request
+    max_bytes: Optional[int] = Field(None, gt=0)  # Uncompressed request body size
+    linger_ms: Optional[int] = Field(None, ge=0, le=10000)  # Wait for more webhooks to batch
+
 class SubscriptionBase(BaseModel):
     target_url: HttpUrl
     secret_key: Optional[str] = None
     event_types: Optional[List[str]] = None  # For bonus: event type filtering
+    retry_policy: Optional[RetryPolicyConfig] = None  # Unset fields use the default policy
+    content_encoding: Optional[Literal["gzip"]] = None  # Compress deliveries the target can decompress
+    batch_delivery: Optional[BatchDeliveryConfig] = None  # Deliver webhooks in JSON array batches
 
 class SubscriptionCreate(SubscriptionBase):
     pass
@@ -23,6 +36,9 @@ class SubscriptionUpdate(BaseModel):
     target_url: Optional[HttpUrl] = None
     secret_key: Optional[str] = None
     event_types: Optional[List[str]] = None
+    retry_policy: Optional[RetryPolicyConfig] = None
+    content_encoding: Optional[Literal["gzip"]] = None
+    batch_delivery: Optional[BatchDeliveryConfig] = None
 
 class SubscriptionInDB(SubscriptionBase):
     id: str
@@ -54,6 +70,29 @@ class WebhookPayloadInDB(WebhookPayloadBase):
 class WebhookPayload(WebhookPayloadInDB):
     pass
 
+# Batch Ingest Schemas
+class WebhookBatchItem(BaseModel):
+    subscription_id: str
+    payload: Dict[str, Any]
+    event_type: Optional[str] = None
+    signature: Optional[str] = None  # Same format as the X-Hub-Signature-256 header
+
+class WebhookBatchRequest(BaseModel):
+    items: List[WebhookBatchItem] = Field(..., min_length=1)
+
+class WebhookBatchItemResult(BaseModel):
+    index: int
+    subscription_id: str
+    status: str  # "accepted", "skipped" or "rejected"
+    webhook_id: Optional[str] = None
+    message: Optional[str] = None
+
+class WebhookBatchResponse(BaseModel):
+    accepted: int
+    skipped: int
+    rejected: int
+    results: List[WebhookBatchItemResult]
+
 # Delivery Log Schemas
 class DeliveryLogBase(BaseModel):
     webhook_id: str
@@ -64,6 +103,8 @@ class DeliveryLogBase(BaseModel):
     error_details: Optional[str] = None
     attempt_timestamp: datetime
     next_attempt_at: Optional[datetime] = None
+    queue_wait_ms: Optional[int] = None
+    duration_ms: Optional[int] = None
 
 class DeliveryLogCreate(BaseModel):
     webhook_id: str
@@ -86,9 +127,11 @@ class DeliveryLog(DeliveryLogInDB):
 class DeliveryStatus(BaseModel):
     webhook_id: str
     subscription_id: str
-    target_url: HttpUrl
-    current_status: DeliveryStatusEnum
-    attempt_count: int
-    last_attempt: datetime
-    next_attempt: Optional[datetime] = None
+    target_url: Optional[HttpUrl] = None
+    current_status: Optional[DeliveryStatusEnum] = None  # None once retention removed the finished delivery
+    attempt_number: Optional[int] = None  # Of the next attempt, or of the last one once finished
+    status_code: Optional[int] = None
+    error_details: Optional[str] = None
+    last_attempt: Optional[datetime] = None
+    next_attempt: Optional[datetime] = None  # Set while the delivery is waiting to be sent
     history: List[DeliveryLog] = []
\ No newline at end of file
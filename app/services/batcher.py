@@ -0,0 +1,108 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class BatchLimits:
+    """When a subscription's pending batch is sent"""
+    max_size: int = field(default_factory=lambda: settings.BATCH_DELIVERY_MAX_SIZE)
+    max_bytes: int = field(default_factory=lambda: settings.BATCH_DELIVERY_MAX_BYTES)
+    linger_ms: int = field(default_factory=lambda: settings.BATCH_DELIVERY_LINGER_MS)
+
+    @classmethod
+    def for_subscription(cls, overrides: Optional[Dict[str, Any]]) -> "BatchLimits":
+        """Build the limits of a subscription from its `batch_delivery` settings"""
+        return cls(**{key: value for key, value in (overrides or {}).items() if value is not None})
+
+@dataclass
+class BatchItem:
+    """One delivery waiting in a batch, with the body it contributes"""
+    delivery: Any
+    body: bytes
+
+class _PendingBatch:
+    def __init__(self, limits: BatchLimits):
+        self.limits = limits
+        self.items: List[BatchItem] = []
+        self.size_bytes = 0
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+class DeliveryBatcher:
+    """
+    Groups due deliveries per subscription into batches
+
+    A subscription's batch is handed to `send` once it holds `max_size` deliveries,
+    would grow past `max_bytes`, or `linger_ms` after its first delivery arrived,
+    whichever comes first. A delivery larger than `max_bytes` is sent on its own.
+    """
+
+    def __init__(self, send: Callable[[str, List[BatchItem]], Awaitable[None]]):
+        self.send = send
+        self._pending: Dict[str, _PendingBatch] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self.pending = 0  # Deliveries waiting in batches that were not sent yet
+        self.batches = 0
+        self.deliveries = 0
+        self.max_batch_size = 0
+
+    def add(self, subscription_id: str, item: BatchItem, limits: BatchLimits) -> None:
+        """Add a delivery to its subscription's batch, sending the batch if it is full"""
+        batch = self._pending.get(subscription_id)
+        if batch is not None and batch.size_bytes + len(item.body) + 1 > batch.limits.max_bytes:
+            self.flush(subscription_id)
+            batch = None
+        if batch is None:
+            batch = self._pending[subscription_id] = _PendingBatch(limits)
+            batch.timer = asyncio.get_running_loop().call_later(
+                limits.linger_ms / 1000, self.flush, subscription_id
+            )
+
+        batch.items.append(item)
+        batch.size_bytes += len(item.body) + 1  # Plus a separator
+        self.pending += 1
+        if len(batch.items) >= limits.max_size or batch.size_bytes >= limits.max_bytes:
+            self.flush(subscription_id)
+
+    def flush(self, subscription_id: str) -> None:
+        """Send a subscription's pending batch now"""
+        batch = self._pending.pop(subscription_id, None)
+        if batch is None:
+            return
+        if batch.timer is not None:
+            batch.timer.cancel()
+        self.pending -= len(batch.items)
+        self.batches += 1
+        self.deliveries += len(batch.items)
+        self.max_batch_size = max(self.max_batch_size, len(batch.items))
+        task = asyncio.create_task(self._send(subscription_id, batch.items))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, subscription_id: str, items: List[BatchItem]) -> None:
+        try:
+            await self.send(subscription_id, items)
+        except Exception as e:
+            # Their leases are kept, so the deliveries are claimed again once they expire
+            logger.error(f"Error sending batch of {len(items)} to subscription {subscription_id}: {e}", exc_info=True)
+
+    async def close(self) -> None:
+        """Send every pending batch and wait for all batches in flight"""
+        for subscription_id in list(self._pending):
+            self.flush(subscription_id)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": self.pending,
+            "sending": len(self._tasks),
+            "batches": self.batches,
+            "deliveries": self.deliveries,
+            "avg_batch_size": round(self.deliveries / self.batches, 2) if self.batches else 0,
+            "max_batch_size": self.max_batch_size,
+        }
@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Dict, Optional, Set, Tuple
+
+from app.core.cache import AsyncRedisCache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# How long to hold back a delivery when a half-open breaker already has its probes out
+PROBE_BUSY_DEFER_SECONDS = 5.0
+
+# Share of deliveries let through at the start of the slow-start ramp
+RAMP_MIN_SHARE = 0.1
+
+def is_endpoint_failure(status_code: Optional[int]) -> bool:
+    """Whether a delivery result means the endpoint itself is unhealthy"""
+    return status_code is None or status_code == 408 or status_code >= 500
+
+class CircuitBreaker:
+    """
+    Per-subscription circuit breakers, shared by all workers through Redis
+
+    A breaker opens after CIRCUIT_FAILURE_THRESHOLD endpoint failures (timeouts,
+    connection errors, 5xx) within CIRCUIT_FAILURE_WINDOW seconds. While it is open,
+    deliveries are rescheduled without a network call. Once the open period is over
+    it turns half-open and lets CIRCUIT_HALF_OPEN_PROBES probe deliveries through. A
+    failed probe opens it again for twice as long. After CIRCUIT_PROBE_SUCCESSES
+    successful probes it recovers, letting a growing share of deliveries through over
+    CIRCUIT_RAMP_SECONDS before closing.
+
+    Only breakers that are not closed live in Redis. Each worker reloads them every
+    CIRCUIT_REFRESH_INTERVAL, so admitting a delivery to a healthy subscription costs
+    no Redis call.
+    """
+
+    def __init__(self):
+        self._breakers: Dict[str, Dict[str, Any]] = {}
+        self._failing: Set[str] = set()  # Subscriptions with failures since their last success
+        self.rejected = 0
+        self.probes = 0
+
+    async def refresh(self) -> None:
+        """Reload the breakers that are not closed"""
+        self._breakers = await AsyncRedisCache.get_circuit_breakers()
+
+    async def run(self) -> None:
+        """Keep the local view of breakers fresh until cancelled"""
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning(f"Error refreshing circuit breakers: {e}")
+            await asyncio.sleep(settings.CIRCUIT_REFRESH_INTERVAL)
+
+    async def allow(self, subscription_id: str) -> Tuple[bool, float]:
+        """
+        Decide whether a delivery to a subscription may be sent now
+
+        Returns (True, 0) to send it, or (False, delay) with the number of seconds to
+        reschedule it by.
+        """
+        breaker = self._breakers.get(subscription_id)
+        if breaker is None:
+            return True, 0.0
+
+        wait = self.open_delay(subscription_id)
+        if wait > 0:
+            return False, wait
+
+        now = time.time()
+        state = breaker["state"]
+        if state == "recovering":
+            ramp = max(breaker["ramp_until"] - breaker["ramp_started"], 1.0)
+            share = max(RAMP_MIN_SHARE, (now - breaker["ramp_started"]) / ramp)
+            if random.random() < share:
+                return True, 0.0
+            self.rejected += 1
+            return False, 1.0 + random.random()
+
+        # Open period over, or half-open: only probes get through
+        try:
+            state, allowed = await AsyncRedisCache.acquire_circuit_probe(subscription_id, now)
+        except Exception as e:
+            logger.warning(f"Error acquiring circuit probe for subscription {subscription_id}: {e}")
+            return True, 0.0
+        breaker["state"] = state
+        if allowed:
+            self.probes += 1
+            return True, 0.0
+        self.rejected += 1
+        return False, PROBE_BUSY_DEFER_SECONDS + random.random()
+
+    def open_delay(self, subscription_id: str) -> float:
+        """
+        Seconds until a subscription's open breaker lets deliveries through again, or 0
+
+        Unlike `allow()`, this never takes a probe or calls Redis, so the worker can ask
+        before loading a delivery's payload.
+        """
+        breaker = self._breakers.get(subscription_id)
+        if breaker is None or breaker["state"] != "open":
+            return 0.0
+        now = time.time()
+        if now >= breaker["open_until"]:
+            return 0.0
+        self.rejected += 1
+        # Spread the deliveries held back by one breaker over the following second
+        return breaker["open_until"] - now + random.random()
+
+    async def record(self, subscription_id: str, status_code: Optional[int]) -> None:
+        """Count the result of a sent delivery against its subscription's breaker"""
+        failure = is_endpoint_failure(status_code)
+        if not failure and subscription_id not in self._breakers and subscription_id not in self._failing:
+            # Healthy subscription with nothing to reset
+            return
+
+        if failure:
+            self._failing.add(subscription_id)
+        else:
+            self._failing.discard(subscription_id)
+        try:
+            breaker = await AsyncRedisCache.record_circuit_result(subscription_id, not failure, time.time())
+        except Exception as e:
+            logger.warning(f"Error recording circuit result for subscription {subscription_id}: {e}")
+            return
+
+        if breaker["state"] == "closed":
+            if self._breakers.pop(subscription_id, None) is not None:
+                logger.info(f"Circuit breaker for subscription {subscription_id} closed")
+        else:
+            if breaker["state"] == "open" and self._breakers.get(subscription_id, {}).get("state") != "open":
+                logger.warning(
+                    f"Circuit breaker for subscription {subscription_id} opened "
+                    f"for {breaker['open_seconds']:.0f}s"
+                )
+            self._breakers[subscription_id] = breaker
+
+    def stats(self) -> Dict[str, Any]:
+        states: Dict[str, int] = {}
+        for breaker in self._breakers.values():
+            states[breaker["state"]] = states.get(breaker["state"], 0) + 1
+        return {
+            "tripped": states,
+            "rejected": self.rejected,
+            "probes": self.probes,
+        }
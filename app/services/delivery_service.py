@@ -1,121 +1,306 @@
 import asyncio
-import hmac
-import hashlib
-import json
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, Optional, Tuple, Any
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional, Tuple, Any
 
 import aiohttp
-from sqlalchemy.orm import Session
 
-from app.models import DeliveryStatus, DeliveryLog
-from app.crud import delivery as delivery_crud
+from app.models import DeliveryStatus, DeliveryTask, WebhookPayload
 from app.core.config import settings
+from app.services.retry_policy import DEFAULT_RETRY_POLICY, MAX_DELIVERY_ATTEMPTS, RetryPolicy
+from app.core.compression import compress, decompress
+from app.services.signing import outbound_body, sign_body, signature_is_current
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@dataclass
+class DeliveryOutcome:
+    """New state of a delivery task after an attempt, ready to be written back"""
+    task_id: int
+    status: DeliveryStatus
+    attempt_number: int
+    status_code: Optional[int] = None
+    error_details: Optional[str] = None
+    next_attempt_at: Optional[datetime] = None
+    attempted: Optional[int] = None  # Number of the attempt sent, or None if nothing was sent
+    attempted_at: Optional[datetime] = None
+    queue_wait_ms: Optional[int] = None  # How long the attempt waited to be sent
+    duration_ms: Optional[int] = None  # HTTP round-trip of the attempt
+
+    def attempt_log(self, webhook_id: str, subscription_id: str) -> Dict[str, Any]:
+        """Row recording the attempt in the delivery_logs history"""
+        return {
+            "webhook_id": webhook_id,
+            "subscription_id": subscription_id,
+            "attempt_number": self.attempted,
+            "status": self.status,
+            "status_code": self.status_code,
+            "error_details": None if self.status == DeliveryStatus.SUCCESS else self.error_details,
+            "attempt_timestamp": self.attempted_at,
+            "next_attempt_at": self.next_attempt_at if self.status == DeliveryStatus.FAILED_ATTEMPT else None,
+            "queue_wait_ms": self.queue_wait_ms,
+            "duration_ms": self.duration_ms,
+        }
+
 class WebhookDeliveryService:
     @staticmethod
     async def process_delivery(
-        db: Session, 
-        log: DeliveryLog, 
         webhook_payload: Dict[str, Any], 
         target_url: str,
         secret_key: Optional[str] = None,
-        event_type: Optional[str] = None
-    ) -> Tuple[bool, Optional[int], Optional[str]]:
+        event_type: Optional[str] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+        body: Optional[bytes] = None,
+        signature: Optional[str] = None,
+        signing_key_id: Optional[str] = None,
+        body_encoding: Optional[str] = None,
+        content_encoding: Optional[str] = None
+    ) -> Tuple[bool, Optional[int], Optional[str], Optional[float]]:
         """
         Process a webhook delivery attempt
         
-        Returns a tuple of (success: bool, status_code: Optional[int], error_details: Optional[str])
+        Pass the worker's long-lived `session` to reuse pooled connections; without it a
+        one-off session is opened for this attempt. Pass the `body`, `body_encoding`,
+        `signature` and `signing_key_id` stored with the webhook to send the bytes signed
+        at ingest instead of serializing and signing the payload again. With a
+        `content_encoding` of `gzip`, large bodies are sent compressed.
+
+        Returns a tuple of (success: bool, status_code: Optional[int], error_details: Optional[str],
+        retry_after: Optional[float]), where retry_after is the delay in seconds requested by
+        the target's `Retry-After` header, if any
         """
         try:
-            payload_json = json.dumps(webhook_payload)
+            payload_json, signature, encoding = WebhookDeliveryService._request_body(
+                webhook_payload, secret_key, body, body_encoding, signature, signing_key_id, content_encoding
+            )
             headers = {
                 'Content-Type': 'application/json',
             }
+            if encoding:
+                headers['Content-Encoding'] = encoding
             
             # Add signature verification if secret is present (for bonus points)
-            if secret_key:
-                signature = WebhookDeliveryService._generate_signature(payload_json, secret_key)
+            if signature:
                 headers['X-Hub-Signature-256'] = f'sha256={signature}'
                 
             # Add event type if provided (for bonus points)
             if event_type:
                 headers['X-Webhook-Event'] = event_type
             
-            # Make HTTP request with timeout
+            # Make HTTP request with timeout, reusing the worker's pooled client when given
+            if session is not None:
+                return await WebhookDeliveryService._post(session, target_url, payload_json, headers)
             async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    target_url, 
-                    data=payload_json, 
-                    headers=headers,
-                    timeout=settings.DELIVERY_TIMEOUT
-                ) as response:
-                    status_code = response.status
-                    if 200 <= status_code < 300:
-                        # Successful delivery
-                        return True, status_code, None
-                    else:
-                        # Server responded with an error
-                        error_details = f"Target server responded with status {status_code}"
-                        response_text = await response.text()
-                        if response_text:
-                            error_details += f": {response_text[:200]}"  # Truncate long responses
-                        return False, status_code, error_details
+                return await WebhookDeliveryService._post(session, target_url, payload_json, headers)
                         
         except asyncio.TimeoutError:
-            return False, None, f"Request timed out after {settings.DELIVERY_TIMEOUT} seconds"
+            return False, None, f"Request timed out after {settings.DELIVERY_TIMEOUT} seconds", None
         except aiohttp.ClientError as e:
-            return False, None, f"Connection error: {str(e)}"
+            return False, None, f"Connection error: {str(e)}", None
         except Exception as e:
-            return False, None, f"Unexpected error: {str(e)}"
+            return False, None, f"Unexpected error: {str(e)}", None
     
     @staticmethod
-    def _generate_signature(payload: str, secret: str) -> str:
-        """Generate HMAC-SHA256 signature for payload verification"""
-        return hmac.new(
-            secret.encode('utf-8'),
-            payload.encode('utf-8'),
-            hashlib.sha256
-        ).hexdigest()
-    
+    async def process_batch(
+        bodies: List[bytes],
+        target_url: str,
+        secret_key: Optional[str] = None,
+        event_type: Optional[str] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+        content_encoding: Optional[str] = None
+    ) -> Tuple[bool, Optional[int], Optional[str], Optional[float]]:
+        """
+        Send several webhooks for one subscription in a single request
+
+        The body is a JSON array of the webhook bodies, in order, signed as a whole.
+        `X-Webhook-Batch-Size` gives the number of webhooks, and `X-Webhook-Event` is
+        set only if they all share `event_type`. Returns the same tuple as
+        `process_delivery`, which applies to every webhook in the batch.
+        """
+        try:
+            body = b"[" + b",".join(bodies) + b"]"
+            headers = {
+                'Content-Type': 'application/json',
+                'X-Webhook-Batch-Size': str(len(bodies)),
+            }
+            if secret_key:
+                headers['X-Hub-Signature-256'] = f'sha256={sign_body(body, secret_key)}'
+            if event_type:
+                headers['X-Webhook-Event'] = event_type
+            if content_encoding and len(body) >= settings.PAYLOAD_COMPRESSION_THRESHOLD:
+                body = compress(body, content_encoding)
+                headers['Content-Encoding'] = content_encoding
+
+            if session is not None:
+                return await WebhookDeliveryService._post(session, target_url, body, headers)
+            async with aiohttp.ClientSession() as session:
+                return await WebhookDeliveryService._post(session, target_url, body, headers)
+
+        except asyncio.TimeoutError:
+            return False, None, f"Request timed out after {settings.DELIVERY_TIMEOUT} seconds", None
+        except aiohttp.ClientError as e:
+            return False, None, f"Connection error: {str(e)}", None
+        except Exception as e:
+            return False, None, f"Unexpected error: {str(e)}", None
+
+    @staticmethod
+    def plain_body(webhook_payload: WebhookPayload) -> bytes:
+        """The uncompressed body of a stored webhook, as sent on its own"""
+        body = webhook_payload.body
+        if body is not None:
+            body = decompress(body, webhook_payload.body_encoding)
+        return outbound_body(webhook_payload.payload_json, None, body)[0]
+
     @staticmethod
-    async def handle_delivery_result(
-        db: Session,
-        log: DeliveryLog,
+    async def _post(
+        session: aiohttp.ClientSession,
+        target_url: str,
+        payload_json: bytes,
+        headers: Dict[str, str]
+    ) -> Tuple[bool, Optional[int], Optional[str], Optional[float]]:
+        """Send one delivery request and classify the response"""
+        async with session.post(
+            target_url, 
+            data=payload_json, 
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=settings.DELIVERY_TIMEOUT)
+        ) as response:
+            status_code = response.status
+            if 200 <= status_code < 300:
+                # Successful delivery; drain the body so the connection returns to the pool
+                await response.read()
+                return True, status_code, None, None
+            else:
+                # Server responded with an error
+                error_details = f"Target server responded with status {status_code}"
+                response_text = await response.text()
+                if response_text:
+                    error_details += f": {response_text[:200]}"  # Truncate long responses
+                retry_after = WebhookDeliveryService._parse_retry_after(response.headers.get("Retry-After"))
+                return False, status_code, error_details, retry_after
+
+    @staticmethod
+    def _request_body(
+        webhook_payload: Optional[Dict[str, Any]],
+        secret_key: Optional[str],
+        body: Optional[bytes],
+        body_encoding: Optional[str],
+        signature: Optional[str],
+        signing_key_id: Optional[str],
+        content_encoding: Optional[str]
+    ) -> Tuple[bytes, Optional[str], Optional[str]]:
+        """
+        Bytes to send, their signature and their Content-Encoding
+
+        A body stored compressed in the encoding the subscriber accepts is sent as is.
+        The signature always covers the uncompressed body.
+        """
+        if body is not None and body_encoding and body_encoding == content_encoding:
+            if signature_is_current(secret_key, signature, signing_key_id):
+                return body, signature, body_encoding
+
+        if body is not None:
+            body = decompress(body, body_encoding)
+        body, signature = outbound_body(webhook_payload, secret_key, body, signature, signing_key_id)
+        if content_encoding and len(body) >= settings.PAYLOAD_COMPRESSION_THRESHOLD:
+            return compress(body, content_encoding), signature, content_encoding
+        return body, signature, None
+
+    @staticmethod
+    def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """Convert a Retry-After header (delay in seconds or HTTP date) to seconds from now"""
+        if not value:
+            return None
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+    @staticmethod
+    def compute_delivery_outcome(
+        task: DeliveryTask,
         success: bool,
-        status_code: int,
-        error_details: Optional[str]
-    ) -> Tuple[DeliveryLog, bool]:
+        status_code: Optional[int],
+        error_details: Optional[str],
+        retry_after: Optional[float] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        max_attempts: int = MAX_DELIVERY_ATTEMPTS
+    ) -> Tuple[DeliveryOutcome, bool]:
         """
-        Handle the result of a webhook delivery attempt
+        Decide the new state of a delivery task after an attempt, without touching the database
+
+        Retries are scheduled by the subscription's `retry_policy` (the default policy if
+        None) and never earlier than the target's `retry_after` delay. A retryable failure
+        of attempt `max_attempts` is final.
+        Returns the outcome to persist and whether the delivery will be retried.
         """
+        outcome = DeliveryOutcome(
+            task_id=task.id,
+            status=task.status,
+            attempt_number=task.attempt_number,
+            status_code=task.status_code,
+            error_details=task.error_details,
+            next_attempt_at=task.next_attempt_at,
+            attempted=task.attempt_number,
+            attempted_at=datetime.utcnow()
+        )
         if success:
-            log.status = DeliveryStatus.SUCCESS
-            log.status_code = status_code
-            should_retry = False
+            outcome.status = DeliveryStatus.SUCCESS
+            outcome.status_code = status_code
+            return outcome, False
+
+        # Check if we should retry based on status code
+        retryable = status_code in [408, 429, 500, 502, 503, 504]
+        if retryable and task.attempt_number < max_attempts:
+            outcome.status = DeliveryStatus.FAILED_ATTEMPT
+            outcome.attempt_number += 1
+            outcome.next_attempt_at = (retry_policy or DEFAULT_RETRY_POLICY).next_attempt_at(
+                outcome.attempt_number - 1, retry_after
+            )
+            should_retry = True
         else:
-            # Check if we should retry based on status code
-            if status_code in [408, 429, 500, 502, 503, 504]:  # Retryable status codes
-                log.status = DeliveryStatus.FAILED_ATTEMPT
-                log.attempt_number += 1
-                # Implement exponential backoff
-                retry_delay = min(300, 2 ** (log.attempt_number - 1))  # Max 5 minutes
-                log.next_attempt_at = datetime.utcnow() + timedelta(seconds=retry_delay)
-                should_retry = True
-            else:
-                log.status = DeliveryStatus.FAILURE
-                should_retry = False
-            
-            log.status_code = status_code
-            log.error_details = error_details
+            outcome.status = DeliveryStatus.FAILURE
+            should_retry = False
 
-        db.add(log)
-        db.commit()
-        db.refresh(log)
-        
-        return log, should_retry
\ No newline at end of file
+        outcome.status_code = status_code
+        outcome.error_details = error_details
+        return outcome, should_retry
+
+    @staticmethod
+    def compute_processing_error_outcome(
+        task: DeliveryTask,
+        error_details: str,
+        retry_policy: Optional[RetryPolicy] = None,
+        max_attempts: int = MAX_DELIVERY_ATTEMPTS
+    ) -> DeliveryOutcome:
+        """
+        Decide the new state of a delivery task that could not be sent because processing it raised
+
+        The error counts as an attempt: the task is retried on the subscription's
+        `retry_policy` like a failed delivery, and fails for good once `max_attempts`
+        is used up, so a delivery that can never be prepared is not claimed in a loop.
+        Nothing was sent, so there is no attempt to log.
+        """
+        outcome = DeliveryOutcome(
+            task_id=task.id,
+            status=DeliveryStatus.FAILED_ATTEMPT,
+            attempt_number=task.attempt_number + 1,
+            status_code=task.status_code,
+            error_details=error_details,
+            next_attempt_at=(retry_policy or DEFAULT_RETRY_POLICY).next_attempt_at(task.attempt_number)
+        )
+        if task.attempt_number >= max_attempts:
+            outcome.status = DeliveryStatus.FAILURE
+            outcome.attempt_number = task.attempt_number
+            outcome.next_attempt_at = task.next_attempt_at
+        return outcome
\ No newline at end of file
@@ -0,0 +1,152 @@
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+from app.core.config import settings
+
+# Responses telling us the destination is overloaded
+THROTTLE_STATUS_CODES = (429, 503)
+
+# How soon to look again at a host whose concurrency limit is reached
+SATURATED_RECHECK_SECONDS = 0.05
+
+def host_of(target_url: str) -> str:
+    """Destination key used for limiting: the URL's host and port"""
+    return urlsplit(target_url).netloc.lower()
+
+class _HostState:
+    __slots__ = ("limit", "in_flight", "rate", "tokens", "refilled_at", "blocked_until",
+                 "successes", "throttled_at", "last_used")
+
+    def __init__(self, limit: int, rate: float, burst: float, now: float):
+        self.limit = limit
+        self.in_flight = 0
+        self.rate = rate
+        self.tokens = burst
+        self.refilled_at = now
+        self.blocked_until = 0.0
+        self.successes = 0
+        self.throttled_at = float("-inf")
+        self.last_used = now
+
+class HostLimiter:
+    """
+    Per-destination concurrency limit and token-bucket rate limit for one worker
+
+    Both limits adapt: a 429 or 503 halves the host's concurrency and rate (at most
+    once per `cooldown`) and a `Retry-After` blocks the host until then, while
+    successful responses raise them again step by step up to the configured maximums.
+
+    `acquire()` never waits. It returns how long the caller should hold the delivery
+    before trying again, so a saturated host never ties up a consumer that could be
+    sending to other hosts.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        max_rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        min_rate: Optional[float] = None,
+        cooldown: float = 1.0,
+    ):
+        self.max_concurrency = max_concurrency or settings.HOST_MAX_CONCURRENCY
+        self.max_rate = max_rate or settings.HOST_RATE_LIMIT
+        self.burst = burst or settings.HOST_RATE_BURST
+        self.min_rate = min_rate or settings.HOST_MIN_RATE
+        self.cooldown = cooldown
+        self._hosts: Dict[str, _HostState] = {}
+        self.throttled = 0  # 429/503 responses seen
+
+    def _state(self, host: str, now: float) -> _HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostState(self.max_concurrency, self.max_rate, self.burst, now)
+        return state
+
+    def acquire(self, host: str, now: Optional[float] = None) -> float:
+        """
+        Take a slot for one request to `host`
+
+        Returns 0 when the request may be sent now (call `release()` afterwards), or the
+        number of seconds to wait before asking again.
+        """
+        now = time.monotonic() if now is None else now
+        state = self._state(host, now)
+        state.last_used = now
+
+        if state.blocked_until > now:
+            return state.blocked_until - now
+        if state.in_flight >= state.limit:
+            return SATURATED_RECHECK_SECONDS
+
+        state.tokens = min(self.burst, state.tokens + (now - state.refilled_at) * state.rate)
+        state.refilled_at = now
+        if state.tokens < 1:
+            return (1 - state.tokens) / state.rate
+
+        state.tokens -= 1
+        state.in_flight += 1
+        return 0.0
+
+    def release(
+        self,
+        host: str,
+        status_code: Optional[int] = None,
+        retry_after: Optional[float] = None,
+        now: Optional[float] = None
+    ) -> None:
+        """Return a slot taken by `acquire()` and adapt the host's limits to the response"""
+        now = time.monotonic() if now is None else now
+        state = self._state(host, now)
+        state.in_flight = max(0, state.in_flight - 1)
+        state.last_used = now
+
+        if status_code in THROTTLE_STATUS_CODES:
+            self.throttled += 1
+            state.successes = 0
+            if retry_after:
+                state.blocked_until = max(state.blocked_until, now + retry_after)
+            # Responses to requests sent in the same burst count as one signal
+            if now - state.throttled_at >= self.cooldown:
+                state.throttled_at = now
+                state.limit = max(1, state.limit // 2)
+                state.rate = max(self.min_rate, state.rate / 2)
+        elif status_code is not None and 200 <= status_code < 300:
+            state.successes += 1
+            if state.successes >= state.limit:
+                state.successes = 0
+                state.limit = min(self.max_concurrency, state.limit + 1)
+                state.rate = min(self.max_rate, state.rate + self.max_rate / 10)
+
+    def prune(self, idle_seconds: float = 600.0, now: Optional[float] = None) -> int:
+        """Forget hosts that have been idle and unthrottled for `idle_seconds`"""
+        now = time.monotonic() if now is None else now
+        idle = [
+            host for host, state in self._hosts.items()
+            if not state.in_flight and state.blocked_until <= now and now - state.last_used >= idle_seconds
+        ]
+        for host in idle:
+            del self._hosts[host]
+        return len(idle)
+
+    def stats(self) -> Dict[str, Any]:
+        """Overall counters, plus details of every host currently limited below the maximums"""
+        now = time.monotonic()
+        limited = {
+            host: {
+                "limit": state.limit,
+                "in_flight": state.in_flight,
+                "rate": round(state.rate, 2),
+                "blocked_for": round(max(0.0, state.blocked_until - now), 1),
+            }
+            for host, state in self._hosts.items()
+            if state.limit < self.max_concurrency or state.rate < self.max_rate or state.blocked_until > now
+        }
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_rate": self.max_rate,
+            "hosts": len(self._hosts),
+            "throttled": self.throttled,
+            "limited_hosts": limited,
+        }
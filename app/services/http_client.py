@@ -0,0 +1,138 @@
+import ssl
+from types import SimpleNamespace
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+from app.core.config import settings
+
+class PoolCounters:
+    """
+    Connection pool usage counted from aiohttp's public tracing hooks
+
+    aiohttp keeps its pool bookkeeping private, so every request reports here when it
+    waits for a connection slot, gets a new or pooled connection, and finishes. A
+    connection counts as in use from the moment it is handed to a request until that
+    request ends; requests are counted under the host they were sent to.
+    """
+
+    def __init__(self):
+        self.hosts: Dict[str, Dict[str, int]] = {}  # Hosts with requests in use or waiting
+        self.created = 0
+        self.reused = 0
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_connection_queued_start.append(self._on_queued_start)
+        trace_config.on_connection_queued_end.append(self._on_queued_end)
+        trace_config.on_connection_create_end.append(self._on_created)
+        trace_config.on_connection_reuseconn.append(self._on_reused)
+        trace_config.on_request_redirect.append(self._on_request_done)
+        trace_config.on_request_end.append(self._on_request_done)
+        trace_config.on_request_exception.append(self._on_request_done)
+        return trace_config
+
+    def _add(self, host: str, field: str, count: int) -> None:
+        counts = self.hosts.setdefault(host, {"in_use": 0, "waiting": 0})
+        counts[field] += count
+        if not (counts["in_use"] or counts["waiting"]):
+            del self.hosts[host]
+
+    async def _on_request_start(self, session, context: SimpleNamespace, params) -> None:
+        context.host = f"{params.url.host}:{params.url.port}"
+        context.waiting = context.in_use = False
+
+    async def _on_queued_start(self, session, context: SimpleNamespace, params) -> None:
+        context.waiting = True
+        self._add(context.host, "waiting", 1)
+
+    async def _on_queued_end(self, session, context: SimpleNamespace, params) -> None:
+        if context.waiting:
+            context.waiting = False
+            self._add(context.host, "waiting", -1)
+
+    async def _on_created(self, session, context: SimpleNamespace, params) -> None:
+        self.created += 1
+        context.in_use = True
+        self._add(context.host, "in_use", 1)
+
+    async def _on_reused(self, session, context: SimpleNamespace, params) -> None:
+        self.reused += 1
+        context.in_use = True
+        self._add(context.host, "in_use", 1)
+
+    async def _on_request_done(self, session, context: SimpleNamespace, params) -> None:
+        """The request ended, failed or is redirected; a redirect gets its next connection anew"""
+        await self._on_queued_end(session, context, params)
+        if context.in_use:
+            context.in_use = False
+            self._add(context.host, "in_use", -1)
+
+class DeliveryHttpClient:
+    """
+    Long-lived outbound HTTP client shared by every delivery of a worker
+
+    Owns a single keep-alive connection pool with total and per-host limits, a DNS
+    cache and one SSL context, so repeated deliveries to the same hosts skip the DNS
+    lookup and the TCP/TLS handshakes. Pool usage is counted through tracing hooks.
+    """
+
+    def __init__(
+        self,
+        limit: Optional[int] = None,
+        limit_per_host: Optional[int] = None,
+        dns_cache_ttl: Optional[int] = None,
+        keepalive_timeout: Optional[float] = None,
+    ):
+        self.limit = limit if limit is not None else settings.HTTP_POOL_LIMIT
+        self.limit_per_host = limit_per_host if limit_per_host is not None else settings.HTTP_POOL_LIMIT_PER_HOST
+        self.dns_cache_ttl = dns_cache_ttl if dns_cache_ttl is not None else settings.HTTP_DNS_CACHE_TTL
+        self.keepalive_timeout = keepalive_timeout if keepalive_timeout is not None else settings.HTTP_KEEPALIVE_TIMEOUT
+        self._connector: Optional[aiohttp.TCPConnector] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.counters = PoolCounters()
+
+    async def start(self) -> None:
+        """Open the connection pool; must be called from the worker's event loop"""
+        if self._session is not None:
+            return
+        self._connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            use_dns_cache=True,
+            ttl_dns_cache=self.dns_cache_ttl,
+            keepalive_timeout=self.keepalive_timeout,
+            ssl=ssl.create_default_context(),
+        )
+        self._session = aiohttp.ClientSession(
+            connector=self._connector,
+            timeout=aiohttp.ClientTimeout(total=settings.DELIVERY_TIMEOUT),
+            trace_configs=[self.counters.trace_config()],
+        )
+
+    async def close(self) -> None:
+        """Close all pooled connections"""
+        if self._session is not None:
+            await self._session.close()
+        self._session = None
+        self._connector = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None:
+            raise RuntimeError("DeliveryHttpClient.start() must be called before use")
+        return self._session
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of the connection pool: connections in use and requests waiting, overall and per host"""
+        hosts = {host: dict(counts) for host, counts in self.counters.hosts.items()}
+        return {
+            "limit": self.limit,
+            "limit_per_host": self.limit_per_host,
+            "in_use": sum(counts["in_use"] for counts in hosts.values()),
+            "waiting": sum(counts["waiting"] for counts in hosts.values()),
+            "connections_created": self.counters.created,
+            "connections_reused": self.counters.reused,
+            "hosts": hosts,
+        }
@@ -0,0 +1,190 @@
+import asyncio
+import logging
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.cache import AsyncRedisCache, RedisCache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# What is measured for every attempt sent
+LATENCY_METRICS = ("queue_wait", "duration")
+
+# Buckets per doubling of the value; each bucket spans about 9%, which bounds the
+# relative error of a percentile
+SUB_BUCKETS = 8
+# Bucket 0 holds values below 1 ms, the last one everything from 2^20 ms (about 17 minutes)
+BUCKETS = 20 * SUB_BUCKETS + 2
+
+def bucket_of(value_ms: float) -> int:
+    """Index of the bucket counting `value_ms`"""
+    if value_ms < 1:
+        return 0
+    return min(BUCKETS - 1, 1 + int(math.log2(value_ms) * SUB_BUCKETS))
+
+def bucket_upper_bound(index: int) -> float:
+    """Largest value, in milliseconds, counted by a bucket"""
+    return 2 ** (index / SUB_BUCKETS)
+
+class LatencyHistogram:
+    """
+    Fixed-size log-bucketed histogram of latencies in milliseconds
+
+    Memory does not grow with the number of values recorded, and two histograms are
+    merged by adding their bucket counts, so histograms of several workers or windows
+    combine into one. Percentiles are reported as the upper bound of their bucket.
+    """
+
+    def __init__(self):
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.sum = 0.0
+
+    def record(self, value_ms: float) -> None:
+        index = bucket_of(max(0.0, value_ms))
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.sum += value_ms
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        """Add the counts of `other` to this histogram"""
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+        self.sum += other.sum
+        return self
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Value below which `percent`% of the recorded values fall, or None if empty"""
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(self.count * percent / 100))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return round(bucket_upper_bound(index), 1)
+        return round(bucket_upper_bound(max(self.buckets)), 1)
+
+    def to_fields(self) -> Dict[str, float]:
+        """Redis hash fields of this histogram: `n`, `sum` and one field per bucket used"""
+        fields: Dict[str, float] = {str(index): count for index, count in self.buckets.items()}
+        fields["n"] = self.count
+        fields["sum"] = self.sum
+        return fields
+
+    @classmethod
+    def from_fields(cls, fields: Dict[str, str]) -> "LatencyHistogram":
+        histogram = cls()
+        for field, value in fields.items():
+            if field == "n":
+                histogram.count = int(value)
+            elif field == "sum":
+                histogram.sum = float(value)
+            else:
+                histogram.buckets[int(field)] = int(value)
+        return histogram
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean": round(self.sum / self.count, 1) if self.count else None,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+        }
+
+def window_start(at: datetime, window_seconds: Optional[int] = None) -> int:
+    """UNIX time of the start of the window a naive UTC datetime falls in"""
+    window_seconds = window_seconds or settings.LATENCY_WINDOW_SECONDS
+    timestamp = int(at.replace(tzinfo=timezone.utc).timestamp())
+    return timestamp - timestamp % window_seconds
+
+class LatencyRecorder:
+    """
+    Collects a worker's latency histograms per subscription and window, flushing them to Redis
+
+    Attempts are recorded in memory and added to the shared histograms every
+    LATENCY_FLUSH_INTERVAL seconds with one pipelined round-trip, so recording costs
+    no Redis call per attempt. Each window's histograms expire LATENCY_RETENTION_HOURS
+    after the window. Histograms that cannot be flushed are kept for the next flush.
+    """
+
+    def __init__(self):
+        self.flush_interval = settings.LATENCY_FLUSH_INTERVAL
+        self._pending: Dict[Tuple[str, str, int], LatencyHistogram] = {}
+        self.recorded = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+
+    def record(
+        self, subscription_id: str, at: datetime, queue_wait_ms: Optional[float], duration_ms: Optional[float]
+    ) -> None:
+        """Record the latencies of one attempt sent at `at`"""
+        window = window_start(at)
+        for metric, value in zip(LATENCY_METRICS, (queue_wait_ms, duration_ms)):
+            if value is not None:
+                self._pending.setdefault((subscription_id, metric, window), LatencyHistogram()).record(value)
+        self.recorded += 1
+
+    async def flush(self) -> int:
+        """Add the histograms collected since the last flush to Redis; returns how many"""
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+        try:
+            await AsyncRedisCache.add_latency_histograms(
+                {key: histogram.to_fields() for key, histogram in pending.items()},
+                expiry=settings.LATENCY_WINDOW_SECONDS + settings.LATENCY_RETENTION_HOURS * 3600
+            )
+        except Exception as e:
+            self.failed_flushes += 1
+            logger.warning(f"Error flushing {len(pending)} latency histograms: {e}")
+            for key, histogram in pending.items():
+                self._pending.setdefault(key, LatencyHistogram()).merge(histogram)
+            return 0
+        self.flushes += 1
+        return len(pending)
+
+    async def run(self) -> None:
+        """Flush every `flush_interval` seconds until cancelled"""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "recorded": self.recorded,
+            "pending": len(self._pending),
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+        }
+
+def _windows(minutes: int, now: datetime) -> List[int]:
+    """Starts of the windows overlapping the last `minutes` minutes, oldest first"""
+    first = window_start(now - timedelta(minutes=minutes))
+    last = window_start(now)
+    return list(range(first, last + 1, settings.LATENCY_WINDOW_SECONDS))
+
+def get_subscription_latency(
+    subscription_id: str, minutes: int = 60, now: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """
+    Latency percentiles of a subscription over the last `minutes`, merged across its windows
+
+    `queue_wait` is the time an attempt waited to be sent: since ingest for a first
+    attempt, since it became due for a retry. `duration` is its HTTP round-trip.
+    """
+    now = now or datetime.utcnow()
+    windows = _windows(minutes, now)
+    keys = [(subscription_id, metric, window) for metric in LATENCY_METRICS for window in windows]
+    merged = {metric: LatencyHistogram() for metric in LATENCY_METRICS}
+    for (_, metric, _), fields in zip(keys, RedisCache.get_latency_histograms(keys)):
+        merged[metric].merge(LatencyHistogram.from_fields(fields))
+    return {
+        "minutes": minutes,
+        "window_seconds": settings.LATENCY_WINDOW_SECONDS,
+        **{metric: histogram.summary() for metric, histogram in merged.items()},
+    }
@@ -0,0 +1,103 @@
+import logging
+import re
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Tables range-partitioned by day, and their partition key (see add_delivery_log_partitions)
+PARTITIONED_TABLES = {"delivery_logs": "attempt_timestamp"}
+
+_UPPER_BOUND = re.compile(r"TO \('([^']+)'\)")
+
+def partition_name(table: str, day: datetime) -> str:
+    """Name of the partition of `table` holding rows of one UTC day"""
+    return f"{table}_p{day:%Y%m%d}"
+
+async def is_partitioned(db: AsyncSession, table: str) -> bool:
+    """Whether `table` is a partitioned table, i.e. its partitioning migration has run"""
+    result = await db.execute(
+        text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table)"), {"table": table}
+    )
+    return result.scalar() is not None
+
+async def list_partitions(db: AsyncSession, table: str) -> List[Tuple[str, Optional[datetime], int]]:
+    """
+    Partitions of `table` as (name, upper bound, estimated rows), oldest first
+
+    The default partition has no upper bound.
+    """
+    result = await db.execute(text("""
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), c.reltuples::bigint
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass(:table)
+    """), {"table": table})
+    partitions = []
+    for name, bound, rows in result.all():
+        match = _UPPER_BOUND.search(bound or "")
+        partitions.append((name, datetime.fromisoformat(match.group(1)) if match else None, max(rows, 0)))
+    return sorted(partitions, key=lambda partition: partition[1] or datetime.max)
+
+async def ensure_partitions(
+    db: AsyncSession, table: str, days_ahead: Optional[int] = None, now: Optional[datetime] = None
+) -> List[str]:
+    """
+    Create the daily partitions of `table` for today and the next `days_ahead` days
+
+    Days already covered by a partition are skipped. Returns the partitions created.
+    """
+    days_ahead = settings.PARTITION_PRECREATE_DAYS if days_ahead is None else days_ahead
+    today = (now or datetime.utcnow()).replace(hour=0, minute=0, second=0, microsecond=0)
+    bounds = [upper for _, upper, _ in await list_partitions(db, table) if upper is not None]
+    day = max([today] + bounds)
+
+    created = []
+    while day <= today + timedelta(days=days_ahead):
+        name = partition_name(table, day)
+        await db.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{day:%Y-%m-%d}') TO ('{day + timedelta(days=1):%Y-%m-%d}')"
+        ))
+        created.append(name)
+        day += timedelta(days=1)
+    await db.commit()
+    return created
+
+async def drop_expired_partitions(db: AsyncSession, table: str, before: datetime) -> Dict[str, int]:
+    """
+    Drop the partitions of `table` whose rows are all older than `before`
+
+    Retention becomes a catalog operation: no rows are scanned, deleted or vacuumed.
+    Returns the dropped partitions with their estimated row counts.
+    """
+    dropped = {}
+    for name, upper, rows in await list_partitions(db, table):
+        if upper is None or upper > before:
+            continue
+        await db.execute(text(f"DROP TABLE IF EXISTS {name}"))
+        dropped[name] = rows
+    await db.commit()
+    return dropped
+
+async def maintain_partitions(db: AsyncSession, retention_threshold: datetime) -> Dict[str, int]:
+    """
+    Pre-create future partitions and drop expired ones for every partitioned table
+
+    Tables whose partitioning migration has not run are skipped. Returns the dropped
+    partitions with their estimated row counts.
+    """
+    dropped: Dict[str, int] = {}
+    for table in PARTITIONED_TABLES:
+        if not await is_partitioned(db, table):
+            continue
+        created = await ensure_partitions(db, table)
+        if created:
+            logger.info(f"Partitions of {table} ready: {', '.join(created)}")
+        dropped.update(await drop_expired_partitions(db, table, retention_threshold))
+    return dropped
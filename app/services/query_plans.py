@@ -0,0 +1,124 @@
+import argparse
+import asyncio
+import json
+import sys
+from datetime import datetime
+from typing import Any, Dict, Iterator, List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import AsyncSessionLocal
+from app.crud import delivery as delivery_crud
+
+# Partial index the delivery poll must be served from (see add_delivery_tasks_due_index)
+POLL_INDEX = "ix_delivery_tasks_due"
+POLL_TABLE = "delivery_tasks"
+
+# Synthetic rows for `seed_tasks`, spread over this many subscriptions
+SEED_SUBSCRIPTIONS = 100
+
+def plan_nodes(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Every node of an EXPLAIN (FORMAT JSON) plan, depth first"""
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+def check_index_scan(plan: Dict[str, Any], table: str = POLL_TABLE, index: str = POLL_INDEX) -> List[str]:
+    """
+    Problems keeping a plan from reading `table` through `index` in index order
+
+    An empty list means the plan scans `table` only with `index` and needs no sort,
+    so its cost depends on the rows returned rather than on the size of the table.
+    """
+    problems = []
+    scans = [node for node in plan_nodes(plan) if node.get("Relation Name") == table]
+    if not scans:
+        problems.append(f"{table} is not scanned")
+    for node in scans:
+        if node["Node Type"] not in ("Index Scan", "Index Only Scan") or node.get("Index Name") != index:
+            problems.append(f"{table} is read with {node['Node Type']} {node.get('Index Name') or ''}".rstrip())
+    for node in plan_nodes(plan):
+        if node["Node Type"] in ("Sort", "Incremental Sort"):
+            problems.append(f"Rows are sorted on {', '.join(node.get('Sort Key', []))}")
+    return problems
+
+async def explain(db: AsyncSession, statement) -> Dict[str, Any]:
+    """Plan of a statement, as the root node of EXPLAIN (FORMAT JSON)"""
+    connection = await db.connection()
+    sql = statement.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True})
+    result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")
+    plan = result.scalar()
+    return (json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"]
+
+def poll_queries(now: datetime) -> Dict[str, Any]:
+    """The statements that find due deliveries, by name"""
+    return {
+        "claim": delivery_crud.claim_pending_deliveries_query(now, limit=100),
+        "claim_partition": delivery_crud.claim_pending_deliveries_query(now, limit=100, partition=(0, 4)),
+    }
+
+async def seed_tasks(db: AsyncSession, rows: int, due_share: float) -> None:
+    """
+    Insert `rows` synthetic deliveries, a `due_share` of them due and the rest finished
+
+    Meant to run inside a transaction that is rolled back afterwards.
+    """
+    await db.execute(text("""
+        INSERT INTO subscriptions (id, target_url, created_at, updated_at)
+        SELECT 'plan-check-' || s, 'http://plan-check.invalid/' || s, now(), now()
+        FROM generate_series(1, :subscriptions) s
+    """), {"subscriptions": SEED_SUBSCRIPTIONS})
+    await db.execute(text("""
+        INSERT INTO webhook_payloads (id, subscription_id, event_type, payload, created_at)
+        SELECT 'plan-check-' || n, 'plan-check-' || (n % :subscriptions + 1), 'plan.check', '{}', now()
+        FROM generate_series(1, :rows) n
+    """), {"rows": rows, "subscriptions": SEED_SUBSCRIPTIONS})
+    await db.execute(text("""
+        INSERT INTO delivery_tasks (webhook_id, subscription_id, attempt_number, status, next_attempt_at, created_at, updated_at)
+        SELECT 'plan-check-' || n, 'plan-check-' || (n % :subscriptions + 1), 1, status,
+            CASE WHEN status = 'PENDING' THEN timezone('utc', now()) - random() * interval '1 day' END,
+            now(), now()
+        FROM (
+            SELECT n, CASE WHEN random() < :due_share THEN 'PENDING' ELSE 'SUCCESS' END AS status
+            FROM generate_series(1, :rows) n
+        ) seeded
+    """), {"rows": rows, "subscriptions": SEED_SUBSCRIPTIONS, "due_share": due_share})
+    await db.execute(text("ANALYZE subscriptions, webhook_payloads, delivery_tasks"))
+
+async def check_poll_plans(rows: int = 0, due_share: float = 0.01) -> Dict[str, Dict[str, Any]]:
+    """
+    EXPLAIN the delivery poll and check that it stays an index scan
+
+    With `rows`, that many synthetic deliveries are added first, in a transaction that
+    is rolled back, so the planner sees a table of that size. Returns the plan and the
+    problems found for each query in `poll_queries`.
+    """
+    checks = {}
+    async with AsyncSessionLocal() as db:
+        try:
+            if rows:
+                await seed_tasks(db, rows, due_share)
+            for name, statement in poll_queries(datetime.utcnow()).items():
+                plan = await explain(db, statement)
+                checks[name] = {"plan": plan, "problems": check_index_scan(plan)}
+        finally:
+            await db.rollback()
+    return checks
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that the delivery poll is served by its partial index")
+    parser.add_argument(
+        "--rows", type=int, default=0,
+        help="Synthetic deliveries to add first, rolled back afterwards (use a scratch database)"
+    )
+    parser.add_argument("--due-share", type=float, default=0.01, help="Share of the synthetic deliveries that are due")
+    parser.add_argument("--verbose", action="store_true", help="Print the full plans")
+    args = parser.parse_args()
+
+    checks = asyncio.run(check_poll_plans(args.rows, args.due_share))
+    for name, check in checks.items():
+        print(f"{name}: {'; '.join(check['problems']) or 'index scan on ' + POLL_INDEX}")
+        if args.verbose:
+            print(json.dumps(check["plan"], indent=2))
+    sys.exit(1 if any(check["problems"] for check in checks.values()) else 0)
@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.crud import delivery as delivery_crud
+from app.services.delivery_service import DeliveryOutcome
+
+logger = logging.getLogger(__name__)
+
+class DeliveryResultSink:
+    """
+    Buffers delivery outcomes and writes them back in bulk
+
+    Outcomes are flushed with one UPDATE ... FROM (VALUES ...) whenever `max_batch`
+    of them are buffered or every `flush_interval_ms`, whichever comes first.
+
+    On shutdown `close()` makes a final flush. Outcomes that still cannot be written
+    (database down, or flush timed out) are dropped and logged. Their rows keep the
+    worker's lease, so they are claimed and delivered again once the lease expires:
+    delivery stays at-least-once.
+
+    If a `scheduler` is given, it is told about every written batch so it can move
+    retries to their next due time and forget finished deliveries.
+    """
+
+    def __init__(
+        self,
+        owner: str,
+        max_batch: Optional[int] = None,
+        flush_interval_ms: Optional[int] = None,
+        scheduler: Optional[Any] = None,
+    ):
+        self.owner = owner
+        self.scheduler = scheduler
+        self.max_batch = max_batch or settings.RESULT_FLUSH_BATCH_SIZE
+        self.flush_interval = (flush_interval_ms or settings.RESULT_FLUSH_INTERVAL_MS) / 1000
+        # Outcomes kept for retry after failed flushes are capped; older ones are dropped
+        self.max_buffered = self.max_batch * 10
+        self._buffer: Deque[DeliveryOutcome] = deque()
+        self._flush_lock = asyncio.Lock()
+
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.rows_written = 0
+        self.rows_stale = 0  # Outcomes whose lease had already been taken over
+        self.rows_dropped = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+        self.last_batch_size = 0
+        self.max_batch_size = 0
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    async def add(self, outcome: DeliveryOutcome) -> None:
+        """Buffer one outcome, flushing right away once a full batch is waiting"""
+        self._buffer.append(outcome)
+        if len(self._buffer) >= self.max_batch and not self._flush_lock.locked():
+            await self.flush()
+
+    async def run(self) -> None:
+        """Flush whatever is buffered every `flush_interval` until cancelled"""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            if self._buffer:
+                await self.flush()
+
+    async def flush(self) -> int:
+        """Write up to `max_batch` buffered outcomes; returns the number of rows updated"""
+        async with self._flush_lock:
+            if not self._buffer:
+                return 0
+            batch: List[DeliveryOutcome] = []
+            while self._buffer and len(batch) < self.max_batch:
+                batch.append(self._buffer.popleft())
+
+            started = time.perf_counter()
+            try:
+                async with AsyncSessionLocal() as db:
+                    updated = await delivery_crud.apply_delivery_outcomes_async(db, self.owner, batch)
+            except Exception as e:
+                self.failed_flushes += 1
+                logger.error(f"Error flushing {len(batch)} delivery results: {e}")
+                # Put the batch back in front to retry on the next flush
+                self._buffer.extendleft(reversed(batch))
+                self._trim()
+                return 0
+
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.flushes += 1
+            self.rows_written += updated
+            self.rows_stale += len(batch) - updated
+            self.last_flush_ms = elapsed_ms
+            self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+            self.total_flush_ms += elapsed_ms
+            self.last_batch_size = len(batch)
+            self.max_batch_size = max(self.max_batch_size, len(batch))
+
+            if self.scheduler is not None:
+                try:
+                    await self.scheduler.reschedule(batch)
+                except Exception as e:
+                    # The schedule reconcile picks these up later
+                    logger.error(f"Error rescheduling {len(batch)} deliveries: {e}")
+            return updated
+
+    async def close(self, timeout: float = 10.0) -> None:
+        """Flush everything left, giving up after `timeout` seconds"""
+        async def drain() -> None:
+            while self._buffer:
+                before = len(self._buffer)
+                await self.flush()
+                if len(self._buffer) >= before:
+                    break  # Flush failed; retrying now would just fail again
+
+        try:
+            await asyncio.wait_for(drain(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        if self._buffer:
+            self.rows_dropped += len(self._buffer)
+            logger.warning(
+                f"Dropped {len(self._buffer)} unwritten delivery results on shutdown; "
+                f"they will be redelivered when their leases expire"
+            )
+            self._buffer.clear()
+
+    def _trim(self) -> None:
+        overflow = len(self._buffer) - self.max_buffered
+        if overflow > 0:
+            for _ in range(overflow):
+                self._buffer.popleft()
+            self.rows_dropped += overflow
+            logger.warning(f"Dropped {overflow} delivery results after repeated flush failures")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "buffered": len(self._buffer),
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+            "rows_written": self.rows_written,
+            "rows_stale": self.rows_stale,
+            "rows_dropped": self.rows_dropped,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "max_flush_ms": round(self.max_flush_ms, 2),
+            "avg_flush_ms": round(self.total_flush_ms / self.flushes, 2) if self.flushes else 0,
+            "last_batch_size": self.last_batch_size,
+            "max_batch_size": self.max_batch_size,
+            "avg_batch_size": round(self.rows_written / self.flushes, 1) if self.flushes else 0,
+        }
\ No newline at end of file
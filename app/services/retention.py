@@ -0,0 +1,243 @@
+import argparse
+import asyncio
+import logging
+import os
+import socket
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.core.cache import AsyncRedisCache
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.crud import delivery as delivery_crud
+from app.models import DeliveryLog
+from app.services import partitions
+
+logger = logging.getLogger(__name__)
+
+# Held by the worker running a pass; expires after RETENTION_INTERVAL, so passes are spread across workers
+RETENTION_LOCK_KEY = "retention:lock"
+# Where the last pass stopped, so the next one resumes there on whichever worker runs it
+RETENTION_CURSOR_KEY = "retention:cursor"
+
+# One chunk: takes a cursor, returns the rows it deleted and the next cursor (None when done)
+Step = Callable[[Any], Awaitable[Tuple[int, Any]]]
+
+@dataclass
+class RetentionPass:
+    """Progress of one retention pass"""
+    older_than: datetime
+    started_at: datetime = field(default_factory=datetime.utcnow)
+    phase: str = "partitions"
+    partitions_dropped: int = 0
+    partition_rows_dropped: int = 0  # Planner estimate
+    logs_deleted: int = 0
+    tasks_scanned: int = 0
+    tasks_deleted: int = 0
+    payloads_scanned: int = 0
+    payloads_deleted: int = 0
+    chunks: int = 0
+    complete: bool = False
+    _started: float = field(default_factory=time.monotonic, repr=False)
+    elapsed: float = 0.0
+
+    def tick(self) -> None:
+        self.elapsed = time.monotonic() - self._started
+
+    def stats(self) -> Dict[str, Any]:
+        deleted = self.logs_deleted + self.tasks_deleted + self.payloads_deleted
+        return {
+            "started_at": self.started_at.isoformat(),
+            "older_than": self.older_than.isoformat(),
+            "phase": self.phase,
+            "complete": self.complete,
+            "partitions_dropped": self.partitions_dropped,
+            "partition_rows_dropped": self.partition_rows_dropped,
+            "logs_deleted": self.logs_deleted,
+            "tasks_scanned": self.tasks_scanned,
+            "tasks_deleted": self.tasks_deleted,
+            "payloads_scanned": self.payloads_scanned,
+            "payloads_deleted": self.payloads_deleted,
+            "chunks": self.chunks,
+            "elapsed": round(self.elapsed, 2),
+            "rows_per_second": round(deleted / self.elapsed, 1) if self.elapsed else 0,
+        }
+
+class RetentionJob:
+    """
+    Removes expired delivery logs and finished delivery tasks, then payloads left without either
+
+    Each worker checks every minute whether a pass is due; a Redis lock held for
+    RETENTION_INTERVAL lets exactly one of them run it. If `delivery_logs` is
+    partitioned, expired partitions are dropped first and only its default
+    partition is cleaned row by row. Rows are deleted in keyset-ordered chunks of
+    RETENTION_CHUNK_SIZE, each in its own short transaction, with a pause of
+    RETENTION_CHUNK_PAUSE_MS between chunks. A pass stops after RETENTION_TIME_BUDGET
+    seconds and saves its cursors, so the next pass picks up where it stopped.
+
+    Tasks are deleted once they finished more than the retention period ago. Payloads
+    are only deleted once older than the retention period, so a payload whose task is
+    still being written is never taken for an orphan.
+    """
+
+    def __init__(self, owner: str):
+        self.owner = owner
+        self.interval = settings.RETENTION_INTERVAL
+        self.chunk_size = settings.RETENTION_CHUNK_SIZE
+        self.pause = settings.RETENTION_CHUNK_PAUSE_MS / 1000
+        self.time_budget = settings.RETENTION_TIME_BUDGET
+        self.current: Optional[RetentionPass] = None
+        self.last: Optional[RetentionPass] = None
+        self.passes = 0
+        self.logs_deleted = 0
+        self.tasks_deleted = 0
+        self.payloads_deleted = 0
+        self.partitions_dropped = 0
+
+    async def run(self) -> None:
+        """Run a pass whenever it is this worker's turn, until cancelled"""
+        while True:
+            try:
+                if await AsyncRedisCache.acquire_lock(RETENTION_LOCK_KEY, self.owner, self.interval):
+                    await self.run_pass()
+            except Exception as e:
+                logger.error(f"Error running retention pass: {e}")
+            await asyncio.sleep(min(60, self.interval))
+
+    async def run_pass(self) -> RetentionPass:
+        """Run one pass now, within the time budget"""
+        progress = RetentionPass(older_than=datetime.utcnow() - timedelta(hours=settings.LOG_RETENTION_HOURS))
+        deadline = time.monotonic() + self.time_budget
+        cursors = await AsyncRedisCache.get(RETENTION_CURSOR_KEY) or {}
+        self.current = progress
+        try:
+            async with AsyncSessionLocal() as db:
+                table = await self._maintain_partitions(db, progress)
+
+                progress.phase = "logs"
+                logs_cursor = None
+                if table is not None:
+                    logs_cursor = _dump_log_cursor(await self._drain(
+                        self._log_step(db, progress, table), _load_log_cursor(cursors.get("logs")), deadline, progress
+                    ))
+
+                progress.phase = "tasks"
+                tasks_cursor = await self._drain(
+                    self._task_step(db, progress), cursors.get("tasks"), deadline, progress
+                )
+
+                progress.phase = "payloads"
+                payloads_cursor = cursors.get("payloads")
+                if logs_cursor is None and tasks_cursor is None:
+                    payloads_cursor = await self._drain(
+                        self._payload_step(db, progress), payloads_cursor, deadline, progress
+                    )
+                progress.complete = logs_cursor is None and tasks_cursor is None and payloads_cursor is None
+        finally:
+            progress.phase = "done"
+            progress.tick()
+            self.current = None
+            self.last = progress
+            self.passes += 1
+            self.logs_deleted += progress.logs_deleted
+            self.tasks_deleted += progress.tasks_deleted
+            self.payloads_deleted += progress.payloads_deleted
+            self.partitions_dropped += progress.partitions_dropped
+
+        await AsyncRedisCache.set(
+            RETENTION_CURSOR_KEY,
+            {"logs": logs_cursor, "tasks": tasks_cursor, "payloads": payloads_cursor},
+            expiry=self.interval * 24
+        )
+        logger.info(
+            f"Retention pass {'finished' if progress.complete else 'ran out of time'}: "
+            f"{progress.partitions_dropped} partitions, {progress.logs_deleted} logs, "
+            f"{progress.tasks_deleted} tasks and {progress.payloads_deleted} payloads removed in {progress.elapsed:.1f}s"
+        )
+        return progress
+
+    async def _maintain_partitions(self, db, progress: RetentionPass) -> Optional[str]:
+        """Drop expired partitions; returns the table (or partition) left to clean row by row"""
+        table = DeliveryLog.__tablename__
+        if not await partitions.is_partitioned(db, table):
+            return table
+        dropped = await partitions.maintain_partitions(db, progress.older_than)
+        progress.partitions_dropped = len(dropped)
+        progress.partition_rows_dropped = sum(dropped.values())
+        # Only rows that missed every daily partition still need deleting
+        defaults = [name for name, upper, _ in await partitions.list_partitions(db, table) if upper is None]
+        return defaults[0] if defaults else None
+
+    def _log_step(self, db, progress: RetentionPass, table: str) -> Step:
+        async def step(cursor):
+            deleted, cursor = await delivery_crud.delete_expired_logs_chunk_async(
+                db, progress.older_than, cursor, self.chunk_size, table
+            )
+            progress.logs_deleted += deleted
+            return deleted, cursor
+        return step
+
+    def _task_step(self, db, progress: RetentionPass) -> Step:
+        async def step(cursor):
+            scanned, deleted, cursor = await delivery_crud.delete_finished_tasks_chunk_async(
+                db, progress.older_than, cursor, self.chunk_size
+            )
+            progress.tasks_scanned += scanned
+            progress.tasks_deleted += deleted
+            return deleted, cursor
+        return step
+
+    def _payload_step(self, db, progress: RetentionPass) -> Step:
+        async def step(cursor):
+            scanned, deleted, cursor = await delivery_crud.delete_orphaned_payloads_chunk_async(
+                db, progress.older_than, cursor, self.chunk_size
+            )
+            progress.payloads_scanned += scanned
+            progress.payloads_deleted += deleted
+            return deleted, cursor
+        return step
+
+    async def _drain(self, step: Step, cursor: Any, deadline: float, progress: RetentionPass) -> Any:
+        """
+        Run chunks from `cursor` until `step` reports it is done or the deadline passes
+
+        Returns the cursor to resume from, or None if the phase finished.
+        """
+        while time.monotonic() < deadline:
+            _, cursor = await step(cursor)
+            progress.chunks += 1
+            progress.tick()
+            if cursor is None:
+                return None
+            await asyncio.sleep(self.pause)
+        return cursor
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "interval": self.interval,
+            "passes": self.passes,
+            "current": self.current.stats() if self.current else None,
+            "last": self.last.stats() if self.last else None,
+            "logs_deleted": self.logs_deleted,
+            "tasks_deleted": self.tasks_deleted,
+            "payloads_deleted": self.payloads_deleted,
+            "partitions_dropped": self.partitions_dropped,
+        }
+
+def _dump_log_cursor(cursor: Optional[Tuple[datetime, int]]) -> Optional[list]:
+    return [cursor[0].isoformat(), cursor[1]] if cursor else None
+
+def _load_log_cursor(cursor: Optional[list]) -> Optional[Tuple[datetime, int]]:
+    return (datetime.fromisoformat(cursor[0]), int(cursor[1])) if cursor else None
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run one retention pass now, regardless of the schedule")
+    parser.add_argument("--time-budget", type=int, default=settings.RETENTION_TIME_BUDGET, help="Seconds the pass may run")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    job = RetentionJob(owner=f"{socket.gethostname()}:{os.getpid()}")
+    job.time_budget = args.time_budget
+    print(asyncio.run(job.run_pass()).stats())
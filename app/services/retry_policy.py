@@ -0,0 +1,119 @@
+import argparse
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+JITTER_MODES = ("none", "full")
+
+# Attempts a delivery gets in total: the first one and MAX_RETRY_ATTEMPTS retries.
+# The last one that fails is final.
+MAX_DELIVERY_ATTEMPTS = settings.MAX_RETRY_ATTEMPTS + 1
+
+def _default_intervals() -> List[int]:
+    return [settings.RETRY_INTERVALS[key] for key in sorted(settings.RETRY_INTERVALS)]
+
+@dataclass
+class RetryPolicy:
+    """
+    When to retry a failed delivery
+
+    `intervals[n - 1]` is the base delay before the n-th retry; later retries reuse the
+    last interval. Jitter spreads retries that failed together, so an outage does not
+    turn into a retry storm when the subscriber recovers:
+
+    - `full`: a random delay between 1 second and the base delay
+    - `none`: exactly the base delay
+
+    A `Retry-After` requested by the subscriber is always honored, up to RETRY_AFTER_MAX.
+    """
+    intervals: List[int] = field(default_factory=_default_intervals)
+    jitter: str = field(default_factory=lambda: settings.RETRY_JITTER)
+    max_delay: int = field(default_factory=lambda: settings.RETRY_MAX_DELAY)
+
+    def __post_init__(self):
+        if self.jitter not in JITTER_MODES:
+            raise ValueError(f"Unknown retry jitter {self.jitter!r}, expected one of {', '.join(JITTER_MODES)}")
+        if not self.intervals:
+            raise ValueError("A retry policy needs at least one interval")
+
+    @classmethod
+    def for_subscription(cls, overrides: Optional[Dict[str, Any]]) -> "RetryPolicy":
+        """Build the policy of a subscription from its `retry_policy` overrides, if any"""
+        if not overrides:
+            return DEFAULT_RETRY_POLICY
+        return cls(**{key: value for key, value in overrides.items() if value is not None})
+
+    def base_delay(self, retry_number: int) -> float:
+        """Delay before the `retry_number`-th retry (1 for the first retry), without jitter"""
+        index = min(max(retry_number, 1), len(self.intervals)) - 1
+        return float(min(self.intervals[index], self.max_delay))
+
+    def next_delay(
+        self,
+        retry_number: int,
+        retry_after: Optional[float] = None,
+        rng: Optional[random.Random] = None
+    ) -> float:
+        """Seconds to wait before the `retry_number`-th retry"""
+        rng = rng or random
+        base = self.base_delay(retry_number)
+        if self.jitter == "full":
+            delay = rng.uniform(min(1.0, base), base)
+        else:
+            delay = base
+
+        if retry_after:
+            delay = max(delay, min(retry_after, settings.RETRY_AFTER_MAX))
+        return delay
+
+    def next_attempt_at(
+        self, retry_number: int, retry_after: Optional[float] = None, now: Optional[datetime] = None
+    ) -> datetime:
+        """When the `retry_number`-th retry becomes due"""
+        return (now or datetime.utcnow()) + timedelta(seconds=self.next_delay(retry_number, retry_after))
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+def simulate_retry_spread(
+    policy: RetryPolicy,
+    failures: int = 1000,
+    retries: Optional[int] = None,
+    bucket_seconds: int = 10,
+    seed: Optional[int] = 0
+) -> List[Tuple[int, int]]:
+    """
+    Show how retries of a burst of deliveries spread out over time
+
+    Simulates `failures` deliveries that all fail at t=0 and keep failing for `retries`
+    retries (by default one per interval). Returns `(bucket_start_seconds, retries_due)`
+    pairs for every non-empty `bucket_seconds` bucket.
+    """
+    rng = random.Random(seed)
+    retries = retries or len(policy.intervals)
+    buckets: Dict[int, int] = {}
+    for _ in range(failures):
+        elapsed = 0.0
+        for retry_number in range(1, retries + 1):
+            elapsed += policy.next_delay(retry_number, rng=rng)
+            bucket = int(elapsed // bucket_seconds) * bucket_seconds
+            buckets[bucket] = buckets.get(bucket, 0) + 1
+    return sorted(buckets.items())
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate how retries of a burst of failed deliveries spread out")
+    parser.add_argument("--failures", type=int, default=1000, help="Deliveries failing together at t=0")
+    parser.add_argument("--retries", type=int, default=None, help="Retries per delivery (default: one per interval)")
+    parser.add_argument("--jitter", choices=JITTER_MODES, default=settings.RETRY_JITTER)
+    parser.add_argument("--bucket", type=int, default=10, help="Histogram bucket size in seconds")
+    args = parser.parse_args()
+
+    spread = simulate_retry_spread(
+        RetryPolicy(jitter=args.jitter), failures=args.failures, retries=args.retries, bucket_seconds=args.bucket
+    )
+    peak = max(count for _, count in spread)
+    for start, count in spread:
+        print(f"{start:>6}s {count:>7} {'#' * max(1, round(count / peak * 50))}")
+    print(f"Peak: {peak} retries due within {args.bucket}s")
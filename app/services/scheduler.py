@@ -0,0 +1,148 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.core.cache import AsyncRedisCache
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.crud import delivery as delivery_crud
+from app.models import DeliveryStatus, DeliveryTask, Subscription, WebhookPayload
+from app.services.delivery_service import DeliveryOutcome
+
+logger = logging.getLogger(__name__)
+
+# A claimed task with its subscription; payloads are loaded separately, see `load_payloads`
+ClaimedDelivery = Tuple[DeliveryTask, Subscription]
+
+def _retry_due_times(outcomes: List[DeliveryOutcome]) -> Dict[int, datetime]:
+    """Next due time of every outcome that will be attempted again"""
+    return {
+        outcome.task_id: outcome.next_attempt_at
+        for outcome in outcomes
+        if outcome.status in (DeliveryStatus.PENDING, DeliveryStatus.FAILED_ATTEMPT) and outcome.next_attempt_at
+    }
+
+class DatabaseScheduler:
+    """
+    Finds due deliveries by polling `delivery_tasks` with a SKIP LOCKED claim
+
+    With a `(index, count)` partition, only deliveries of that partition's
+    subscriptions are claimed.
+    """
+    name = "database"
+
+    def __init__(self, owner: str, partition: Optional[Tuple[int, int]] = None):
+        self.owner = owner
+        self.partition = partition
+
+    async def claim(self, limit: int) -> List[ClaimedDelivery]:
+        """Claim up to `limit` due deliveries for this worker"""
+        async with AsyncSessionLocal() as db:
+            return await delivery_crud.claim_pending_deliveries_async(
+                db, owner=self.owner, limit=limit, partition=self.partition
+            )
+
+    async def load_payloads(self, webhook_ids: Iterable[str]) -> Dict[str, WebhookPayload]:
+        """Load the payloads of claimed deliveries that are about to be sent, in one query"""
+        async with AsyncSessionLocal() as db:
+            return await delivery_crud.get_webhook_payloads_async(db, webhook_ids)
+
+    async def reschedule(self, outcomes: List[DeliveryOutcome]) -> None:
+        """Called after outcomes are written; wakes idle workers for the earliest retry"""
+        retries = _retry_due_times(outcomes)
+        if retries:
+            await AsyncRedisCache.notify_deliveries_due(min(retries.values()))
+
+    async def run(self) -> None:
+        """Background maintenance; nothing to do for this backend"""
+
+    async def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name}
+
+class RedisScheduler(DatabaseScheduler):
+    """
+    Finds due deliveries in a Redis sorted set scored by due time
+
+    Ingest and retries ZADD delivery IDs; workers take due IDs with a Lua script that
+    moves them to their lease expiry, then claim those rows in Postgres, which stays the
+    source of record. A periodic reconcile re-adds overdue rows that never made it into
+    the set (e.g. Redis was unavailable at ingest), so the poll query runs rarely.
+
+    The claim script already hands each ID to a single worker, so the set is shared by
+    all partitions; only the reconcile sweep is limited to this worker's partition.
+    """
+    name = "redis"
+
+    def __init__(self, owner: str, partition: Optional[Tuple[int, int]] = None):
+        super().__init__(owner, partition)
+        self.reconcile_interval = settings.SCHEDULER_RECONCILE_INTERVAL
+        self.reconcile_grace = settings.SCHEDULER_RECONCILE_GRACE
+        self.reconciled = 0
+
+    async def claim(self, limit: int) -> List[ClaimedDelivery]:
+        lease_expires_at = datetime.utcnow() + timedelta(seconds=settings.DELIVERY_LEASE_SECONDS)
+        task_ids = await AsyncRedisCache.claim_due_deliveries(limit, lease_expires_at)
+        if not task_ids:
+            return []
+
+        async with AsyncSessionLocal() as db:
+            claimed = await delivery_crud.claim_deliveries_by_ids_async(db, owner=self.owner, task_ids=task_ids)
+            rejected_ids = set(task_ids) - {task.id for task, _ in claimed}
+            if rejected_ids:
+                await self._resync(db, list(rejected_ids))
+        return claimed
+
+    async def _resync(self, db, task_ids: List[int]) -> None:
+        """Bring schedule entries that Postgres refused to claim back in line with their rows"""
+        now = datetime.utcnow()
+        rows = await delivery_crud.get_delivery_schedule_async(db, task_ids)
+        # Rows that are gone (e.g. removed by retention) or finished leave the schedule
+        finished = set(task_ids) - {task_id for task_id, _, _ in rows}
+        due_times = {}
+        for task_id, status, next_attempt_at in rows:
+            if status not in (DeliveryStatus.PENDING, DeliveryStatus.FAILED_ATTEMPT) or not next_attempt_at:
+                finished.add(task_id)
+            elif next_attempt_at > now:
+                due_times[task_id] = next_attempt_at
+            # Otherwise it is leased by another worker and keeps its lease-expiry score
+        await AsyncRedisCache.schedule_deliveries(due_times)
+        await AsyncRedisCache.unschedule_deliveries(finished)
+
+    async def reschedule(self, outcomes: List[DeliveryOutcome]) -> None:
+        retries = _retry_due_times(outcomes)
+        finished = [outcome.task_id for outcome in outcomes if outcome.task_id not in retries]
+        await AsyncRedisCache.schedule_deliveries(retries)
+        await AsyncRedisCache.unschedule_deliveries(finished)
+        if retries:
+            await AsyncRedisCache.notify_deliveries_due(min(retries.values()))
+
+    async def reconcile(self) -> int:
+        """Re-add unclaimed overdue rows that are missing from the schedule"""
+        older_than = datetime.utcnow() - timedelta(seconds=self.reconcile_grace)
+        async with AsyncSessionLocal() as db:
+            overdue = await delivery_crud.get_overdue_deliveries_async(db, older_than, partition=self.partition)
+        await AsyncRedisCache.schedule_deliveries(dict(overdue), only_new=True)
+        self.reconciled += len(overdue)
+        return len(overdue)
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.reconcile()
+            except Exception as e:
+                logger.error(f"Error reconciling delivery schedule: {e}")
+            await asyncio.sleep(self.reconcile_interval)
+
+    async def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "scheduled": await AsyncRedisCache.get_schedule_size(),
+            "reconciled": self.reconciled,
+        }
+
+def create_scheduler(owner: str, partition: Optional[Tuple[int, int]] = None) -> DatabaseScheduler:
+    """Build the scheduler backend selected by SCHEDULER_BACKEND"""
+    if settings.SCHEDULER_BACKEND == "redis":
+        return RedisScheduler(owner, partition)
+    return DatabaseScheduler(owner, partition)
\ No newline at end of file
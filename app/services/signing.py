@@ -0,0 +1,59 @@
+import hashlib
+import hmac
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.json_codec import codec
+
+def encode_body(payload: Dict[str, Any]) -> bytes:
+    """Serialize a webhook payload to the exact body sent to subscribers"""
+    return codec.dumpb(payload)
+
+def sign_body(body: bytes, secret: str) -> str:
+    """HMAC-SHA256 signature of a body, as sent in X-Hub-Signature-256 (without the `sha256=` prefix)"""
+    return hmac.new(secret.encode('utf-8'), body, hashlib.sha256).hexdigest()
+
+def signing_key_id(secret: str) -> str:
+    """
+    Short fingerprint of a secret, stored next to a signature
+
+    Lets a stored signature be reused only while the subscription still has the secret
+    it was made with, without storing the secret a second time.
+    """
+    return hashlib.sha256(secret.encode('utf-8')).hexdigest()[:16]
+
+def signature_is_current(secret: Optional[str], signature: Optional[str], key_id: Optional[str]) -> bool:
+    """Whether a stored signature can be sent as is with the subscription's current secret"""
+    if not secret:
+        return signature is None
+    return signature is not None and key_id == signing_key_id(secret)
+
+def prepare_body(
+    payload: Dict[str, Any], secret: Optional[str]
+) -> Tuple[bytes, Optional[str], Optional[str]]:
+    """Build the body, signature and signing key ID stored with a webhook at ingest"""
+    body = encode_body(payload)
+    if not secret:
+        return body, None, None
+    return body, sign_body(body, secret), signing_key_id(secret)
+
+def outbound_body(
+    payload: Optional[Dict[str, Any]],
+    secret: Optional[str],
+    body: Optional[bytes] = None,
+    signature: Optional[str] = None,
+    key_id: Optional[str] = None
+) -> Tuple[bytes, Optional[str]]:
+    """
+    Body and signature to send for a delivery attempt
+
+    Reuses the body and signature stored at ingest, so every attempt sends the same
+    bytes. Falls back to serializing the payload for webhooks stored without a body,
+    and re-signs only if the subscription's secret changed since ingest.
+    """
+    if body is None:
+        body = encode_body(payload)
+    if not secret:
+        return body, None
+    if not signature_is_current(secret, signature, key_id):
+        signature = sign_body(body, secret)
+    return body, signature
@@ -0,0 +1,113 @@
+import argparse
+import asyncio
+import logging
+import os
+import socket
+import time
+from typing import Any, Dict, Optional
+
+from app.core.cache import AsyncRedisCache
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.crud import delivery as delivery_crud
+from app.crud import subscription as subscription_crud
+
+logger = logging.getLogger(__name__)
+
+# Held by the worker running a reconcile; expires after the interval, so passes are spread across workers
+SUBSCRIPTION_STATS_LOCK_KEY = "subscription_stats:lock"
+
+def drifted_counters(
+    before: Dict[str, Optional[Dict[str, int]]],
+    counted: Dict[str, Dict[str, int]],
+    after: Dict[str, Optional[Dict[str, int]]]
+) -> Dict[str, Dict[str, int]]:
+    """
+    Counters to overwrite: those that differ from the database count
+
+    `before` and `after` are the kept counters read around the count. Subscriptions
+    whose counters changed in between are left alone, since the count may or may not
+    include that change; the next pass checks them again.
+    """
+    return {
+        subscription_id: counts
+        for subscription_id, counts in counted.items()
+        if before.get(subscription_id) == after.get(subscription_id) and after.get(subscription_id) != counts
+    }
+
+class SubscriptionStatsReconciler:
+    """
+    Keeps the per-subscription delivery counters in Redis in line with delivery_tasks
+
+    Ingest, the result writer and retention update the counters as tasks change, but a
+    Redis failure or a crash between a commit and its counter update leaves them off.
+    Each worker checks every minute whether a pass is due; a Redis lock held for
+    SUBSCRIPTION_STATS_RECONCILE_INTERVAL lets one of them run it. A pass recounts
+    subscriptions in chunks of SUBSCRIPTION_STATS_RECONCILE_CHUNK_SIZE, one GROUP BY
+    query per chunk, and overwrites the counters that drifted.
+    """
+
+    def __init__(self, owner: str):
+        self.owner = owner
+        self.interval = settings.SUBSCRIPTION_STATS_RECONCILE_INTERVAL
+        self.chunk_size = settings.SUBSCRIPTION_STATS_RECONCILE_CHUNK_SIZE
+        self.passes = 0
+        self.subscriptions_checked = 0
+        self.counters_fixed = 0
+        self.last_elapsed = 0.0
+
+    async def run(self) -> None:
+        """Run a pass whenever it is this worker's turn, until cancelled"""
+        while True:
+            try:
+                if await AsyncRedisCache.acquire_lock(SUBSCRIPTION_STATS_LOCK_KEY, self.owner, self.interval):
+                    await self.reconcile()
+            except Exception as e:
+                logger.error(f"Error reconciling subscription counters: {e}")
+            await asyncio.sleep(min(60, self.interval))
+
+    async def reconcile(self) -> int:
+        """Recount every subscription now; returns the number of counters fixed"""
+        started = time.monotonic()
+        checked = fixed = 0
+        cursor = None
+        async with AsyncSessionLocal() as db:
+            while True:
+                subscription_ids = await subscription_crud.get_subscription_ids_async(db, cursor, self.chunk_size)
+                if not subscription_ids:
+                    break
+                before = await AsyncRedisCache.get_subscription_counters(subscription_ids)
+                counted = await delivery_crud.count_deliveries_by_subscription_async(db, subscription_ids)
+                await db.commit()
+                after = await AsyncRedisCache.get_subscription_counters(subscription_ids)
+                drifted = drifted_counters(before, counted, after)
+                await AsyncRedisCache.set_subscription_counters(drifted)
+                checked += len(counted)
+                fixed += len(drifted)
+                if len(subscription_ids) < self.chunk_size:
+                    break
+                cursor = subscription_ids[-1]
+
+        self.passes += 1
+        self.subscriptions_checked += checked
+        self.counters_fixed += fixed
+        self.last_elapsed = time.monotonic() - started
+        logger.info(f"Reconciled delivery counters of {checked} subscriptions, {fixed} fixed in {self.last_elapsed:.1f}s")
+        return fixed
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "interval": self.interval,
+            "passes": self.passes,
+            "subscriptions_checked": self.subscriptions_checked,
+            "counters_fixed": self.counters_fixed,
+            "last_elapsed": round(self.last_elapsed, 2),
+        }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recount the delivery counters of every subscription now")
+    parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    reconciler = SubscriptionStatsReconciler(owner=f"{socket.gethostname()}:{os.getpid()}")
+    print(f"{asyncio.run(reconciler.reconcile())} counters fixed")
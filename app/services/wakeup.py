@@ -0,0 +1,89 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from app.core.cache import DELIVERY_WAKEUP_CHANNEL, async_redis_client
+
+logger = logging.getLogger(__name__)
+
+class DeliveryWakeup:
+    """
+    Wakes an idle worker as soon as new deliveries become due
+
+    Listens on the Redis wakeup channel. A delivery due now sets the event right away;
+    one due later (a scheduled retry) arms a timer for its due time, keeping only the
+    earliest timer. The worker still polls every `polling_interval` while idle, so a
+    lost message or a Redis outage only costs latency.
+    """
+
+    def __init__(self):
+        self._event = asyncio.Event()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_due = 0.0
+        self.connected = False
+        self.received = 0
+        self.woken = 0
+
+    def clear(self) -> None:
+        """Forget earlier wakeups; call before looking for work"""
+        self._event.clear()
+
+    def wake(self) -> None:
+        """Wake the waiting worker now"""
+        self._event.set()
+
+    async def wait(self, timeout: float) -> bool:
+        """Wait for a wakeup for at most `timeout` seconds; returns whether one arrived"""
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        self.woken += 1
+        return True
+
+    def notify(self, due_at: float) -> None:
+        """Wake now, or at the UNIX timestamp `due_at` if that is in the future"""
+        delay = due_at - time.time()
+        if delay <= 0:
+            self.wake()
+            return
+        if self._timer is not None and not self._timer.cancelled() and self._timer_due <= due_at:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer_due = due_at
+        self._timer = asyncio.get_running_loop().call_later(delay, self._fire)
+
+    def _fire(self) -> None:
+        self._timer = None
+        self.wake()
+
+    async def run(self) -> None:
+        """Listen for wakeups until cancelled, reconnecting after Redis errors"""
+        while True:
+            pubsub = async_redis_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(DELIVERY_WAKEUP_CHANNEL)
+                self.connected = True
+                async for message in pubsub.listen():
+                    self.received += 1
+                    try:
+                        self.notify(float(message["data"]))
+                    except (TypeError, ValueError):
+                        self.wake()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Delivery wakeup listener disconnected: {e}")
+            finally:
+                self.connected = False
+                await pubsub.aclose()
+            await asyncio.sleep(1)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "connected": self.connected,
+            "received": self.received,
+            "woken": self.woken,
+        }
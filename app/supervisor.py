@@ -0,0 +1,201 @@
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.core.cache import RedisCache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Children are started with "spawn" so none of them inherit the supervisor's Redis or
+# database connections
+_context = multiprocessing.get_context("spawn")
+
+def _run_worker(partition: Optional[Tuple[int, int]]) -> None:
+    """Child process entry point: run one worker on its own event loop"""
+    from app.worker import run_worker
+    run_worker(partition)
+
+def _run_api(host: str, port: int) -> None:
+    """Child process entry point: serve the API"""
+    import uvicorn
+    uvicorn.run("app.main:app", host=host, port=port)
+
+class _Child:
+    """A supervised process and its restart bookkeeping"""
+
+    def __init__(self, name: str, target: Callable[..., None], args: Tuple = ()):
+        self.name = name
+        self.target = target
+        self.args = args
+        self.process: Optional[multiprocessing.Process] = None
+        self.started_at = 0.0
+        self.restarts = 0
+        self.failures = 0  # Consecutive exits shortly after starting
+        self.next_start_at = 0.0
+        self.last_exit_code: Optional[int] = None
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+    def start(self) -> None:
+        self.process = _context.Process(target=self.target, args=self.args, name=self.name, daemon=False)
+        self.process.start()
+        self.started_at = time.monotonic()
+        logger.info(f"Started {self.name} (pid {self.process.pid})")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pid": self.process.pid if self.process else None,
+            "alive": self.alive,
+            "uptime_seconds": round(time.monotonic() - self.started_at) if self.alive else 0,
+            "restarts": self.restarts,
+            "last_exit_code": self.last_exit_code,
+        }
+
+class WorkerSupervisor:
+    """
+    Runs several worker processes, and optionally the API, on one machine
+
+    Each worker process owns one hash partition of the subscriptions, so their claim
+    queries never contend for the same rows and together they use every core. Children
+    that exit are restarted, backing off while they keep crashing right after start.
+    The supervisor publishes the health of its children, alongside the pipeline totals
+    they report themselves, for `GET /stats/supervisors`.
+    """
+
+    def __init__(
+        self,
+        processes: int,
+        with_api: bool = False,
+        api_host: str = "0.0.0.0",
+        api_port: int = 8000,
+        min_uptime: float = 10.0,
+        max_backoff: float = 30.0,
+        shutdown_timeout: float = 30.0,
+    ):
+        self.processes = max(1, processes)
+        self.min_uptime = min_uptime
+        self.max_backoff = max_backoff
+        self.shutdown_timeout = shutdown_timeout
+        self.supervisor_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.running = False
+        self._last_report = 0.0
+
+        self.children: List[_Child] = [
+            _Child(
+                f"worker-{index}",
+                _run_worker,
+                ((index, self.processes) if self.processes > 1 else None,),
+            )
+            for index in range(self.processes)
+        ]
+        if with_api:
+            self.children.append(_Child("api", _run_api, (api_host, api_port)))
+
+    def run(self) -> None:
+        """Start every child and keep them running until SIGTERM or SIGINT"""
+        self.running = True
+        signal.signal(signal.SIGTERM, self._handle_signal)
+        signal.signal(signal.SIGINT, self._handle_signal)
+
+        for child in self.children:
+            child.start()
+        try:
+            while self.running:
+                self._check_children()
+                self._report_stats()
+                time.sleep(0.5)
+        finally:
+            self._shutdown()
+
+    def stop(self) -> None:
+        self.running = False
+
+    def _handle_signal(self, signum, frame) -> None:
+        logger.info(f"Received signal {signum}, stopping supervised processes")
+        self.stop()
+
+    def _check_children(self) -> None:
+        now = time.monotonic()
+        for child in self.children:
+            if child.alive:
+                continue
+            if child.process is not None:
+                # Just exited: record it and schedule the restart
+                child.last_exit_code = child.process.exitcode
+                child.process.close()
+                child.process = None
+                if now - child.started_at < self.min_uptime:
+                    child.failures += 1
+                else:
+                    child.failures = 0
+                delay = min(self.max_backoff, 2 ** child.failures - 1)
+                child.next_start_at = now + delay
+                logger.warning(
+                    f"{child.name} exited with code {child.last_exit_code}, restarting in {delay:.0f}s"
+                )
+            if now >= child.next_start_at:
+                child.restarts += 1
+                child.start()
+
+    def _shutdown(self) -> None:
+        """Ask every child to stop gracefully, killing those that do not exit in time"""
+        for child in self.children:
+            if child.alive:
+                child.process.terminate()
+        deadline = time.monotonic() + self.shutdown_timeout
+        for child in self.children:
+            if child.process is None:
+                continue
+            child.process.join(max(0.0, deadline - time.monotonic()))
+            if child.process.is_alive():
+                logger.warning(f"{child.name} did not stop in time, killing it")
+                child.process.kill()
+                child.process.join()
+        logger.info("Worker supervisor stopped")
+
+    def stats(self) -> Dict[str, Any]:
+        """Health of every child, plus pipeline totals reported by the live workers"""
+        hostname = socket.gethostname()
+        worker_ids = {
+            f"{hostname}:{child.process.pid}"
+            for child in self.children
+            if child.name.startswith("worker-") and child.alive
+        }
+        reported = {
+            worker_id: stats
+            for worker_id, stats in RedisCache.get_worker_stats().items()
+            if worker_id in worker_ids
+        }
+        totals = {"queued": 0, "in_flight": 0, "results_pending": 0}
+        for stats in reported.values():
+            for key in totals:
+                totals[key] += stats.get("pipeline", {}).get(key, 0)
+
+        return {
+            "supervisor_id": self.supervisor_id,
+            "reported_at": datetime.utcnow().isoformat(),
+            "processes": {child.name: child.stats() for child in self.children},
+            "workers_alive": len(worker_ids),
+            "workers_reporting": len(reported),
+            "pipeline": totals,
+        }
+
+    def _report_stats(self) -> None:
+        now = time.monotonic()
+        if now - self._last_report < settings.WORKER_STATS_INTERVAL:
+            return
+        self._last_report = now
+        try:
+            RedisCache.set_supervisor_stats(
+                self.supervisor_id, self.stats(), expiry=settings.WORKER_STATS_INTERVAL * 3
+            )
+        except Exception as e:
+            logger.warning(f"Error reporting supervisor stats: {e}")
@@ -1,141 +1,547 @@
+import argparse
 import asyncio
 import logging
+import os
+import signal
+import socket
 import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import List
+from typing import Any, Dict, List, Optional, Tuple
 
-from sqlalchemy.orm import Session
-
-from app.core.database import SessionLocal
-from app.crud import delivery as delivery_crud
-from app.models import DeliveryLog, WebhookPayload, Subscription
-from app.services.delivery_service import WebhookDeliveryService
+from app.core.cache import AsyncRedisCache
+from app.core.compression import compression_stats
+from app.core.config import settings
+from app.core.database import async_engine
+from app.models import DeliveryTask, WebhookPayload, Subscription
+from app.services.batcher import BatchItem, BatchLimits, DeliveryBatcher
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.delivery_service import DeliveryOutcome, WebhookDeliveryService
+from app.services.host_limiter import HostLimiter, host_of
+from app.services.latency import LatencyRecorder
+from app.services.retention import RetentionJob
+from app.services.retry_policy import RetryPolicy
+from app.services.http_client import DeliveryHttpClient
+from app.services.result_sink import DeliveryResultSink
+from app.services.scheduler import create_scheduler
+from app.services.subscription_stats import SubscriptionStatsReconciler
+from app.services.wakeup import DeliveryWakeup
 from app.models import DeliveryStatus
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@dataclass
+class DeliveryResult:
+    """Outcome of one delivery, handed from the HTTP consumers to the result writer"""
+    task: DeliveryTask
+    webhook_id: str
+    success: bool = False
+    status_code: Optional[int] = None
+    error_details: Optional[str] = None
+    retry_after: Optional[float] = None  # Seconds requested by the target's Retry-After header
+    retry_policy: Optional[RetryPolicy] = None  # The subscription's policy, for failed attempts
+    failed: bool = False  # Raised while processing; retried with backoff like a failed attempt
+    deferred_until: Optional[datetime] = None  # Not sent; its host or breaker holds it until then
+    sent_at: Optional[datetime] = None  # When the request was sent
+    duration_ms: Optional[float] = None  # HTTP round-trip of the request
+
+def _queue_wait_ms(task: DeliveryTask, sent_at: datetime) -> Optional[int]:
+    """How long an attempt waited to be sent: since ingest for a first attempt, since it became due for a retry"""
+    since = task.created_at if task.attempt_number == 1 else task.next_attempt_at
+    if since is None:
+        return None
+    return max(0, round((sent_at - since).total_seconds() * 1000))
+
 class WebhookWorker:
-    def __init__(self, batch_size: int = 100, polling_interval: int = 1):
+    """
+    Delivery worker built as a three-stage pipeline
+
+    A fetcher claims due deliveries from the scheduler backend into a bounded queue, a pool of consumers sends
+    them over HTTP, and a result writer hands outcomes to a sink that persists them in
+    batches with its own sessions.
+    A consumer picks up the next delivery as soon as its current one finishes, so one
+    slow endpoint only holds one slot.
+    Deliveries to a subscription whose circuit breaker is open are rescheduled without
+    a network call. Each destination host has its own adaptive concurrency and rate
+    limit. A delivery to a saturated host is parked in memory for a short wait, or
+    handed back to the schedule for a long one, so the consumer moves on to deliveries
+    for other hosts.
+    Deliveries to subscriptions with `batch_delivery` set are grouped by a batcher and
+    sent as one request per batch.
+    When idle, the fetcher waits for a Redis wakeup published on ingest and retry
+    scheduling, falling back to polling every `polling_interval` seconds.
+    Expired logs and payloads are removed by a retention job that one worker at a
+    time runs every RETENTION_INTERVAL seconds; per-subscription delivery counters are
+    recounted the same way.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 100,
+        polling_interval: int = 1,
+        concurrency: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        partition: Optional[Tuple[int, int]] = None
+    ):
         self.batch_size = batch_size
         self.polling_interval = polling_interval
+        self.concurrency = concurrency or settings.WORKER_CONCURRENCY
+        self.queue_size = queue_size or settings.WORKER_QUEUE_SIZE
         self.running = False
-        self.max_retries = 3
+        self.partition = partition  # (index, count) of the subscriptions this process owns
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.http_client = DeliveryHttpClient()
+        self.scheduler = create_scheduler(self.worker_id, partition=partition)
+        self.result_sink = DeliveryResultSink(owner=self.worker_id, scheduler=self.scheduler)
+        self.wakeup = DeliveryWakeup()
+        self.delivery_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self.result_queue: asyncio.Queue = asyncio.Queue()
+        self.in_flight = 0
+        self._queue_has_room = asyncio.Event()
+        self.host_limiter = HostLimiter()
+        self.circuit_breaker = CircuitBreaker()
+        self.parked = 0
+        self.deferred = 0
+        self.payloads_loaded = 0
+        self._held_since: Dict[int, float] = {}  # Log ID -> when its host first held it back
+        self.batcher = DeliveryBatcher(self._send_batch)
+        self.retention = RetentionJob(self.worker_id)
+        self.latency = LatencyRecorder()
+        self.stats_reconciler = SubscriptionStatsReconciler(self.worker_id)
 
-    async def process_webhook_batch(self, db: Session) -> int:
+    async def fetch_webhook_batch(self) -> int:
+        """Claim as many due deliveries as the queue has room for and enqueue them"""
+        free_slots = self.queue_size - self._backlog()
+        if free_slots <= 0:
+            return 0
         try:
-            pending_deliveries = delivery_crud.get_pending_deliveries(
-                db, limit=self.batch_size
-            )
-            if not pending_deliveries:
-                return 0
-                
-            logger.info(f"Processing {len(pending_deliveries)} pending webhook deliveries")
-            
-            chunk_size = 20
-            for i in range(0, len(pending_deliveries), chunk_size):
-                chunk = pending_deliveries[i:i + chunk_size]
-                tasks = [
-                    self._process_single_delivery(
-                        db=db,
-                        log=delivery_log,
-                        webhook_payload=webhook_payload,
-                        subscription=subscription
-                    )
-                    for delivery_log, webhook_payload, subscription in chunk
-                ]
-                await asyncio.gather(*tasks)
-                await asyncio.sleep(0.1)
-                
-            return len(pending_deliveries)
+            # Rows stay usable after the fetch session closes (expire_on_commit=False)
+            claimed = await self.scheduler.claim(min(self.batch_size, free_slots))
+            pending_deliveries = await self._load_payloads(claimed)
         except Exception as e:
-            logger.error(f"Error in process_webhook_batch: {str(e)}", exc_info=True)
+            logger.error(f"Error in fetch_webhook_batch: {str(e)}", exc_info=True)
             return 0
 
-    async def _process_single_delivery(
-        self, db: Session, log: DeliveryLog, webhook_payload: WebhookPayload, subscription: Subscription
-    ) -> None:
+        if pending_deliveries:
+            logger.info(f"Queued {len(pending_deliveries)} pending webhook deliveries")
+        for delivery in pending_deliveries:
+            self.delivery_queue.put_nowait(delivery)
+        return len(claimed)
+
+    async def _load_payloads(
+        self, claimed: List[Tuple[DeliveryTask, Subscription]]
+    ) -> List[Tuple[DeliveryTask, Optional[WebhookPayload], Subscription]]:
+        """
+        Pair claimed deliveries with their payloads, loaded in one query
+
+        Only deliveries that will be sent get a payload; ones whose subscription's
+        breaker is open are deferred here.
+        """
+        deliveries, to_send = [], []
+        for task, subscription in claimed:
+            wait = self.circuit_breaker.open_delay(subscription.id)
+            if wait > 0:
+                self._defer((task, None, subscription), wait)
+                continue
+            to_send.append((task, subscription))
+        if not to_send:
+            return deliveries
+
+        payloads = await self.scheduler.load_payloads(task.webhook_id for task, _ in to_send)
+        self.payloads_loaded += len(payloads)
+        for task, subscription in to_send:
+            webhook_payload = payloads.get(task.webhook_id)
+            if webhook_payload is None:
+                self.result_queue.put_nowait(
+                    self._processing_error(task, subscription, "Processing error: webhook payload not found")
+                )
+                continue
+            deliveries.append((task, webhook_payload, subscription))
+        return deliveries
+
+    async def fetch_deliveries(self) -> None:
+        """Fetcher stage: keep the delivery queue topped up until the worker stops"""
+        while self.running:
+            try:
+                if self._backlog() >= self.queue_size:
+                    self._queue_has_room.clear()
+                    if self._backlog() >= self.queue_size:
+                        await self._queue_has_room.wait()
+                    continue
+
+                # Cleared before fetching so a wakeup arriving mid-fetch is not lost
+                self.wakeup.clear()
+                fetched_count = await self.fetch_webhook_batch()
+                if fetched_count == 0:
+                    await self.wakeup.wait(self.polling_interval)
+            except Exception as e:
+                logger.error(f"Error fetching webhook deliveries: {e}")
+                await asyncio.sleep(self.polling_interval)
+
+    def _backlog(self) -> int:
+        """Claimed deliveries waiting to be sent: queued, parked or waiting in a batch"""
+        return self.delivery_queue.qsize() + self.parked + self.batcher.pending
+
+    async def deliver_from_queue(self) -> None:
+        """Consumer stage: send queued deliveries one at a time, within their host's limits"""
+        while True:
+            delivery = await self.delivery_queue.get()
+            self._queue_has_room.set()
+            parked = False
+            try:
+                parked = await self._deliver(delivery)
+            except Exception as e:
+                # The task keeps its lease and is claimed again once it expires
+                logger.error(f"Error delivering webhook {delivery[0].webhook_id}: {str(e)}", exc_info=True)
+            finally:
+                # A parked delivery is marked done by _unpark, when it is requeued
+                if not parked:
+                    self.delivery_queue.task_done()
+
+    async def _deliver(self, delivery: Tuple[DeliveryTask, WebhookPayload, Subscription]) -> bool:
+        """Send, batch, defer or park one queued delivery; returns whether it was parked"""
+        task, webhook_payload, subscription = delivery
+        host = host_of(subscription.target_url)
+
+        if subscription.batch_delivery is not None:
+            self._add_to_batch(delivery)
+            return False
+        allowed, wait = await self.circuit_breaker.allow(subscription.id)
+        if not allowed:
+            self._defer(delivery, wait)
+            return False
+        wait = self.host_limiter.acquire(host)
+        if wait > 0:
+            return self._hold(delivery, wait)
+        self._held_since.pop(task.id, None)
+
+        self.in_flight += 1
+        result = None
         try:
-            if log.attempt_number >= self.max_retries:
-                log.status = DeliveryStatus.FAILED_ATTEMPT
-                log.error_details = "Max retries exceeded"
-                db.add(log)
-                db.commit()
+            result = await self._process_single_delivery(
+                task=task,
+                webhook_payload=webhook_payload,
+                subscription=subscription
+            )
+            self.result_queue.put_nowait(result)
+            if not result.failed:
+                await self.circuit_breaker.record(subscription.id, result.status_code)
+        finally:
+            self.in_flight -= 1
+            self.host_limiter.release(
+                host,
+                status_code=result.status_code if result else None,
+                retry_after=result.retry_after if result else None
+            )
+        return False
+
+    def _add_to_batch(self, delivery: Tuple[DeliveryTask, WebhookPayload, Subscription]) -> None:
+        task, webhook_payload, subscription = delivery
+        try:
+            body = WebhookDeliveryService.plain_body(webhook_payload)
+        except Exception as e:
+            logger.error(f"Error preparing webhook {task.webhook_id} for a batch: {e}", exc_info=True)
+            self.result_queue.put_nowait(self._processing_error(task, subscription, f"Processing error: {str(e)}"))
+            return
+        self.batcher.add(
+            subscription.id, BatchItem(delivery, body), BatchLimits.for_subscription(subscription.batch_delivery)
+        )
+
+    async def _send_batch(self, subscription_id: str, items: List[BatchItem]) -> None:
+        """
+        Send a batch of deliveries to one subscription and record the result for each
+
+        The batch goes through the subscription's circuit breaker and its host's limits
+        as one request. If it fails, every delivery in it is retried on its own schedule
+        and batched again once due. A batch the target rejects as too large (413) is
+        split in half and sent again right away.
+        """
+        self._queue_has_room.set()  # Its deliveries no longer count towards the backlog
+        subscription = items[0].delivery[2]
+        allowed, wait = await self.circuit_breaker.allow(subscription_id)
+        if not allowed:
+            for item in items:
+                self._defer(item.delivery, wait)
+            return
+
+        # Batches don't hold a consumer, so they wait for their host in place
+        host = host_of(subscription.target_url)
+        held = 0.0
+        while (wait := self.host_limiter.acquire(host)) > 0:
+            held += wait
+            if held > settings.HOST_DEFER_THRESHOLD:
+                for item in items:
+                    self._defer(item.delivery, wait)
                 return
+            await asyncio.sleep(wait)
+
+        event_types = {item.delivery[1].event_type for item in items}
+        self.in_flight += 1
+        result = None
+        sent_at, started = datetime.utcnow(), time.perf_counter()
+        try:
+            result = await WebhookDeliveryService.process_batch(
+                [item.body for item in items],
+                target_url=subscription.target_url,
+                secret_key=subscription.secret_key,
+                event_type=event_types.pop() if len(event_types) == 1 else None,
+                session=self.http_client.session,
+                content_encoding=subscription.content_encoding
+            )
+        finally:
+            self.in_flight -= 1
+            self.host_limiter.release(
+                host, status_code=result[1] if result else None, retry_after=result[3] if result else None
+            )
+        duration_ms = (time.perf_counter() - started) * 1000
+        success, status_code, error_details, retry_after = result
 
+        if status_code == 413 and len(items) > 1:
+            half = len(items) // 2
+            await asyncio.gather(
+                self._send_batch(subscription_id, items[:half]), self._send_batch(subscription_id, items[half:])
+            )
+            return
+
+        await self.circuit_breaker.record(subscription_id, status_code)
+        retry_policy = None if success else RetryPolicy.for_subscription(subscription.retry_policy)
+        for item in items:
+            task = item.delivery[0]
+            self.result_queue.put_nowait(DeliveryResult(
+                task=task, webhook_id=task.webhook_id,
+                success=success, status_code=status_code, error_details=error_details,
+                retry_after=retry_after, retry_policy=retry_policy, sent_at=sent_at, duration_ms=duration_ms
+            ))
+
+    def _hold(self, delivery: Tuple[DeliveryTask, WebhookPayload, Subscription], wait: float) -> bool:
+        """
+        Hold back a delivery whose host is at its limit without blocking the consumer
+
+        Short waits park it in memory and requeue it when the wait is over. Once a
+        delivery has been held back for HOST_DEFER_THRESHOLD seconds in total, or the
+        host asks for a longer wait, it is handed back to the schedule instead, well
+        before its lease runs out. Returns whether it was parked.
+        """
+        task = delivery[0]
+        loop = asyncio.get_running_loop()
+        held_since = self._held_since.setdefault(task.id, loop.time())
+        if loop.time() - held_since + wait > settings.HOST_DEFER_THRESHOLD:
+            self._defer(delivery, wait)
+            return False
+
+        loop.call_later(wait, self._unpark, delivery)
+        self.parked += 1
+        return True
+
+    def _defer(self, delivery: Tuple[DeliveryTask, Optional[WebhookPayload], Subscription], wait: float) -> None:
+        """Hand a delivery back to the schedule, due again in `wait` seconds, without attempting it"""
+        task = delivery[0]
+        self._held_since.pop(task.id, None)
+        self.deferred += 1
+        self.result_queue.put_nowait(DeliveryResult(
+            task=task, webhook_id=task.webhook_id,
+            deferred_until=datetime.utcnow() + timedelta(seconds=wait)
+        ))
+
+    def _unpark(self, delivery: Tuple[DeliveryTask, WebhookPayload, Subscription]) -> None:
+        # Requeued before task_done() so a join() never sees the delivery as finished
+        self.parked -= 1
+        self.delivery_queue.put_nowait(delivery)
+        self.delivery_queue.task_done()
+
+    async def _process_single_delivery(
+        self, task: DeliveryTask, webhook_payload: Optional[WebhookPayload], subscription: Subscription
+    ) -> DeliveryResult:
+        try:
             logger.info(
-                f"Processing webhook {webhook_payload.id} to {subscription.target_url} "
-                f"(Attempt #{log.attempt_number})"
+                f"Processing webhook {task.webhook_id} to {subscription.target_url} "
+                f"(Attempt #{task.attempt_number})"
             )
-            
-            success, status_code, error_details = await WebhookDeliveryService.process_delivery(
-                db=db,
-                log=log,
-                webhook_payload=webhook_payload.payload,
+
+            sent_at, started = datetime.utcnow(), time.perf_counter()
+            success, status_code, error_details, retry_after = await WebhookDeliveryService.process_delivery(
+                webhook_payload=webhook_payload.payload_json,
                 target_url=subscription.target_url,
                 secret_key=subscription.secret_key,
-                event_type=webhook_payload.event_type
+                event_type=webhook_payload.event_type,
+                session=self.http_client.session,
+                body=webhook_payload.body,
+                signature=webhook_payload.signature,
+                signing_key_id=webhook_payload.signing_key_id,
+                body_encoding=webhook_payload.body_encoding,
+                content_encoding=subscription.content_encoding
             )
-            
-            updated_log, should_retry = await WebhookDeliveryService.handle_delivery_result(
-                db=db,
-                log=log,
-                success=success,
-                status_code=status_code,
-                error_details=error_details
+            return DeliveryResult(
+                task=task, webhook_id=task.webhook_id,
+                success=success, status_code=status_code, error_details=error_details,
+                retry_after=retry_after,
+                retry_policy=None if success else RetryPolicy.for_subscription(subscription.retry_policy),
+                sent_at=sent_at, duration_ms=(time.perf_counter() - started) * 1000
             )
-            
-            if success:
-                logger.info(f"Webhook {webhook_payload.id} delivered successfully")
-            elif should_retry and log.attempt_number < self.max_retries:
-                logger.info(
-                    f"Webhook {webhook_payload.id} delivery failed, "
-                    f"will retry (attempt {log.attempt_number + 1}) at {updated_log.next_attempt_at}"
-                )
-            else:
-                logger.warning(f"Webhook {webhook_payload.id} delivery failed permanently: {error_details}")
-                
         except Exception as e:
             logger.error(f"Error processing delivery: {str(e)}", exc_info=True)
-            log.status = DeliveryStatus.FAILED_ATTEMPT
-            log.error_details = f"Processing error: {str(e)}"
-            db.add(log)
-            db.commit()
+            return self._processing_error(task, subscription, f"Processing error: {str(e)}")
 
-    async def cleanup_old_logs(self) -> None:
-        try:
-            db = SessionLocal()
-            count = delivery_crud.clean_old_logs(db)
-            if count > 0:
-                logger.info(f"Cleaned up {count} old delivery logs")
-        except Exception as e:
-            logger.error(f"Error cleaning up old logs: {e}")
-        finally:
-            db.close()
+    @staticmethod
+    def _processing_error(task: DeliveryTask, subscription: Subscription, error_details: str) -> DeliveryResult:
+        """Result of a delivery that raised before it could be sent"""
+        return DeliveryResult(
+            task=task, webhook_id=task.webhook_id, error_details=error_details, failed=True,
+            retry_policy=RetryPolicy.for_subscription(subscription.retry_policy)
+        )
+
+    async def write_results(self) -> None:
+        """Result writer stage: turn results into outcomes and hand them to the batched sink"""
+        while True:
+            result = await self.result_queue.get()
+            try:
+                outcome = self._build_outcome(result)
+                if result.sent_at is not None:
+                    self.latency.record(
+                        result.task.subscription_id, result.sent_at, outcome.queue_wait_ms, outcome.duration_ms
+                    )
+                await self.result_sink.add(outcome)
+            except Exception as e:
+                logger.error(f"Error recording delivery result: {str(e)}", exc_info=True)
+            finally:
+                self.result_queue.task_done()
+
+    def _build_outcome(self, result: DeliveryResult) -> DeliveryOutcome:
+        task = result.task
+        if result.deferred_until:
+            # Not attempted: keep its state, release the lease and make it due later
+            return DeliveryOutcome(
+                task_id=task.id,
+                status=task.status,
+                attempt_number=task.attempt_number,
+                status_code=task.status_code,
+                error_details=task.error_details,
+                next_attempt_at=result.deferred_until
+            )
+        if result.failed:
+            outcome = WebhookDeliveryService.compute_processing_error_outcome(
+                task, result.error_details, result.retry_policy
+            )
+            if outcome.status == DeliveryStatus.FAILURE:
+                logger.warning(f"Webhook {result.webhook_id} delivery failed permanently: {result.error_details}")
+            else:
+                logger.info(f"Webhook {result.webhook_id} could not be processed, will retry at {outcome.next_attempt_at}")
+            return outcome
+
+        outcome, should_retry = WebhookDeliveryService.compute_delivery_outcome(
+            task, result.success, result.status_code, result.error_details,
+            result.retry_after, result.retry_policy
+        )
+        if result.sent_at is not None:
+            outcome.queue_wait_ms = _queue_wait_ms(task, result.sent_at)
+            outcome.duration_ms = round(result.duration_ms)
+
+        if result.success:
+            logger.info(f"Webhook {result.webhook_id} delivered successfully")
+        elif should_retry:
+            logger.info(
+                f"Webhook {result.webhook_id} delivery failed, "
+                f"will retry (attempt {outcome.attempt_number + 1}) at {outcome.next_attempt_at}"
+            )
+        else:
+            logger.warning(f"Webhook {result.webhook_id} delivery failed permanently: {result.error_details}")
+        return outcome
+
+    async def stats(self) -> Dict[str, Any]:
+        return {
+            "worker_id": self.worker_id,
+            "reported_at": datetime.utcnow().isoformat(),
+            "partition": list(self.partition) if self.partition else None,
+            "pipeline": {
+                "concurrency": self.concurrency,
+                "queued": self.delivery_queue.qsize(),
+                "in_flight": self.in_flight,
+                "parked": self.parked,
+                "deferred": self.deferred,
+                "payloads_loaded": self.payloads_loaded,
+                "results_pending": self.result_queue.qsize(),
+            },
+            "http_pool": self.http_client.stats(),
+            "host_limiter": self.host_limiter.stats(),
+            "circuit_breaker": self.circuit_breaker.stats(),
+            "batcher": self.batcher.stats(),
+            "result_sink": self.result_sink.stats(),
+            "scheduler": await self.scheduler.stats(),
+            "wakeup": self.wakeup.stats(),
+            "compression": compression_stats.stats(),
+            "retention": self.retention.stats(),
+            "subscription_stats": self.stats_reconciler.stats(),
+            "latency": self.latency.stats(),
+        }
+
+    async def report_stats(self) -> None:
+        while self.running:
+            self.host_limiter.prune()
+            try:
+                await AsyncRedisCache.set_worker_stats(
+                    self.worker_id, await self.stats(), expiry=settings.WORKER_STATS_INTERVAL * 3
+                )
+            except Exception as e:
+                logger.warning(f"Error reporting worker stats: {e}")
+            await asyncio.sleep(settings.WORKER_STATS_INTERVAL)
 
     async def run(self) -> None:
         self.running = True
+        await self.http_client.start()
+        tasks = [
+            asyncio.create_task(self.report_stats()),
+            asyncio.create_task(self.write_results()),
+            asyncio.create_task(self.result_sink.run()),
+            asyncio.create_task(self.scheduler.run()),
+            asyncio.create_task(self.wakeup.run()),
+            asyncio.create_task(self.circuit_breaker.run()),
+            asyncio.create_task(self.retention.run()),
+            asyncio.create_task(self.stats_reconciler.run()),
+            asyncio.create_task(self.latency.run()),
+        ]
+        tasks += [asyncio.create_task(self.deliver_from_queue()) for _ in range(self.concurrency)]
         try:
-            while self.running:
-                db = SessionLocal()
-                try:
-                    processed_count = await self.process_webhook_batch(db)
-                    if processed_count == 0:
-                        await asyncio.sleep(self.polling_interval)
-                    if datetime.utcnow().minute == 0:
-                        await self.cleanup_old_logs()
-                except Exception as e:
-                    logger.error(f"Error processing webhook batch: {e}")
-                    await asyncio.sleep(self.polling_interval)
-                finally:
-                    db.close()
+            await self.fetch_deliveries()
+            # Stopped: finish what was already claimed before shutting down
+            await self.delivery_queue.join()
+            await self.batcher.close()
+            await self.result_queue.join()
         except asyncio.CancelledError:
             self.running = False
             logger.info("Webhook worker shutdown")
+        finally:
+            # Anything still queued keeps its lease and is reclaimed once the lease expires
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self.result_sink.close()
+            await self.latency.flush()
+            await self.http_client.close()
+            await async_engine.dispose()
 
     def stop(self) -> None:
         self.running = False
+        self._queue_has_room.set()
+        self.wakeup.wake()
+
+def run_worker(partition: Optional[Tuple[int, int]] = None) -> None:
+    """
+    Run one worker on its own event loop until SIGTERM or SIGINT
+
+    Either signal stops the fetcher; the worker then sends what it already claimed,
+    writes back every buffered result and exits.
+    """
+    async def serve() -> None:
+        worker = WebhookWorker(partition=partition)
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, worker.stop)
+        await worker.run()
+        logger.info("Webhook worker stopped")
+
+    asyncio.run(serve())
 
 async def start_webhook_worker() -> WebhookWorker:
     worker = WebhookWorker()
@@ -144,10 +550,23 @@ async def start_webhook_worker() -> WebhookWorker:
     return worker
 
 if __name__ == "__main__":
-    loop = asyncio.get_event_loop()
-    worker = WebhookWorker()
-    try:
-        loop.run_until_complete(worker.run())
-    except KeyboardInterrupt:
-        worker.stop()
-        logger.info("Worker stopped by user")
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Run the webhook delivery worker")
+    parser.add_argument(
+        "--processes", type=int, default=settings.WORKER_PROCESSES,
+        help="Number of worker processes, each owning a partition of the subscriptions"
+    )
+    parser.add_argument(
+        "--with-api", action="store_true",
+        help="Also serve the API from the same supervisor"
+    )
+    parser.add_argument("--host", default="0.0.0.0", help="API host (with --with-api)")
+    parser.add_argument("--port", type=int, default=8000, help="API port (with --with-api)")
+    args = parser.parse_args()
+
+    if args.processes > 1 or args.with_api:
+        from app.supervisor import WorkerSupervisor
+        WorkerSupervisor(
+            processes=args.processes, with_api=args.with_api, api_host=args.host, api_port=args.port
+        ).run()
+    else:
+        run_worker()
\ No newline at end of file
@@ -104,6 +104,52 @@ class TestWebhookAPI(unittest.TestCase):
         # Use the created webhook ID for further tests
         return data["webhook_id"]
     
+    def test_ingest_webhook_batch(self):
+        # First create a subscription
+        subscription_id = self.test_create_subscription()
+
+        # Ingest a mixed batch in one request
+        response = self.client.post(
+            "/api/v1/webhooks/ingest/batch",
+            json={"items": [
+                {"subscription_id": subscription_id, "payload": self.test_webhook_payload, "event_type": "order.created"},
+                {"subscription_id": subscription_id, "payload": self.test_webhook_payload, "event_type": "order.deleted"},
+                {"subscription_id": str(uuid.uuid4()), "payload": self.test_webhook_payload},
+            ]}
+        )
+        self.assertEqual(response.status_code, 202)
+        data = response.json()
+        self.assertEqual(data["accepted"], 1)
+        self.assertEqual(data["skipped"], 1)
+        self.assertEqual(data["rejected"], 1)
+        self.assertEqual([r["status"] for r in data["results"]], ["accepted", "skipped", "rejected"])
+        self.assertIsNotNone(data["results"][0]["webhook_id"])
+
+        # The accepted webhook is queryable like a single ingest
+        response = self.client.get(f"/api/v1/webhooks/{data['results'][0]['webhook_id']}/status")
+        self.assertEqual(response.status_code, 200)
+
+    def test_publish_event(self):
+        # A subscription listening for order.created
+        subscription_id = self.test_create_subscription()
+
+        # Publish by event type without naming the subscription
+        response = self.client.post(
+            "/api/v1/webhooks/publish/order.created",
+            json={"payload": self.test_webhook_payload}
+        )
+        self.assertEqual(response.status_code, 202)
+        data = response.json()
+        self.assertIn(subscription_id, [d["subscription_id"] for d in data["deliveries"]])
+
+        # Events it does not listen for are not fanned out to it
+        response = self.client.post(
+            "/api/v1/webhooks/publish/invoice.paid",
+            json={"payload": self.test_webhook_payload}
+        )
+        self.assertEqual(response.status_code, 202)
+        self.assertNotIn(subscription_id, [d["subscription_id"] for d in response.json()["deliveries"]])
+
     def test_get_webhook_status(self):
         # First create a subscription and ingest a webhook
         webhook_id = self.test_ingest_webhook()
@@ -116,6 +162,17 @@ class TestWebhookAPI(unittest.TestCase):
         if data:  # If worker has already processed it
             self.assertEqual(data[0]["webhook_id"], webhook_id)
     
+    def test_get_webhook_delivery(self):
+        webhook_id = self.test_ingest_webhook()
+
+        # The current state is shown before the first attempt, from the delivery task
+        response = self.client.get(f"/api/v1/webhooks/{webhook_id}/delivery")
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["webhook_id"], webhook_id)
+        self.assertIn(data["current_status"], ["pending", "success", "failed_attempt", "failure"])
+        self.assertTrue(isinstance(data["history"], list))
+    
     def test_get_subscription_webhooks(self):
         # First create a subscription and ingest a webhook
         subscription_id = self.test_create_subscription()
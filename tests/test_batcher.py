@@ -0,0 +1,54 @@
+import sys
+import os
+import asyncio
+import unittest
+
+# Explicitly set PYTHONPATH to the project root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from app.services.batcher import BatchItem, BatchLimits, DeliveryBatcher
+
+class TestDeliveryBatcher(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.sent = []
+
+        async def send(subscription_id, items):
+            self.sent.append((subscription_id, [item.delivery for item in items]))
+
+        self.batcher = DeliveryBatcher(send)
+
+    async def test_full_batches_are_sent_right_away(self):
+        limits = BatchLimits(max_size=3, max_bytes=1000, linger_ms=10000)
+        for i in range(7):
+            self.batcher.add("sub", BatchItem(i, b"{}"), limits)
+        await asyncio.sleep(0)
+        self.assertEqual(self.sent, [("sub", [0, 1, 2]), ("sub", [3, 4, 5])])
+        self.assertEqual(self.batcher.pending, 1)
+
+    async def test_batches_are_bounded_by_bytes(self):
+        limits = BatchLimits(max_size=100, max_bytes=25, linger_ms=10000)
+        for i in range(3):
+            self.batcher.add("sub", BatchItem(i, b"x" * 10), limits)
+        await asyncio.sleep(0)
+        self.assertEqual(self.sent, [("sub", [0, 1])])
+
+    async def test_partial_batches_are_sent_after_linger(self):
+        limits = BatchLimits(max_size=100, max_bytes=1000, linger_ms=20)
+        self.batcher.add("a", BatchItem(1, b"{}"), limits)
+        self.batcher.add("b", BatchItem(2, b"{}"), limits)
+        await asyncio.sleep(0.05)
+        self.assertEqual(sorted(self.sent), [("a", [1]), ("b", [2])])
+        self.assertEqual(self.batcher.pending, 0)
+
+    async def test_close_sends_pending_batches(self):
+        self.batcher.add("sub", BatchItem(1, b"{}"), BatchLimits(max_size=100, max_bytes=1000, linger_ms=10000))
+        await self.batcher.close()
+        self.assertEqual(self.sent, [("sub", [1])])
+
+    def test_subscription_overrides(self):
+        limits = BatchLimits.for_subscription({"max_size": 10})
+        self.assertEqual(limits.max_size, 10)
+        self.assertEqual(limits.linger_ms, BatchLimits().linger_ms)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import sys
+import os
+import time
+import unittest
+
+# Explicitly set PYTHONPATH to the project root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from app.services.circuit_breaker import CircuitBreaker, is_endpoint_failure
+
+class TestCircuitBreaker(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.breaker = CircuitBreaker()
+
+    def test_endpoint_failures(self):
+        self.assertTrue(is_endpoint_failure(None))
+        self.assertTrue(is_endpoint_failure(503))
+        self.assertTrue(is_endpoint_failure(408))
+        self.assertFalse(is_endpoint_failure(404))
+        self.assertFalse(is_endpoint_failure(200))
+
+    async def test_closed_breaker_allows(self):
+        self.assertEqual(await self.breaker.allow("sub"), (True, 0.0))
+
+    async def test_open_breaker_reschedules_until_open_period_ends(self):
+        self.breaker._breakers["sub"] = {"state": "open", "open_until": time.time() + 30}
+        allowed, delay = await self.breaker.allow("sub")
+        self.assertFalse(allowed)
+        self.assertGreater(delay, 29)
+        self.assertEqual(self.breaker.rejected, 1)
+
+    async def test_recovering_breaker_ramps_up(self):
+        now = time.time()
+        self.breaker._breakers["sub"] = {"state": "recovering", "ramp_started": now - 60, "ramp_until": now}
+        self.assertEqual(await self.breaker.allow("sub"), (True, 0.0))
+
+        self.breaker._breakers["sub"] = {"state": "recovering", "ramp_started": now, "ramp_until": now + 1e9}
+        results = [(await self.breaker.allow("sub"))[0] for _ in range(200)]
+        self.assertLess(results.count(True), 60)
+
+    async def test_successes_of_healthy_subscriptions_skip_redis(self):
+        # Would fail without Redis if it tried to record anything
+        await self.breaker.record("sub", 200)
+        self.assertNotIn("sub", self.breaker._failing)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import sys
+import os
+import gzip
+import unittest
+
+# Explicitly set PYTHONPATH to the project root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from app.core.compression import compress_for_storage, compression_stats, decompress
+from app.core.config import settings
+from app.crud.webhook import _payload_columns
+from app.models import WebhookPayload
+from app.services.delivery_service import WebhookDeliveryService
+from app.services.signing import prepare_body, sign_body
+
+class TestCompression(unittest.TestCase):
+    payload = {"items": [{"id": i, "name": "Widget", "tags": ["blue", "large"]} for i in range(500)]}
+
+    def test_large_bodies_are_stored_compressed(self):
+        body, _, _ = prepare_body(self.payload, None)
+        self.assertGreaterEqual(len(body), settings.PAYLOAD_COMPRESSION_THRESHOLD)
+        stored, encoding = compress_for_storage(body)
+        self.assertEqual(encoding, "gzip")
+        self.assertLess(len(stored), len(body) / 5)
+        self.assertEqual(decompress(stored, encoding), body)
+        self.assertGreater(compression_stats.stats()["ratio"], 1)
+
+    def test_small_bodies_are_stored_as_is(self):
+        self.assertEqual(compress_for_storage(b'{"a":1}'), (b'{"a":1}', None))
+
+    def test_payload_is_decoded_from_compressed_body(self):
+        body, _, _ = prepare_body(self.payload, None)
+        stored, encoding = compress_for_storage(body)
+        webhook = WebhookPayload(payload=None, body=stored, body_encoding=encoding)
+        self.assertEqual(webhook.payload, self.payload)
+
+    def test_payload_is_stored_once(self):
+        columns = _payload_columns({"a": 1}, None)
+        self.assertIsNone(columns["payload_json"])
+        webhook = WebhookPayload(**columns)
+        self.assertEqual(webhook.payload, {"a": 1})
+
+    def test_gzip_deliveries(self):
+        body, signature, key_id = prepare_body(self.payload, "secret")
+        stored, encoding = compress_for_storage(body)
+
+        # Stored gzip is sent as is to subscribers accepting gzip, signed over the plain body
+        sent, sent_signature, sent_encoding = WebhookDeliveryService._request_body(
+            None, "secret", stored, encoding, signature, key_id, "gzip"
+        )
+        self.assertEqual((sent, sent_encoding), (stored, "gzip"))
+        self.assertEqual(sent_signature, sign_body(body, "secret"))
+
+        # Others get the plain body
+        sent, _, sent_encoding = WebhookDeliveryService._request_body(
+            None, "secret", stored, encoding, signature, key_id, None
+        )
+        self.assertEqual((sent, sent_encoding), (body, None))
+
+        # Uncompressed bodies are compressed on the way out
+        sent, _, sent_encoding = WebhookDeliveryService._request_body(
+            None, "secret", body, None, signature, key_id, "gzip"
+        )
+        self.assertEqual((gzip.decompress(sent), sent_encoding), (body, "gzip"))
+
+if __name__ == "__main__":
+    unittest.main()
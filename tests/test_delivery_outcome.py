@@ -0,0 +1,68 @@
+import sys
+import os
+import unittest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+# Explicitly set PYTHONPATH to the project root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from app.models import DeliveryStatus
+from app.services.delivery_service import WebhookDeliveryService
+from app.core.config import settings
+from app.services.retry_policy import MAX_DELIVERY_ATTEMPTS, RetryPolicy
+
+class TestDeliveryOutcome(unittest.TestCase):
+    def setUp(self):
+        self.task = SimpleNamespace(
+            id=7, status=DeliveryStatus.FAILED_ATTEMPT, attempt_number=2,
+            status_code=503, error_details="Unavailable", next_attempt_at=None
+        )
+
+    def test_retry_moves_the_task_on_and_logs_the_attempt_sent(self):
+        outcome, should_retry = WebhookDeliveryService.compute_delivery_outcome(
+            self.task, False, 502, "Bad gateway", retry_policy=RetryPolicy(intervals=[10], jitter="none")
+        )
+        self.assertTrue(should_retry)
+        self.assertEqual((outcome.task_id, outcome.attempt_number), (7, 3))
+
+        attempt = outcome.attempt_log("wh", "sub")
+        self.assertEqual(attempt["attempt_number"], 2)
+        self.assertEqual(attempt["status"], DeliveryStatus.FAILED_ATTEMPT)
+        self.assertEqual(attempt["next_attempt_at"], outcome.next_attempt_at)
+        self.assertEqual(attempt["attempt_timestamp"], outcome.attempted_at)
+
+    def test_success_is_logged_without_the_previous_error(self):
+        outcome, should_retry = WebhookDeliveryService.compute_delivery_outcome(self.task, True, 200, None)
+        self.assertFalse(should_retry)
+        attempt = outcome.attempt_log("wh", "sub")
+        self.assertEqual((attempt["status"], attempt["status_code"]), (DeliveryStatus.SUCCESS, 200))
+        self.assertIsNone(attempt["error_details"])
+        self.assertIsNone(attempt["next_attempt_at"])
+
+    def test_retryable_failure_of_the_last_attempt_is_final(self):
+        self.task.attempt_number = MAX_DELIVERY_ATTEMPTS
+        outcome, should_retry = WebhookDeliveryService.compute_delivery_outcome(self.task, False, 503, "Unavailable")
+        self.assertFalse(should_retry)
+        self.assertEqual((outcome.status, outcome.attempt_number), (DeliveryStatus.FAILURE, MAX_DELIVERY_ATTEMPTS))
+        self.assertEqual(outcome.attempt_log("wh", "sub")["attempt_number"], MAX_DELIVERY_ATTEMPTS)
+
+    def test_every_retry_interval_is_used(self):
+        self.assertEqual(MAX_DELIVERY_ATTEMPTS, settings.MAX_RETRY_ATTEMPTS + 1)
+        self.assertGreaterEqual(settings.MAX_RETRY_ATTEMPTS, len(settings.RETRY_INTERVALS))
+
+    def test_processing_error_backs_off_and_counts_as_an_attempt(self):
+        outcome = WebhookDeliveryService.compute_processing_error_outcome(
+            self.task, "Processing error: webhook payload not found",
+            retry_policy=RetryPolicy(intervals=[10, 20], jitter="none"), max_attempts=5
+        )
+        self.assertEqual((outcome.status, outcome.attempt_number), (DeliveryStatus.FAILED_ATTEMPT, 3))
+        self.assertGreater(outcome.next_attempt_at, datetime.utcnow() + timedelta(seconds=15))
+        self.assertIsNone(outcome.attempted)
+
+    def test_processing_error_on_the_last_attempt_is_final(self):
+        outcome = WebhookDeliveryService.compute_processing_error_outcome(self.task, "Processing error", max_attempts=2)
+        self.assertEqual((outcome.status, outcome.attempt_number), (DeliveryStatus.FAILURE, 2))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import sys
+import os
+import unittest
+
+# Explicitly set PYTHONPATH to the project root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from app.core.event_index import EventTypeIndex, event_type_matches
+
+class TestEventTypeIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = EventTypeIndex()
+        self.index.rebuild([
+            ("exact", ["order.created"]),
+            ("prefix", ["order.*"]),
+            ("segment", ["*.deleted"]),
+            ("all", None),
+            ("user", ["user.updated", "user.created"]),
+        ])
+
+    def test_exact_and_wildcard_match(self):
+        self.assertEqual(self.index.match("order.created"), {"exact", "prefix", "all"})
+        self.assertEqual(self.index.match("order.item.added"), {"prefix", "all"})
+        self.assertEqual(self.index.match("order.deleted"), {"prefix", "segment", "all"})
+        self.assertEqual(self.index.match("user.created"), {"user", "all"})
+
+    def test_prefix_requires_a_further_segment(self):
+        self.assertEqual(self.index.match("order"), {"all"})
+
+    def test_add_replaces_and_remove_drops(self):
+        self.index.add("user", ["invoice.paid"])
+        self.assertEqual(self.index.match("user.created"), {"all"})
+        self.assertEqual(self.index.match("invoice.paid"), {"user", "all"})
+
+        self.index.remove("prefix")
+        self.index.remove("all")
+        self.assertEqual(self.index.match("order.created"), {"exact"})
+        self.assertEqual(len(self.index), 3)
+
+    def test_event_type_matches_agrees_with_index(self):
+        patterns = {
+            "exact": ["order.created"],
+            "prefix": ["order.*"],
+            "segment": ["*.deleted"],
+            "user": ["user.updated", "user.created"],
+        }
+        for event_type in ["order.created", "order.item.added", "order", "user.deleted", "user.created"]:
+            matched = {sid for sid, p in patterns.items() if event_type_matches(p, event_type)}
+            self.assertEqual(matched, self.index.match(event_type) - {"all"}, event_type)
+
+if __name__ == "__main__":
+    unittest.main()
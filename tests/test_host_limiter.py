@@ -0,0 +1,61 @@
+import sys
+import os
+import unittest
+
+# Explicitly set PYTHONPATH to the project root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from app.services.host_limiter import HostLimiter, host_of
+
+class TestHostLimiter(unittest.TestCase):
+    def setUp(self):
+        self.limiter = HostLimiter(max_concurrency=4, max_rate=100, burst=100, min_rate=1)
+
+    def test_host_of(self):
+        self.assertEqual(host_of("https://Example.com:8443/hook?x=1"), "example.com:8443")
+
+    def test_concurrency_limit_is_per_host(self):
+        for _ in range(4):
+            self.assertEqual(self.limiter.acquire("a", now=0), 0)
+        self.assertGreater(self.limiter.acquire("a", now=0), 0)
+        self.assertEqual(self.limiter.acquire("b", now=0), 0)
+        self.limiter.release("a", 200, now=0)
+        self.assertEqual(self.limiter.acquire("a", now=0), 0)
+
+    def test_rate_limit_waits_for_tokens(self):
+        limiter = HostLimiter(max_concurrency=100, max_rate=2, burst=1, min_rate=1)
+        self.assertEqual(limiter.acquire("a", now=0), 0)
+        self.assertAlmostEqual(limiter.acquire("a", now=0), 0.5)
+        self.assertEqual(limiter.acquire("a", now=0.5), 0)
+
+    def test_throttling_halves_limits_and_honors_retry_after(self):
+        self.limiter.acquire("a", now=0)
+        self.limiter.release("a", 429, retry_after=10, now=0)
+        self.assertAlmostEqual(self.limiter.acquire("a", now=4), 6)
+        stats = self.limiter.stats()["limited_hosts"]["a"]
+        self.assertEqual(stats["limit"], 2)
+        self.assertEqual(stats["rate"], 50)
+
+    def test_throttling_within_cooldown_counts_once(self):
+        for _ in range(3):
+            self.limiter.acquire("a", now=0)
+        for _ in range(3):
+            self.limiter.release("a", 503, now=0)
+        self.assertEqual(self.limiter.stats()["limited_hosts"]["a"]["limit"], 2)
+
+    def test_successes_restore_limits(self):
+        self.limiter.acquire("a", now=0)
+        self.limiter.release("a", 429, now=0)
+        for _ in range(20):
+            self.assertEqual(self.limiter.acquire("a", now=1), 0)
+            self.limiter.release("a", 200, now=1)
+        self.assertNotIn("a", self.limiter.stats()["limited_hosts"])
+
+    def test_prune_forgets_idle_hosts(self):
+        self.limiter.acquire("a", now=0)
+        self.limiter.release("a", 200, now=0)
+        self.assertEqual(self.limiter.prune(idle_seconds=60, now=30), 0)
+        self.assertEqual(self.limiter.prune(idle_seconds=60, now=61), 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import sys
+import os
+import asyncio
+import unittest
+
+# Explicitly set PYTHONPATH to the project root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from app.services.http_client import DeliveryHttpClient
+
+class TestPoolStats(unittest.TestCase):
+    def test_counts_connections_in_use_waiting_and_reused(self):
+        asyncio.run(self._exercise_pool())
+
+    async def _exercise_pool(self):
+        release = asyncio.Event()
+
+        async def handler(request):
+            await release.wait()
+            return web.Response(text="ok")
+
+        app = web.Application()
+        app.router.add_post("/hook", handler)
+        server = TestServer(app)
+        await server.start_server()
+        client = DeliveryHttpClient(limit=10, limit_per_host=1)
+        await client.start()
+        try:
+            async def post():
+                async with client.session.post(server.make_url("/hook"), data=b"{}") as response:
+                    return await response.text()
+
+            requests = [asyncio.create_task(post()) for _ in range(3)]
+            await asyncio.sleep(0.2)
+            stats = client.stats()
+            self.assertEqual((stats["in_use"], stats["waiting"]), (1, 2))
+            self.assertEqual(list(stats["hosts"].values()), [{"in_use": 1, "waiting": 2}])
+
+            release.set()
+            self.assertEqual(await asyncio.gather(*requests), ["ok"] * 3)
+            stats = client.stats()
+            self.assertEqual((stats["in_use"], stats["waiting"], stats["hosts"]), (0, 0, {}))
+            self.assertEqual((stats["connections_created"], stats["connections_reused"]), (1, 2))
+        finally:
+            await client.close()
+            await server.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,32 @@
+import sys
+import os
+import json
+import unittest
+
+# Explicitly set PYTHONPATH to the project root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from app.core.json_codec import create_codec, orjson
+
+class TestJSONCodec(unittest.TestCase):
+    document = {"event": "order.created", "amount": 19.99, "items": [{"id": 1, "name": "Widget é"}], "paid": True}
+
+    def test_codecs_round_trip(self):
+        for name in ("stdlib", "auto"):
+            codec = create_codec(name)
+            self.assertEqual(codec.loads(codec.dumpb(self.document)), self.document)
+            self.assertEqual(codec.loads(codec.dumps(self.document)), self.document)
+            self.assertEqual(json.loads(codec.dumpb(self.document)), self.document)
+
+    @unittest.skipIf(orjson is None, "orjson is not installed")
+    def test_orjson_falls_back_for_unsupported_values(self):
+        codec = create_codec("orjson")
+        self.assertEqual(codec.loads(codec.dumpb({"big": 2 ** 70})), {"big": 2 ** 70})
+        self.assertEqual(codec.loads(codec.dumpb({1: "a"})), {"1": "a"})
+
+    def test_unknown_codec(self):
+        with self.assertRaises(ValueError):
+            create_codec("yaml")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import sys
+import os
+import random
+import unittest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+# Explicitly set PYTHONPATH to the project root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from app.services.latency import (
+    BUCKETS, SUB_BUCKETS, LatencyHistogram, LatencyRecorder, _windows, bucket_of, bucket_upper_bound, window_start
+)
+from app.worker import _queue_wait_ms
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_buckets_cover_their_values(self):
+        for value in (0, 0.5, 1, 1.5, 7, 100, 999.9, 30000):
+            index = bucket_of(value)
+            self.assertLessEqual(value, bucket_upper_bound(index))
+            if index > 0:
+                self.assertGreater(value, bucket_upper_bound(index - 1) * 0.999)
+        self.assertEqual(bucket_of(10 ** 9), BUCKETS - 1)
+
+    def test_percentiles_within_bucket_error(self):
+        rng = random.Random(7)
+        values = sorted(rng.lognormvariate(4, 1.5) for _ in range(10000))
+        histogram = LatencyHistogram()
+        for value in values:
+            histogram.record(value)
+        for percent in (50, 95, 99):
+            exact = values[int(len(values) * percent / 100) - 1]
+            self.assertAlmostEqual(histogram.percentile(percent) / exact, 1, delta=2 ** (1 / SUB_BUCKETS) - 1)
+
+    def test_merge_equals_recording_everything(self):
+        first, second, both = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+        for value in range(1, 500):
+            (first if value % 2 else second).record(value)
+            both.record(value)
+        self.assertEqual(first.merge(second).summary(), both.summary())
+
+    def test_fields_round_trip(self):
+        histogram = LatencyHistogram()
+        for value in (3, 40, 40, 2500):
+            histogram.record(value)
+        fields = {field: str(value) for field, value in histogram.to_fields().items()}
+        restored = LatencyHistogram.from_fields(fields)
+        self.assertEqual(restored.buckets, histogram.buckets)
+        self.assertEqual(restored.summary(), histogram.summary())
+        self.assertIsNone(LatencyHistogram.from_fields({}).percentile(50))
+
+class TestLatencyWindows(unittest.TestCase):
+    def test_window_start(self):
+        at = datetime(2026, 1, 1, 12, 7, 30)
+        self.assertEqual(window_start(at, 300), window_start(datetime(2026, 1, 1, 12, 5), 300))
+        self.assertEqual(window_start(at, 300) % 300, 0)
+
+    def test_windows_cover_requested_minutes(self):
+        now = datetime(2026, 1, 1, 12, 7, 30)
+        windows = _windows(60, now)
+        self.assertEqual(windows[0], window_start(now - timedelta(minutes=60)))
+        self.assertEqual(windows[-1], window_start(now))
+
+    def test_recorder_keeps_one_histogram_per_window(self):
+        recorder = LatencyRecorder()
+        at = datetime(2026, 1, 1, 12, 0)
+        recorder.record("a", at, 10, 50)
+        recorder.record("a", at + timedelta(seconds=1), None, 70)
+        recorder.record("a", at + timedelta(hours=1), 5, 20)
+        window = window_start(at)
+        self.assertEqual(recorder._pending[("a", "duration", window)].count, 2)
+        self.assertEqual(recorder._pending[("a", "queue_wait", window)].count, 1)
+        self.assertEqual(len(recorder._pending), 4)
+
+    def test_queue_wait_counts_from_ingest_then_due_time(self):
+        created = datetime(2026, 1, 1, 12, 0)
+        due = created + timedelta(minutes=5)
+        sent = due + timedelta(milliseconds=250)
+        first = SimpleNamespace(attempt_number=1, created_at=created, next_attempt_at=due)
+        retry = SimpleNamespace(attempt_number=2, created_at=created, next_attempt_at=due)
+        self.assertEqual(_queue_wait_ms(first, sent), 300250)
+        self.assertEqual(_queue_wait_ms(retry, sent), 250)
+        self.assertEqual(_queue_wait_ms(retry, due - timedelta(seconds=1)), 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import sys
+import os
+import time
+import unittest
+
+# Explicitly set PYTHONPATH to the project root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from app.core.local_cache import LocalCache
+
+class TestLocalCache(unittest.TestCase):
+    def test_evicts_least_recently_used(self):
+        cache = LocalCache(max_size=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.set("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_entries_expire(self):
+        cache = LocalCache(max_size=10, ttl=0.01)
+        cache.set("a", 1)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats()["expirations"], 1)
+
+    def test_load_racing_an_invalidation_is_not_cached(self):
+        cache = LocalCache(max_size=10, ttl=60)
+        generation = cache.generation
+        cache.invalidate("a")  # e.g. an update published while "a" was being loaded
+        self.assertFalse(cache.set("a", "stale", generation))
+        self.assertIsNone(cache.get("a"))
+        self.assertTrue(cache.set("a", "fresh", cache.generation))
+        self.assertEqual(cache.get("a"), "fresh")
+
+    def test_hit_ratio(self):
+        cache = LocalCache(max_size=10, ttl=60)
+        cache.set("a", 1)
+        cache.get("a")
+        cache.get("b")
+        self.assertEqual(cache.stats()["hit_ratio"], 0.5)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import sys
+import os
+import unittest
+from datetime import datetime
+
+# Explicitly set PYTHONPATH to the project root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from app.services import partitions
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+class FakeSession:
+    """Answers the partition catalog query and records every other statement"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        sql = str(statement)
+        if "pg_inherits" in sql:
+            return FakeResult(self.rows)
+        self.statements.append(" ".join(sql.split()))
+        return FakeResult([])
+
+    async def commit(self):
+        pass
+
+class TestPartitions(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.db = FakeSession([
+            ("delivery_logs_default", "DEFAULT", 0),
+            ("delivery_logs_p20261020", "FOR VALUES FROM ('2026-10-20 00:00:00') TO ('2026-10-21 00:00:00')", 10),
+            ("delivery_logs_legacy", "FOR VALUES FROM (MINVALUE) TO ('2026-10-19 00:00:00')", 500),
+            ("delivery_logs_p20261019", "FOR VALUES FROM ('2026-10-19 00:00:00') TO ('2026-10-20 00:00:00')", -1),
+        ])
+
+    async def test_partitions_are_listed_oldest_first(self):
+        listed = await partitions.list_partitions(self.db, "delivery_logs")
+        self.assertEqual([name for name, _, _ in listed], [
+            "delivery_logs_legacy", "delivery_logs_p20261019", "delivery_logs_p20261020", "delivery_logs_default"
+        ])
+        self.assertEqual(listed[1], ("delivery_logs_p20261019", datetime(2026, 10, 20), 0))
+
+    async def test_only_missing_days_are_created(self):
+        created = await partitions.ensure_partitions(
+            self.db, "delivery_logs", days_ahead=3, now=datetime(2026, 10, 20, 15, 30)
+        )
+        self.assertEqual(created, ["delivery_logs_p20261021", "delivery_logs_p20261022", "delivery_logs_p20261023"])
+        self.assertIn("FOR VALUES FROM ('2026-10-21') TO ('2026-10-22')", self.db.statements[0])
+
+    async def test_only_fully_expired_partitions_are_dropped(self):
+        dropped = await partitions.drop_expired_partitions(self.db, "delivery_logs", datetime(2026, 10, 20, 12))
+        self.assertEqual(dropped, {"delivery_logs_legacy": 500, "delivery_logs_p20261019": 0})
+        self.assertEqual(self.db.statements, [
+            "DROP TABLE IF EXISTS delivery_logs_legacy", "DROP TABLE IF EXISTS delivery_logs_p20261019"
+        ])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import sys
+import os
+import asyncio
+import unittest
+from datetime import datetime
+
+# Explicitly set PYTHONPATH to the project root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from sqlalchemy.dialects import postgresql
+
+from app.services.query_plans import POLL_INDEX, check_index_scan, check_poll_plans, poll_queries
+
+def _node(node_type, children=(), **fields):
+    return {"Node Type": node_type, "Plans": list(children), **fields}
+
+INDEX_PLAN = _node("Limit", [_node("LockRows", [
+    _node("Index Scan", **{"Relation Name": "delivery_tasks", "Index Name": POLL_INDEX})
+])])
+
+SEQ_SCAN_PLAN = _node("Limit", [_node("LockRows", [
+    _node("Sort", [_node("Seq Scan", **{"Relation Name": "delivery_tasks"})], **{"Sort Key": ["next_attempt_at"]})
+])])
+
+class TestQueryPlans(unittest.TestCase):
+    def test_index_scan_passes(self):
+        self.assertEqual(check_index_scan(INDEX_PLAN), [])
+
+    def test_seq_scan_and_sort_are_reported(self):
+        problems = check_index_scan(SEQ_SCAN_PLAN)
+        self.assertIn("delivery_tasks is read with Seq Scan", problems)
+        self.assertIn("Rows are sorted on next_attempt_at", problems)
+
+    def test_other_index_is_reported(self):
+        plan = _node("Index Scan", **{"Relation Name": "delivery_tasks", "Index Name": "delivery_tasks_pkey"})
+        self.assertEqual(check_index_scan(plan), ["delivery_tasks is read with Index Scan delivery_tasks_pkey"])
+
+    def test_poll_repeats_index_predicate_literally(self):
+        # A bound status parameter would keep generic plans from using the partial index
+        for statement in poll_queries(datetime(2026, 1, 1)).values():
+            sql = str(statement.compile(dialect=postgresql.dialect()))
+            self.assertIn("status IN ('PENDING', 'FAILED_ATTEMPT')", sql)
+            self.assertIn("ORDER BY delivery_tasks.next_attempt_at", sql)
+
+    @unittest.skipUnless(os.environ.get("PLAN_CHECK_ROWS"), "set PLAN_CHECK_ROWS to EXPLAIN against DATABASE_URL")
+    def test_poll_stays_an_index_scan(self):
+        checks = asyncio.run(check_poll_plans(rows=int(os.environ["PLAN_CHECK_ROWS"])))
+        for name, check in checks.items():
+            self.assertEqual(check["problems"], [], name)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import sys
+import os
+import time
+import unittest
+from datetime import datetime
+
+# Explicitly set PYTHONPATH to the project root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from app.services.retention import RetentionJob, RetentionPass, _dump_log_cursor, _load_log_cursor
+
+class TestRetention(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.job = RetentionJob("test")
+        self.job.pause = 0
+        self.progress = RetentionPass(older_than=datetime(2026, 10, 15))
+        self.cursors = []
+
+    async def step(self, cursor):
+        # 2500 rows in chunks of 1000, keyed by how many were deleted before
+        self.cursors.append(cursor)
+        done = cursor or 0
+        deleted = min(1000, 2500 - done)
+        return deleted, done + deleted if deleted == 1000 else None
+
+    async def test_drain_runs_chunks_until_done(self):
+        cursor = await self.job._drain(self.step, None, time.monotonic() + 60, self.progress)
+        self.assertIsNone(cursor)
+        self.assertEqual(self.cursors, [None, 1000, 2000])
+        self.assertEqual(self.progress.chunks, 3)
+
+    async def test_drain_stops_at_deadline_and_resumes(self):
+        cursor = await self.job._drain(self.step, 1000, time.monotonic() - 1, self.progress)
+        self.assertEqual(cursor, 1000)
+        self.assertEqual(self.cursors, [])
+
+        cursor = await self.job._drain(self.step, cursor, time.monotonic() + 60, self.progress)
+        self.assertIsNone(cursor)
+        self.assertEqual(self.cursors, [1000, 2000])
+
+    def test_progress_reports_throughput(self):
+        self.progress.logs_deleted = 900
+        self.progress.payloads_deleted = 100
+        self.progress.elapsed = 2.0
+        stats = self.progress.stats()
+        self.assertEqual(stats["rows_per_second"], 500.0)
+        self.assertEqual(stats["older_than"], "2026-10-15T00:00:00")
+
+    def test_log_cursor_survives_a_round_trip(self):
+        cursor = (datetime(2026, 10, 15, 12, 30, 1, 5), 42)
+        self.assertEqual(_load_log_cursor(_dump_log_cursor(cursor)), cursor)
+        self.assertIsNone(_load_log_cursor(_dump_log_cursor(None)))
+
+if __name__ == "__main__":
+    unittest.main()
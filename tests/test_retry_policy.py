@@ -0,0 +1,46 @@
+import sys
+import os
+import random
+import unittest
+
+# Explicitly set PYTHONPATH to the project root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from app.services.retry_policy import DEFAULT_RETRY_POLICY, RetryPolicy, simulate_retry_spread
+
+class TestRetryPolicy(unittest.TestCase):
+    def test_base_delay_follows_intervals(self):
+        policy = RetryPolicy(intervals=[10, 30, 60], jitter="none", max_delay=45)
+        self.assertEqual(policy.next_delay(1), 10)
+        self.assertEqual(policy.next_delay(2), 30)
+        self.assertEqual(policy.next_delay(3), 45)  # Capped at max_delay
+        self.assertEqual(policy.next_delay(9), 45)  # Last interval reused
+
+    def test_full_jitter_stays_within_base_delay(self):
+        policy = RetryPolicy(intervals=[10, 30], jitter="full")
+        rng = random.Random(1)
+        delays = [policy.next_delay(2, rng=rng) for _ in range(500)]
+        self.assertTrue(all(1 <= delay <= 30 for delay in delays))
+        self.assertGreater(len({round(delay) for delay in delays}), 20)
+
+    def test_retry_after_is_honored(self):
+        policy = RetryPolicy(intervals=[10], jitter="full")
+        self.assertGreaterEqual(policy.next_delay(1, retry_after=120), 120)
+
+    def test_subscription_overrides(self):
+        self.assertIs(RetryPolicy.for_subscription(None), DEFAULT_RETRY_POLICY)
+        policy = RetryPolicy.for_subscription({"intervals": [5], "jitter": "none"})
+        self.assertEqual(policy.next_delay(4), 5)
+        with self.assertRaises(ValueError):
+            RetryPolicy(jitter="sometimes")
+
+    def test_jitter_spreads_a_burst(self):
+        intervals = [10, 30, 60]
+        fixed = simulate_retry_spread(RetryPolicy(intervals=intervals, jitter="none"), failures=200, bucket_seconds=5)
+        jittered = simulate_retry_spread(RetryPolicy(intervals=intervals, jitter="full"), failures=200, bucket_seconds=5)
+        self.assertEqual(max(count for _, count in fixed), 200)
+        self.assertLess(max(count for _, count in jittered), 0.8 * max(count for _, count in fixed))
+        self.assertEqual(sum(count for _, count in jittered), 600)
+
+if __name__ == "__main__":
+    unittest.main()
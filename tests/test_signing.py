@@ -0,0 +1,28 @@
+import sys
+import os
+import unittest
+
+# Explicitly set PYTHONPATH to the project root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from app.services.signing import encode_body, outbound_body, prepare_body, sign_body
+
+class TestSigning(unittest.TestCase):
+    def test_stored_body_and_signature_are_reused(self):
+        body, signature, key_id = prepare_body({"order": 1}, "secret")
+        self.assertEqual(signature, sign_body(body, "secret"))
+        # The payload is ignored once a body was stored, so every attempt sends the same bytes
+        self.assertEqual(outbound_body({"changed": True}, "secret", body, signature, key_id), (body, signature))
+
+    def test_rotated_secret_is_re_signed(self):
+        body, signature, key_id = prepare_body({"order": 1}, "old")
+        self.assertEqual(outbound_body({"order": 1}, "new", body, signature, key_id), (body, sign_body(body, "new")))
+
+    def test_webhooks_without_stored_body(self):
+        body, signature = outbound_body({"order": 1}, "secret")
+        self.assertEqual(body, encode_body({"order": 1}))
+        self.assertEqual(signature, sign_body(body, "secret"))
+        self.assertEqual(outbound_body({"order": 1}, None), (body, None))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import sys
+import os
+import asyncio
+import unittest
+
+# Explicitly set PYTHONPATH to the project root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from app.core.single_flight import SingleFlight
+
+class TestSingleFlight(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.single_flight = SingleFlight()
+        self.loaded = []
+
+    async def loader(self, keys):
+        self.loaded.append(keys)
+        await asyncio.sleep(0.01)
+        return {key: key.upper() for key in keys if key != "unknown"}
+
+    async def test_concurrent_loads_are_coalesced(self):
+        results = await asyncio.gather(*[
+            self.single_flight.do_many(["a", "unknown"], self.loader) for _ in range(20)
+        ])
+        self.assertEqual(self.loaded, [{"a", "unknown"}])
+        self.assertTrue(all(result == {"a": "A", "unknown": None} for result in results))
+        self.assertEqual(self.single_flight.stats()["in_flight"], 0)
+
+    async def test_only_keys_not_in_flight_are_loaded(self):
+        first = asyncio.ensure_future(self.single_flight.do_many(["a"], self.loader))
+        await asyncio.sleep(0)
+        self.assertEqual(await self.single_flight.do_many(["a", "b"], self.loader), {"a": "A", "b": "B"})
+        await first
+        self.assertEqual(self.loaded, [{"a"}, {"b"}])
+
+    async def test_failures_are_shared(self):
+        async def failing_loader(keys):
+            await asyncio.sleep(0.01)
+            raise RuntimeError("database unavailable")
+
+        results = await asyncio.gather(
+            *[self.single_flight.do("a", lambda: failing_loader({"a"})) for _ in range(3)], return_exceptions=True
+        )
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+        self.assertEqual(self.single_flight.loads, 1)
+
+    async def test_waiters_take_over_when_the_loader_is_cancelled(self):
+        first = asyncio.ensure_future(self.single_flight.do_many(["a"], self.loader))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(self.single_flight.do_many(["a"], self.loader))
+        await asyncio.sleep(0)
+        first.cancel()
+        self.assertEqual(await second, {"a": "A"})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import sys
+import os
+import unittest
+
+# Explicitly set PYTHONPATH to the project root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from app.core.cache import _counter_deltas, _decode_counters
+from app.crud.delivery import _counters_from_rows, _status_change_counts, new_delivery_counts
+from app.models import DeliveryStatus
+from app.services.subscription_stats import drifted_counters
+
+class TestSubscriptionCounters(unittest.TestCase):
+    def test_ingest_adds_pending_deliveries(self):
+        self.assertEqual(
+            new_delivery_counts(["a", "b", "a"]),
+            {"a": {"total": 2, "pending": 2}, "b": {"total": 1, "pending": 1}}
+        )
+
+    def test_only_finishing_changes_counters(self):
+        deltas = _status_change_counts([
+            ("a", DeliveryStatus.PENDING, DeliveryStatus.SUCCESS),
+            ("a", DeliveryStatus.PENDING, DeliveryStatus.FAILURE),
+            ("a", DeliveryStatus.PENDING, DeliveryStatus.FAILED_ATTEMPT),
+            ("b", DeliveryStatus.FAILED_ATTEMPT, DeliveryStatus.PENDING),
+        ])
+        self.assertEqual(deltas, {"a": {"pending": -2, "success": 1, "failure": 1}})
+
+    def test_counters_from_grouped_rows(self):
+        counters = _counters_from_rows([
+            ("a", DeliveryStatus.SUCCESS, 3),
+            ("a", DeliveryStatus.PENDING, 1),
+            ("a", DeliveryStatus.FAILED_ATTEMPT, 2),
+            ("b", None, 0),  # Subscription without tasks
+        ])
+        self.assertEqual(counters["a"], {"total": 6, "success": 3, "failure": 0, "pending": 3})
+        self.assertEqual(counters["b"], {"total": 0, "success": 0, "failure": 0, "pending": 0})
+
+    def test_script_arguments_follow_field_order(self):
+        keys, args = _counter_deltas({"a": {"pending": -1, "success": 1}, "b": {"total": 2}})
+        self.assertEqual(keys, ["subscription_counters:a", "subscription_counters:b"])
+        self.assertEqual(args, [0, 1, 0, -1, 2, 0, 0, 0])
+        self.assertIsNone(_decode_counters({}))
+        self.assertEqual(_decode_counters({"total": "4", "success": "4"})["pending"], 0)
+
+    def test_reconcile_skips_counters_that_moved(self):
+        counted = {
+            "steady": {"total": 5, "success": 5, "failure": 0, "pending": 0},
+            "drifted": {"total": 5, "success": 4, "failure": 0, "pending": 1},
+            "moving": {"total": 5, "success": 5, "failure": 0, "pending": 0},
+            "missing": {"total": 1, "success": 0, "failure": 0, "pending": 1},
+        }
+        before = {
+            "steady": dict(counted["steady"]),
+            "drifted": {"total": 5, "success": 3, "failure": 0, "pending": 2},
+            "moving": {"total": 5, "success": 4, "failure": 0, "pending": 1},
+            "missing": None,
+        }
+        after = dict(before, moving=counted["moving"])
+        self.assertEqual(set(drifted_counters(before, counted, after)), {"drifted", "missing"})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import sys
+import os
+import time
+import unittest
+
+# Explicitly set PYTHONPATH to the project root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from app.services.wakeup import DeliveryWakeup
+
+class TestDeliveryWakeup(unittest.IsolatedAsyncioTestCase):
+    async def test_due_now_wakes_immediately(self):
+        wakeup = DeliveryWakeup()
+        wakeup.notify(time.time())
+        self.assertTrue(await wakeup.wait(0.01))
+
+    async def test_times_out_without_wakeup(self):
+        wakeup = DeliveryWakeup()
+        self.assertFalse(await wakeup.wait(0.01))
+        self.assertEqual(wakeup.woken, 0)
+
+    async def test_future_due_time_wakes_when_due(self):
+        wakeup = DeliveryWakeup()
+        wakeup.notify(time.time() + 0.05)
+        self.assertFalse(await wakeup.wait(0.01))
+        self.assertTrue(await wakeup.wait(0.2))
+
+    async def test_earlier_due_time_replaces_timer(self):
+        wakeup = DeliveryWakeup()
+        wakeup.notify(time.time() + 10)
+        wakeup.notify(time.time() + 0.02)
+        self.assertTrue(await wakeup.wait(0.2))
+
+    async def test_clear_forgets_earlier_wakeups(self):
+        wakeup = DeliveryWakeup()
+        wakeup.wake()
+        wakeup.clear()
+        self.assertFalse(await wakeup.wait(0.01))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import sys
+import os
+import asyncio
+import unittest
+from types import SimpleNamespace
+
+# Explicitly set PYTHONPATH to the project root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from app.worker import WebhookWorker
+
+def _delivery(batch_delivery=None):
+    task = SimpleNamespace(id=1, webhook_id="webhook-1", subscription_id="sub-1")
+    subscription = SimpleNamespace(id="sub-1", target_url="https://example.com/hook", batch_delivery=batch_delivery)
+    return task, None, subscription
+
+class TestDeliverFromQueue(unittest.TestCase):
+    def _drain(self, worker: WebhookWorker, delivery) -> None:
+        async def run():
+            worker.delivery_queue.put_nowait(delivery)
+            consumer = asyncio.create_task(worker.deliver_from_queue())
+            try:
+                await asyncio.wait_for(worker.delivery_queue.join(), 2)
+            finally:
+                consumer.cancel()
+        asyncio.run(run())
+
+    def test_errors_still_mark_the_delivery_done(self):
+        worker = WebhookWorker(concurrency=1)
+
+        def fail(*args):
+            raise RuntimeError("batcher down")
+        worker.batcher.add = fail
+        with self.assertLogs("app.worker", level="ERROR"):
+            self._drain(worker, _delivery(batch_delivery={"max_size": 10}))
+        self.assertEqual(worker.in_flight, 0)
+
+    def test_parked_delivery_is_done_once_requeued_and_sent(self):
+        worker = WebhookWorker(concurrency=1)
+        sent = []
+        waits = iter([0.01, 0])
+        worker.host_limiter.acquire = lambda host: next(waits)
+
+        async def allow(subscription_id):
+            return True, 0
+        worker.circuit_breaker.allow = allow
+
+        async def process(task, webhook_payload, subscription):
+            sent.append(task.id)
+            return SimpleNamespace(failed=True, status_code=None, retry_after=None)
+        worker._process_single_delivery = process
+        self._drain(worker, _delivery())
+        self.assertEqual(sent, [1])
+        self.assertEqual(worker.parked, 0)
+
+if __name__ == "__main__":
+    unittest.main()